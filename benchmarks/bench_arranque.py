@@ -0,0 +1,100 @@
+"""
+Benchmark del tiempo de arranque de main.py.
+
+Mide, en procesos nuevos, el tiempo de pared de los puntos de entrada de la
+línea de comandos (ayuda de cada subcomando) y, con ``python -X importtime``,
+qué módulos cuesta importar: main.py solo, cada ejercicio por separado y la
+importación de todos los ejercicios con pyplot, que era lo que hacía main.py
+antes de cargarlos al usarlos.
+
+Uso:
+    python benchmarks/bench_arranque.py [--repeticiones N] [--top K]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(RAIZ, 'main.py')
+
+# Puntos de entrada: (descripción, argumentos de python)
+ENTRADAS = [
+    ('main.py --help', [MAIN, '--help']),
+    ('main.py ejecutar --help', [MAIN, 'ejecutar', '--help']),
+    ('main.py lote --help', [MAIN, 'lote', '--help']),
+]
+
+# Importaciones medidas con -X importtime: (descripción, código)
+IMPORTACIONES = [
+    ('import main', 'import main'),
+    ('ejercicio1', 'import src.ejercicio1'),
+    ('ejercicio3 + dibujo', 'import src.ejercicio3, src.graficos; src.graficos.crear_figura((1, 1))'),
+    ('ejercicio4 + scipy', 'import src.ejercicio4; src.ejercicio4.filtrar_savgol([0.0] * 200, 101, 3)'),
+    ('todo (como antes)', 'import main, matplotlib.pyplot, scipy.signal, '
+                          'src.ejercicio1, src.ejercicio2, src.ejercicio3, src.ejercicio4, src.ejercicio5'),
+]
+
+
+def tiempo_pared(argumentos, repeticiones):
+    """Mediana del tiempo de pared de ejecutar python con los argumentos dados."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable] + argumentos, cwd=RAIZ, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def informe_importtime(codigo):
+    """
+    Ejecuta el código con -X importtime y devuelve los módulos de primer nivel.
+
+    Returns
+    -------
+    list
+        Lista de (microsegundos acumulados, módulo) ordenada de mayor a menor.
+    """
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo], cwd=RAIZ,
+                               check=True, capture_output=True, text=True)
+    modulos = []
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea.split('|')
+        # Los módulos de primer nivel llevan un único espacio tras la barra
+        if not nombre.startswith('  '):
+            modulos.append((int(acumulado), nombre.strip()))
+    return sorted(modulos, reverse=True)
+
+
+def main():
+    """Mide y muestra los tiempos de arranque."""
+    parser = argparse.ArgumentParser(description='Benchmark del arranque de main.py')
+    parser.add_argument('--repeticiones', type=int, default=5,
+                        help='Ejecuciones por punto de entrada (por defecto 5)')
+    parser.add_argument('--top', type=int, default=5,
+                        help='Módulos más costosos a mostrar por importación (por defecto 5)')
+    args = parser.parse_args()
+
+    print("=== Tiempo de pared por punto de entrada (mediana) ===")
+    base = tiempo_pared(['-c', 'pass'], args.repeticiones)
+    print(f"  {'python -c pass':<28} {base * 1000:8.1f} ms")
+    for descripcion, argumentos in ENTRADAS:
+        print(f"  {descripcion:<28} {tiempo_pared(argumentos, args.repeticiones) * 1000:8.1f} ms")
+
+    print("\n=== python -X importtime ===")
+    for descripcion, codigo in IMPORTACIONES:
+        modulos = informe_importtime(codigo)
+        total = sum(acumulado for acumulado, _ in modulos)
+        print(f"  {descripcion:<28} {total / 1000:8.1f} ms")
+        for acumulado, nombre in modulos[:args.top]:
+            print(f"      {nombre:<24} {acumulado / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
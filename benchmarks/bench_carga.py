@@ -0,0 +1,50 @@
+"""
+Benchmark de la carga del dataset: lectura inferida frente a lectura tipada.
+
+Uso:
+    python benchmarks/bench_carga.py [ruta_csv] [--filas N]
+
+Si no se indica un CSV se genera uno sintético con el formato original.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.ejercicio1 import medir_carga, motor_csv_disponible
+from datos_sinteticos import generar_csv
+
+
+def main():
+    """Ejecuta el benchmark de carga y muestra la comparación."""
+    parser = argparse.ArgumentParser(description='Benchmark de carga del dataset')
+    parser.add_argument('ruta', nargs='?', help='CSV a cargar (opcional)')
+    parser.add_argument('--filas', type=int, default=1_000_000,
+                        help='Filas del CSV sintético (por defecto 1.000.000)')
+    args = parser.parse_args()
+    
+    ruta = args.ruta or generar_csv(args.filas)
+    print(f"CSV de prueba: {ruta}")
+    
+    _, inferido = medir_carga(ruta, tipado=False)
+    _, tipado_c = medir_carga(ruta, tipado=True, motor='c')
+    resultados = [inferido, tipado_c]
+    if motor_csv_disponible() == 'pyarrow':
+        _, tipado_arrow = medir_carga(ruta, tipado=True, motor='pyarrow')
+        resultados.append(tipado_arrow)
+    
+    print("\n=== Comparación ===")
+    etiquetas = ['inferido', 'tipado (c)', 'tipado (pyarrow)']
+    for etiqueta, metricas in zip(etiquetas, resultados):
+        aceleracion = inferido['segundos'] / metricas['segundos']
+        reduccion = inferido['bytes_memoria'] / metricas['bytes_memoria']
+        print(f"{etiqueta:>18}: {metricas['filas_por_segundo']:>12,.0f} filas/s "
+              f"(x{aceleracion:.1f}), {metricas['bytes_memoria'] / 1024**2:8.1f} MB "
+              f"(x{reduccion:.1f} menos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark de la conversión a año decimal: toYearFraction por fila frente a
+la versión vectorizada sobre la columna completa.
+
+Uso:
+    python benchmarks/bench_dia_decimal.py [--filas N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ejercicio3 import toYearFraction, toYearFraction_vectorizado
+
+
+def main():
+    """Mide ambas conversiones y comprueba que los resultados coinciden."""
+    parser = argparse.ArgumentParser(description='Benchmark de dia_decimal')
+    parser.add_argument('--filas', type=int, default=1_000_000,
+                        help='Número de fechas a convertir (por defecto 1.000.000)')
+    args = parser.parse_args()
+    
+    # Fechas diarias repetidas como en un dataset con varias estaciones
+    dias = pd.date_range('1960-01-01', '2025-06-13', freq='D')
+    fechas = pd.Series(np.resize(dias.values, args.filas))
+    
+    inicio = time.perf_counter()
+    por_fila = fechas.apply(toYearFraction).to_numpy()
+    tiempo_fila = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    vectorizado = toYearFraction_vectorizado(fechas)
+    tiempo_vector = time.perf_counter() - inicio
+    
+    print(f"Filas: {args.filas:,}")
+    print(f"apply(toYearFraction):      {tiempo_fila:8.3f} s")
+    print(f"toYearFraction_vectorizado: {tiempo_vector:8.3f} s")
+    print(f"Aceleración: x{tiempo_fila / tiempo_vector:.0f}")
+    print(f"Resultados idénticos: {np.array_equal(por_fila, vectorizado)}")
+
+
+if __name__ == "__main__":
+    main()
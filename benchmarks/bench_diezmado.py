@@ -0,0 +1,106 @@
+"""
+Benchmark del diezmado de series antes de dibujar.
+
+Dibuja y guarda los gráficos de los ejercicios 3 y 4 con series sintéticas
+de distintas longitudes, con todos los puntos (como antes) y diezmadas al
+ancho en píxeles de la imagen con graficos.diezmar_serie, y muestra el
+tiempo de dibujo, el tamaño del PNG, los puntos dibujados y cuántos
+píxeles difieren entre ambas imágenes.
+
+Uso:
+    python benchmarks/bench_diezmado.py [--puntos N [N ...]] [--repeticiones N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import ejercicio3, ejercicio4
+from src.graficos import diezmar_serie
+
+# Gráficos medidos: (descripción, módulo, función)
+GRAFICOS = [
+    ('volumen (ej. 3)', ejercicio3, 'visualizar_evolucion_volumen'),
+    ('suavizado (ej. 4)', ejercicio4, 'visualizar_serie_suavizada'),
+]
+
+
+def serie_sintetica(puntos, semilla=0):
+    """Serie diaria con estacionalidad, ruido y su versión suavizada."""
+    generador = np.random.default_rng(semilla)
+    dias = np.arange(puntos)
+    nivel = np.clip(60 + 30 * np.sin(dias / 400.0) + generador.normal(0, 4, puntos), 0, 100)
+    df = pd.DataFrame({'dia_decimal': 1970 + dias / 365.25, 'nivell_perc': nivel})
+    df['nivell_perc_suavizado'] = df['nivell_perc'].rolling(365, center=True, min_periods=1).mean()
+    return df
+
+
+def sin_diezmar(x, y, ancho_px):
+    """Sustituto de diezmar_serie que devuelve la serie entera."""
+    return np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+
+
+def dibujar(modulo, funcion, df, directorio, diezmar, repeticiones):
+    """Dibuja un gráfico varias veces y devuelve (mediana en s, ruta del PNG)."""
+    tiempos = []
+    with patch.object(modulo, 'diezmar_serie', diezmar), \
+            contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            ruta = getattr(modulo, funcion)(df, directorio=directorio)
+            tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), ruta
+
+
+def pixeles_distintos(ruta_a, ruta_b):
+    """Fracción de píxeles que difieren entre dos PNG del mismo tamaño."""
+    from matplotlib.image import imread
+    imagen_a, imagen_b = imread(ruta_a), imread(ruta_b)
+    if imagen_a.shape != imagen_b.shape:
+        return float('nan')
+    return float(np.any(imagen_a != imagen_b, axis=-1).mean())
+
+
+def main_benchmark():
+    """Mide y muestra el dibujo con y sin diezmado."""
+    parser = argparse.ArgumentParser(description='Benchmark del diezmado antes de dibujar')
+    parser.add_argument('--puntos', type=int, nargs='+', default=[20000, 200000, 1000000],
+                        help='Longitudes de serie a probar (por defecto 20000 200000 1000000)')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Repeticiones por gráfico (por defecto 3)')
+    args = parser.parse_args()
+
+    print(f"{'Gráfico':<18} {'puntos':>9} {'dibujados':>10} {'antes':>8} {'después':>8} "
+          f"{'PNG antes':>10} {'PNG después':>12} {'píx. distintos':>15}")
+    with tempfile.TemporaryDirectory(prefix='pec4_diezmado_') as directorio:
+        antes_dir = os.path.join(directorio, 'antes')
+        despues_dir = os.path.join(directorio, 'despues')
+        for puntos in args.puntos:
+            df = serie_sintetica(puntos)
+            for descripcion, modulo, funcion in GRAFICOS:
+                tiempo_antes, ruta_antes = dibujar(modulo, funcion, df, antes_dir, sin_diezmar,
+                                                   args.repeticiones)
+                tiempo_despues, ruta_despues = dibujar(modulo, funcion, df, despues_dir,
+                                                       diezmar_serie, args.repeticiones)
+                # Mismo ancho que usan los gráficos: el de la figura a 300 ppp
+                ancho_px = int(np.ceil((12 if modulo is ejercicio3 else 14) * 300))
+                dibujados = len(diezmar_serie(df['dia_decimal'], df['nivell_perc'], ancho_px)[0])
+                print(f"{descripcion:<18} {puntos:>9,} {dibujados:>10,} {tiempo_antes:>7.2f}s "
+                      f"{tiempo_despues:>7.2f}s {os.path.getsize(ruta_antes) / 1024:>8.0f}KB "
+                      f"{os.path.getsize(ruta_despues) / 1024:>10.0f}KB "
+                      f"{pixeles_distintos(ruta_antes, ruta_despues):>14.3%}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,125 @@
+"""
+Benchmark del flujo completo de main.ejecutar_todos_los_ejercicios.
+
+Ejecuta los ejercicios 1 a 5 sobre un CSV sintético (sin pausas entre
+ejercicios) y muestra el tiempo de cada uno, cuántas veces se ha comprobado
+si 'dia_decimal' está ordenado y cuántas veces se ha reordenado de verdad.
+Con --sin-seguimiento se desactivan las marcas de df.tiempo, de modo que
+cada función vuelve a comprobar el orden por su cuenta, como antes.
+
+Los gráficos se guardan en img/ como en una ejecución normal.
+
+Uso:
+    python benchmarks/bench_flujo.py [--dias N] [--desordenado] [--sin-seguimiento]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from src.orden_temporal import OrdenTemporal
+from datos_sinteticos import generar_dataframe
+
+
+def escribir_csv(dias, desordenado, directorio):
+    """Escribe el CSV sintético, opcionalmente con las filas barajadas."""
+    df = generar_dataframe(dias_por_estacion=dias)
+    if desordenado:
+        df = df.sample(frac=1, random_state=0)
+    ruta = os.path.join(directorio, 'embalses_sinteticos.csv')
+    df.to_csv(ruta, index=False)
+    return ruta
+
+
+def cronometrar(funcion, tiempos):
+    """Envuelve un ejecutar_ejercicioN para acumular su tiempo en tiempos."""
+    def envoltorio(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            tiempos[funcion.__name__] = tiempos.get(funcion.__name__, 0.0) + time.perf_counter() - inicio
+    return envoltorio
+
+
+def main_benchmark():
+    """Ejecuta el flujo completo y muestra tiempos y ordenaciones."""
+    parser = argparse.ArgumentParser(description='Benchmark de ejecutar_todos_los_ejercicios')
+    parser.add_argument('--dias', type=int, default=20000,
+                        help='Días por estación (por defecto 20000)')
+    parser.add_argument('--desordenado', action='store_true',
+                        help='Baraja las filas del CSV antes de empezar')
+    parser.add_argument('--sin-seguimiento', action='store_true',
+                        help='Desactiva las marcas de orden de df.tiempo')
+    args = parser.parse_args()
+
+    contadores = {'comprobaciones': 0, 'ordenaciones': 0, 'sort_values': 0}
+    monotono_original = pd.Series.is_monotonic_increasing
+    ordenar_original = OrdenTemporal.ordenar
+    sort_values_original = pd.DataFrame.sort_values
+
+    def es_monotono(serie):
+        contadores['comprobaciones'] += 1
+        return monotono_original.fget(serie)
+
+    def ordenar(accesor, columna='dia_decimal'):
+        resultado = ordenar_original(accesor, columna)
+        if resultado is not accesor._df:
+            contadores['ordenaciones'] += 1
+        return resultado
+
+    def sort_values(df, *args, **kwargs):
+        contadores['sort_values'] += 1
+        return sort_values_original(df, *args, **kwargs)
+
+    tiempos = {}
+    parches = [
+        patch('builtins.input', return_value=''),
+        patch.object(pd.Series, 'is_monotonic_increasing', property(es_monotono)),
+        patch.object(OrdenTemporal, 'ordenar', ordenar),
+        patch.object(pd.DataFrame, 'sort_values', sort_values),
+    ]
+    for numero in range(1, 6):
+        nombre = f'ejecutar_ejercicio{numero}'
+        parches.append(patch.object(main, nombre, cronometrar(getattr(main, nombre), tiempos)))
+    if args.sin_seguimiento:
+        parches.append(patch.object(OrdenTemporal, '_marca_vigente', lambda accesor, columna: None))
+
+    with tempfile.TemporaryDirectory(prefix='pec4_flujo_') as directorio:
+        ruta = escribir_csv(args.dias, args.desordenado, directorio)
+        salida = io.StringIO()
+        with contextlib.ExitStack() as pila:
+            for parche in parches:
+                pila.enter_context(parche)
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(salida):
+                main.ejecutar_todos_los_ejercicios(ruta)
+            total = time.perf_counter() - inicio
+
+    if '❌' in salida.getvalue():
+        print("Advertencia: algún ejercicio ha fallado; revisa la salida del flujo")
+
+    print(f"Días por estación: {args.dias:,} ({'desordenado' if args.desordenado else 'ordenado'})")
+    print(f"Seguimiento del orden: {'no' if args.sin_seguimiento else 'sí'}")
+    for numero in range(1, 6):
+        nombre = f'ejecutar_ejercicio{numero}'
+        print(f"  Ejercicio {numero}: {tiempos.get(nombre, 0.0):.3f} s")
+    print(f"Tiempo total: {total:.3f} s")
+    print(f"Comprobaciones de orden (is_monotonic_increasing): {contadores['comprobaciones']}")
+    print(f"Reordenaciones por 'dia_decimal': {contadores['ordenaciones']}")
+    print(f"Llamadas a sort_values: {contadores['sort_values']}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,82 @@
+"""
+Benchmark del dibujo de gráficos dentro y fuera del camino crítico.
+
+Ejecuta 'main.py ejecutar' (ejercicios 1 a 5, sin caché de etapas) sobre un
+CSV sintético dibujando los gráficos en el momento (--procesos-graficos 0)
+o en procesos aparte, y muestra el tiempo de pared total, el de las etapas
+de análisis y lo que queda por esperar de los gráficos al final. Con los
+gráficos en paralelo el total se acerca al mayor de análisis y dibujo en
+lugar de a su suma (siempre que haya más de un núcleo libre).
+
+Uso:
+    python benchmarks/bench_graficos.py [--dias N] [--repeticiones N]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from datos_sinteticos import generar_dataframe
+
+# Configuraciones medidas: (descripción, argumentos extra de 'ejecutar')
+CONFIGURACIONES = [
+    ('en el momento', ['--procesos-graficos', '0']),
+    ('1 proceso de dibujo', ['--procesos-graficos', '1']),
+    ('2 procesos + 2 hilos', ['--procesos-graficos', '2', '--hilos', '2']),
+]
+
+
+def ejecutar(ruta, directorio, extra):
+    """Ejecuta los cinco ejercicios y devuelve (segundos, etapas de tiempos.json)."""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        codigo = main.main(['ejecutar', '-d', ruta, '-o', directorio, '-q', '--sin-cache'] + extra)
+    total = time.perf_counter() - inicio
+    if codigo != main.CODIGO_EXITO:
+        raise RuntimeError(f"'ejecutar' ha terminado con código {codigo}")
+    with open(os.path.join(directorio, 'tiempos.json'), encoding='utf-8') as archivo:
+        return total, json.load(archivo)['etapas']
+
+
+def main_benchmark():
+    """Mide y muestra el tiempo de cada configuración."""
+    parser = argparse.ArgumentParser(description='Benchmark del dibujo de gráficos en paralelo')
+    parser.add_argument('--dias', type=int, default=20000,
+                        help='Días por estación (por defecto 20000)')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Ejecuciones por configuración (por defecto 3)')
+    args = parser.parse_args()
+
+    print(f"Núcleos disponibles: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory(prefix='pec4_graficos_') as directorio:
+        ruta = os.path.join(directorio, 'embalses_sinteticos.csv')
+        generar_dataframe(dias_por_estacion=args.dias).to_csv(ruta, index=False)
+        # Primera ejecución para que las importaciones no cuenten en la primera configuración
+        ejecutar(ruta, directorio, ['--procesos-graficos', '0'])
+
+        print(f"{'Configuración':<24} {'total':>9} {'análisis':>9} {'espera':>9}")
+        for descripcion, extra in CONFIGURACIONES:
+            totales, analisis, esperas = [], [], []
+            for _ in range(args.repeticiones):
+                total, etapas = ejecutar(ruta, directorio, extra)
+                totales.append(total)
+                analisis.append(sum(etapa['segundos'] for etapa in etapas
+                                    if etapa['etapa'] != 'Gráficos (espera)'))
+                esperas.append(sum(etapa['segundos'] for etapa in etapas
+                                   if etapa['etapa'] == 'Gráficos (espera)'))
+            print(f"{descripcion:<24} {statistics.median(totales):>8.3f}s "
+                  f"{statistics.median(analisis):>8.3f}s {statistics.median(esperas):>8.3f}s")
+
+
+if __name__ == "__main__":
+    main_benchmark()
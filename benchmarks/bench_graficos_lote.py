@@ -0,0 +1,74 @@
+"""
+Benchmark de los gráficos por estación: figuras por segundo.
+
+Suaviza un dataset sintético con analisis_lote y genera el gráfico de cada
+estación de dos formas: llamando a visualizar_serie_suavizada para cada una
+(una figura nueva, maquetado y bbox_inches='tight' por estación, como
+antes) y con graficos_lote.visualizar_estaciones, que reutiliza una sola
+figura. También mide la cuadrícula con todas las estaciones.
+
+Uso:
+    python benchmarks/bench_graficos_lote.py [--estaciones N] [--dias D]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analisis_lote import ejecutar_lote
+from src.ejercicio4 import visualizar_serie_suavizada
+from src.graficos_lote import visualizar_estaciones, visualizar_cuadricula, series_estaciones
+from datos_sinteticos import generar_dataframe, nombres_estaciones
+
+
+def uno_a_uno(df_suavizado, directorio):
+    """Un gráfico por estación con visualizar_serie_suavizada."""
+    for estacion, grupo in df_suavizado.groupby('estacio', observed=True, sort=False):
+        visualizar_serie_suavizada(grupo, nombre_alumno=str(estacion), directorio=directorio)
+
+
+def main():
+    """Genera los gráficos de todas las estaciones y muestra las figuras por segundo."""
+    parser = argparse.ArgumentParser(description='Benchmark de los gráficos por estación')
+    parser.add_argument('--estaciones', type=int, default=12,
+                        help='Número de estaciones sintéticas (por defecto 12)')
+    parser.add_argument('--dias', type=int, default=20000,
+                        help='Días por estación (por defecto 20000)')
+    args = parser.parse_args()
+
+    df = generar_dataframe(args.dias, nombres_estaciones(args.estaciones))
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, df_suavizado, _ = ejecutar_lote(df, window_length=101)
+    estaciones = len(series_estaciones(df_suavizado))
+
+    pruebas = [
+        ('Una figura por estación', lambda directorio: uno_a_uno(df_suavizado, directorio),
+         estaciones),
+        ('Figura reutilizada', lambda directorio: visualizar_estaciones(df_suavizado,
+                                                                        directorio=directorio),
+         estaciones),
+        ('Cuadrícula (1 imagen)', lambda directorio: visualizar_cuadricula(df_suavizado,
+                                                                           directorio=directorio),
+         1),
+    ]
+
+    print(f"Estaciones: {estaciones} ({args.dias} días cada una)")
+    with tempfile.TemporaryDirectory(prefix='pec4_graficos_lote_') as directorio:
+        for descripcion, funcion, figuras in pruebas:
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                funcion(directorio)
+            segundos = time.perf_counter() - inicio
+            print(f"  {descripcion:<26} {segundos:7.2f} s  {figuras / segundos:6.2f} figuras/s  "
+                  f"{estaciones / segundos:6.2f} estaciones/s")
+
+
+if __name__ == "__main__":
+    main()
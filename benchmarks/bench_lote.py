@@ -0,0 +1,45 @@
+"""
+Benchmark del análisis en lote: estaciones por segundo.
+
+Uso:
+    python benchmarks/bench_lote.py [--estaciones N] [--dias D] [--procesos P]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analisis_lote import ejecutar_lote
+from datos_sinteticos import generar_dataframe, nombres_estaciones
+
+
+def main():
+    """Ejecuta el lote sobre un dataset sintético y muestra el rendimiento."""
+    parser = argparse.ArgumentParser(description='Benchmark del análisis en lote')
+    parser.add_argument('--estaciones', type=int, default=40,
+                        help='Número de estaciones sintéticas (por defecto 40)')
+    parser.add_argument('--dias', type=int, default=20000,
+                        help='Días por estación (por defecto 20000)')
+    parser.add_argument('--procesos', type=int, default=1,
+                        help='Procesos para el análisis por estación (por defecto 1)')
+    args = parser.parse_args()
+    
+    df = generar_dataframe(args.dias, nombres_estaciones(args.estaciones))
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_periodos, _, metricas = ejecutar_lote(df, procesos=args.procesos)
+    
+    print(f"Filas: {len(df):,} ({args.estaciones} estaciones x {args.dias} días)")
+    print(f"Procesos: {metricas['procesos']}")
+    print(f"Tiempo total: {metricas['segundos_total']:.2f} s")
+    print(f"Tiempo por estaciones: {metricas['segundos_estaciones']:.2f} s")
+    print(f"Estaciones por segundo: {metricas['estaciones_por_segundo']:.1f}")
+    print(f"Períodos encontrados: {len(df_periodos)}")
+
+
+if __name__ == "__main__":
+    main()
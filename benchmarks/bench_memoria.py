@@ -0,0 +1,111 @@
+"""
+Benchmark de memoria del flujo de los ejercicios 2 a 5 sobre un dataset
+sintético del tamaño del real (sin generar gráficos).
+
+Mide el pico de memoria reservada con tracemalloc y, en un proceso aparte,
+el aumento del pico de RSS durante el flujo.
+
+Uso:
+    python benchmarks/bench_memoria.py [--dias N] [--cow]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.ejercicio2 import renombrar_columnas, limpiar_nombres_pantanos, filtrar_la_baells
+from src.ejercicio3 import convertir_a_datetime, analizar_rango_temporal, crear_columna_dia_decimal
+from src.ejercicio4 import suavizar_serie_temporal, analizar_tendencias
+from src.ejercicio5 import calcula_periodos, analizar_periodos_sequia
+from datos_sinteticos import generar_dataframe
+
+
+def ejecutar_flujo(df):
+    """Ejecuta los pasos de cálculo de los ejercicios 2 a 5 para La Baells."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_limpio = limpiar_nombres_pantanos(renombrar_columnas(df))
+        df_baells = filtrar_la_baells(df_limpio)
+        df_datetime = convertir_a_datetime(df_baells)
+        analizar_rango_temporal(df_datetime)
+        df_decimal = crear_columna_dia_decimal(df_datetime)
+        df_suavizado = suavizar_serie_temporal(df_decimal)
+        analizar_tendencias(df_suavizado)
+        periodos = calcula_periodos(df_suavizado)
+        analizar_periodos_sequia(df_suavizado, periodos)
+    return df_suavizado
+
+
+def pico_rss_mb():
+    """
+    Pico de memoria residente del proceso en MB.
+    
+    En Linux se lee VmHWM, porque ru_maxrss se hereda del proceso padre a
+    través de exec y no serviría para medir el proceso hijo.
+    """
+    try:
+        with open('/proc/self/status') as estado:
+            for linea in estado:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    """Mide el pico de memoria del flujo."""
+    parser = argparse.ArgumentParser(description='Benchmark de memoria del flujo')
+    parser.add_argument('--dias', type=int, default=23000,
+                        help='Días por estación (por defecto 23000, unas 200.000 filas)')
+    parser.add_argument('--cow', action='store_true',
+                        help='Activa el modo copy-on-write de pandas')
+    parser.add_argument('--solo-rss', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.cow:
+        pd.set_option('mode.copy_on_write', True)
+    
+    if args.solo_rss:
+        # Proceso hijo: el pico de RSS solo puede medirse una vez por proceso,
+        # así que se carga el dataset ya generado y se mide solo el flujo
+        df = pd.read_pickle(args.solo_rss)
+        antes = pico_rss_mb()
+        ejecutar_flujo(df)
+        print(f"{pico_rss_mb() - antes:.1f}")
+        return
+    
+    df = generar_dataframe(args.dias)
+    tamano = df.memory_usage(deep=True).sum() / 1024 ** 2
+    tracemalloc.start()
+    ejecutar_flujo(df)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'dataset.pkl')
+        df.to_pickle(ruta)
+        comando = [sys.executable, os.path.abspath(__file__), '--solo-rss', ruta]
+        if args.cow:
+            comando.append('--cow')
+        aumento_rss = subprocess.run(comando, capture_output=True, text=True,
+                                     check=True).stdout.strip()
+    
+    print(f"Filas: {len(df):,} ({tamano:.1f} MB en memoria)"
+          + (" con copy-on-write" if args.cow else ""))
+    print(f"Pico de memoria reservada (tracemalloc): {pico / 1024 ** 2:8.1f} MB")
+    print(f"Aumento del pico de RSS:                 {float(aumento_rss):8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark de la detección y el análisis de períodos de sequía sobre una
+serie suavizada.
+
+Uso:
+    python benchmarks/bench_periodos.py [--dias N] [--repeticiones R]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ejercicio5 import (calcula_periodos, calcula_periodos_arrays,
+                            calcula_periodos_multiumbral_arrays, analizar_periodos_sequia)
+
+
+def serie_suavizada(dias, semilla=0):
+    """Genera una serie diaria suavizada con varias sequías por década."""
+    generador = np.random.default_rng(semilla)
+    dia_decimal = 1970 + np.arange(dias) / 365.25
+    suavizado = (60 + 20 * np.sin(2 * np.pi * dia_decimal / 3)
+                 + np.convolve(generador.normal(0, 3, dias), np.ones(30) / 30, 'same'))
+    return pd.DataFrame({'dia': pd.date_range('1970-01-01', periods=dias, freq='D'),
+                         'dia_decimal': dia_decimal, 'nivell_perc_suavizado': suavizado})
+
+
+def medir(funcion, repeticiones):
+    """Devuelve los microsegundos por llamada de la función."""
+    return timeit.timeit(funcion, number=repeticiones) / repeticiones * 1e6
+
+
+def main():
+    """Mide la detección sobre arrays y sobre DataFrames ordenados y desordenados."""
+    parser = argparse.ArgumentParser(description='Benchmark de calcula_periodos')
+    parser.add_argument('--dias', type=int, default=20000,
+                        help='Longitud de la serie en días (por defecto 20000)')
+    parser.add_argument('--repeticiones', type=int, default=1000,
+                        help='Llamadas por medición (por defecto 1000)')
+    args = parser.parse_args()
+    
+    df = serie_suavizada(args.dias)
+    df_desordenado = df.sample(frac=1, random_state=0)
+    dia_decimal = df['dia_decimal'].values
+    suavizado = df['nivell_perc_suavizado'].values
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        periodos = calcula_periodos(df)
+        t_arrays = medir(lambda: calcula_periodos_arrays(dia_decimal, suavizado), args.repeticiones)
+        t_ordenado = medir(lambda: calcula_periodos(df), args.repeticiones)
+        t_desordenado = medir(lambda: calcula_periodos(df_desordenado), args.repeticiones)
+        
+        # Barrido de umbrales: uno a uno frente a una sola pasada
+        umbrales = [30, 40, 50, 60, 70]
+        t_barrido = medir(lambda: [calcula_periodos_arrays(dia_decimal, suavizado, umbral)
+                                   for umbral in umbrales], args.repeticiones)
+        t_multiumbral = medir(lambda: calcula_periodos_multiumbral_arrays(dia_decimal, suavizado,
+                                                                          umbrales),
+                              args.repeticiones)
+        
+        # Coste del análisis detallado con pocos y con muchos períodos
+        t_analisis = {}
+        for umbral in (45, 60, 75):
+            periodos_umbral = calcula_periodos(df, umbral)
+            t_analisis[umbral] = (len(periodos_umbral),
+                                  medir(lambda: analizar_periodos_sequia(df, periodos_umbral), 10))
+    
+    print(f"Días: {args.dias:,}, períodos encontrados: {len(periodos)}")
+    print(f"calcula_periodos_arrays:          {t_arrays:9.1f} µs")
+    print(f"calcula_periodos (ordenado):      {t_ordenado:9.1f} µs")
+    print(f"calcula_periodos (desordenado):   {t_desordenado:9.1f} µs")
+    print(f"Umbrales {umbrales}")
+    print(f"  uno a uno:                      {t_barrido:9.1f} µs")
+    print(f"  en una pasada:                  {t_multiumbral:9.1f} µs")
+    for umbral, (numero, tiempo) in t_analisis.items():
+        print(f"analizar_periodos_sequia ({umbral}%, {numero} períodos): {tiempo / 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
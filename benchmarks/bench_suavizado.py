@@ -0,0 +1,90 @@
+"""
+Benchmark del suavizado Savitzky-Golay: barrido de parámetros con
+savgol_filter frente al banco de coeficientes en caché, y actualización
+diaria de una serie larga filtrándola entera frente al suavizado incremental.
+
+Uso:
+    python benchmarks/bench_suavizado.py [--dias N] [--ventana W] [--actualizaciones A]
+                                         [--estaciones E]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.signal import savgol_filter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ejercicio4 import suavizar_valores, suavizar_incremental, filtrar_savgol
+
+
+def medir_barrido(filtro, series, combinaciones):
+    """Filtra todas las series con todas las combinaciones y devuelve los segundos."""
+    inicio = time.perf_counter()
+    for serie in series:
+        for window_length, polyorder in combinaciones:
+            filtro(serie, window_length, polyorder)
+    return time.perf_counter() - inicio
+
+
+def main():
+    """Simula actualizaciones diarias y compara el coste por actualización."""
+    parser = argparse.ArgumentParser(description='Benchmark del suavizado')
+    parser.add_argument('--dias', type=int, default=25000,
+                        help='Longitud inicial de la serie (por defecto 25000)')
+    parser.add_argument('--ventana', type=int, default=1500,
+                        help='window_length del filtro (por defecto 1500)')
+    parser.add_argument('--actualizaciones', type=int, default=30,
+                        help='Días añadidos de uno en uno (por defecto 30)')
+    parser.add_argument('--estaciones', type=int, default=9,
+                        help='Series del barrido de parámetros (por defecto 9)')
+    args = parser.parse_args()
+    
+    generador = np.random.default_rng(0)
+    valores = 60 + generador.normal(0, 1, args.dias + args.actualizaciones).cumsum()
+    historico, nuevos = valores[:args.dias], valores[args.dias:]
+    
+    # Barrido de parámetros sobre varias estaciones
+    series = [60 + generador.normal(0, 1, args.dias).cumsum() for _ in range(args.estaciones)]
+    combinaciones = [(ventana, orden) for ventana in (365, 731, 1095, 1500) for orden in (2, 3)]
+    tiempo_scipy = medir_barrido(savgol_filter, series, combinaciones)
+    tiempo_banco = medir_barrido(filtrar_savgol, series, combinaciones)
+    
+    inicio = time.perf_counter()
+    for dia in range(1, args.actualizaciones + 1):
+        completo = suavizar_valores(valores[:args.dias + dia], args.ventana, 3)
+    tiempo_completo = (time.perf_counter() - inicio) / args.actualizaciones
+    
+    resultados = {}
+    for causal in (False, True):
+        # La serie suavizada la guarda quien llama, con sitio para las actualizaciones
+        suavizado = np.empty(len(valores))
+        tramo, desde, estado = suavizar_incremental(historico, window_length=args.ventana,
+                                                    causal=causal)
+        suavizado[desde:desde + len(tramo)] = tramo
+        inicio = time.perf_counter()
+        for valor in nuevos:
+            tramo, desde, estado = suavizar_incremental([valor], estado,
+                                                        window_length=args.ventana, causal=causal)
+            suavizado[desde:desde + len(tramo)] = tramo
+        resultados[causal] = ((time.perf_counter() - inicio) / args.actualizaciones,
+                              estado['muestras_recalculadas'], suavizado)
+    
+    print(f"Barrido de {len(combinaciones)} combinaciones x {args.estaciones} series:")
+    print(f"  savgol_filter:   {tiempo_scipy:8.2f} s")
+    print(f"  filtrar_savgol:  {tiempo_banco:8.2f} s")
+    print(f"Serie: {args.dias:,} días, ventana {args.ventana}")
+    print(f"Filtrar la serie completa:  {tiempo_completo * 1000:8.2f} ms por actualización")
+    for causal, (tiempo, muestras, _) in resultados.items():
+        nombre = 'Incremental causal:' if causal else 'Incremental centrado:'
+        print(f"{nombre:27} {tiempo * 1000:8.2f} ms por actualización "
+              f"({muestras} muestras recalculadas)")
+    diferencia = np.abs(resultados[False][2] - completo).max()
+    print(f"Diferencia máxima centrado/completo: {diferencia:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Generador de datos sintéticos para los benchmarks.
+
+Crea un CSV con el mismo formato que el dataset de embalses de las Cuencas
+Internas de Catalunya, con el tamaño que se necesite para medir rendimiento.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+ESTACIONES_SINTETICAS = [
+    'Embassament de la Baells (Cercs)',
+    'Embassament de Sau (Vilanova de Sau)',
+    'Embassament de Susqueda (Osor)',
+    'Embassament de la Llosa del Cavall (Navès)',
+    'Embassament de Sant Ponç (Clariana de Cardener)',
+    'Embassament de Siurana (Cornudella de Montsant)',
+    'Embassament de Riudecanyes (Riudecanyes)',
+    'Embassament de Darnius Boadella (Darnius)',
+    'Embassament de Foix (Castellet i la Gornal)',
+]
+
+
+def generar_dataframe(dias_por_estacion=20000, estaciones=None, semilla=0):
+    """
+    Genera un DataFrame con el formato del CSV original.
+    
+    Parameters
+    ----------
+    dias_por_estacion : int
+        Número de días consecutivos generados para cada estación.
+    estaciones : list, optional
+        Nombres originales de las estaciones. Por defecto ESTACIONES_SINTETICAS.
+    semilla : int
+        Semilla del generador aleatorio.
+        
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame con las columnas originales del dataset.
+    """
+    if estaciones is None:
+        estaciones = ESTACIONES_SINTETICAS
+    
+    generador = np.random.default_rng(semilla)
+    fechas = pd.date_range('1970-01-01', periods=dias_por_estacion, freq='D')
+    tiempo = np.arange(dias_por_estacion) / 365.25
+    
+    bloques = []
+    for posicion, estacion in enumerate(estaciones):
+        # Ciclo anual más una tendencia plurianual y ruido
+        porcentaje = (60 + 25 * np.sin(2 * np.pi * tiempo)
+                      + 15 * np.sin(2 * np.pi * tiempo / (7 + posicion))
+                      + generador.normal(0, 2, dias_por_estacion))
+        porcentaje = np.clip(porcentaje, 0, 100)
+        bloques.append(pd.DataFrame({
+            'Dia': fechas.strftime('%d/%m/%Y'),
+            'Estació': estacion,
+            'Nivell absolut (msnm)': np.round(600 + porcentaje * 0.4, 2),
+            'Percentatge volum embassat (%)': np.round(porcentaje, 1),
+            'Volum embassat (hm3)': np.round(porcentaje * 1.1, 2)
+        }))
+    
+    return pd.concat(bloques, ignore_index=True)
+
+
+def generar_csv(filas=1_000_000, directorio=None, semilla=0):
+    """
+    Escribe un CSV sintético con aproximadamente el número de filas pedido.
+    
+    Parameters
+    ----------
+    filas : int
+        Número aproximado de filas totales.
+    directorio : str, optional
+        Directorio donde escribir el archivo. Por defecto uno temporal.
+    semilla : int
+        Semilla del generador aleatorio.
+        
+    Returns
+    -------
+    str
+        Ruta del CSV generado.
+    """
+    if directorio is None:
+        directorio = tempfile.mkdtemp(prefix='pec4_bench_')
+    dias = max(filas // len(ESTACIONES_SINTETICAS), 1)
+    df = generar_dataframe(dias_por_estacion=dias, semilla=semilla)
+    ruta = os.path.join(directorio, f'embalses_sinteticos_{len(df)}.csv')
+    df.to_csv(ruta, index=False)
+    return ruta
+
+
+def nombres_estaciones(numero):
+    """
+    Devuelve numero nombres de estación con el formato original.
+    
+    Parameters
+    ----------
+    numero : int
+        Número de estaciones.
+        
+    Returns
+    -------
+    list
+        Nombres como 'Embassament de Sintètic 12 (Municipi 12)'; los primeros
+        son los de ESTACIONES_SINTETICAS.
+    """
+    nombres = list(ESTACIONES_SINTETICAS[:numero])
+    for posicion in range(len(nombres), numero):
+        nombres.append(f'Embassament de Sintètic {posicion} (Municipi {posicion})')
+    return nombres
@@ -3,20 +3,101 @@ Archivo principal para ejecutar los ejercicios de la PEC4.
 
 Este script permite ejecutar todos los ejercicios de manera interactiva,
 verificando la disponibilidad del dataset y permitiendo elegir qué ejercicios ejecutar.
+También puede ejecutarse sin interacción (por ejemplo, desde cron):
+
+    python main.py ejecutar --dataset datos.csv --ejercicios 5 --salida resultados
+    python main.py lote --dataset datos.csv --estaciones "la Baells" Sau --umbrales 50 60
+
+Los códigos de salida son 0 (éxito), 1 (falla una etapa), 2 (argumentos no
+válidos) y 3 (no se encuentra el dataset).
 """
 
+import argparse
+import contextlib
+import io
+import json
 import os
 import sys
+import time
+import importlib
 from pathlib import Path
 
 # Agregar el directorio src al path para importar los módulos
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.ejercicio1 import ejecutar_ejercicio1, cargar_dataset
-from src.ejercicio2 import ejecutar_ejercicio2
-from src.ejercicio3 import ejecutar_ejercicio3
-from src.ejercicio4 import ejecutar_ejercicio4
-from src.ejercicio5 import ejecutar_ejercicio5
+
+def _funcion_perezosa(modulo, nombre):
+    """
+    Devuelve una función que importa modulo.nombre la primera vez que se llama.
+    
+    Los módulos de los ejercicios cargan pandas, numpy, scipy o matplotlib;
+    importarlos al usarlos deja el menú y la ayuda de la línea de comandos
+    sin ese coste de arranque.
+    
+    Parameters
+    ----------
+    modulo : str
+        Módulo que define la función (por ejemplo 'src.ejercicio3').
+    nombre : str
+        Nombre de la función.
+        
+    Returns
+    -------
+    callable
+        Función con el mismo nombre que delega en la original.
+    """
+    def funcion(*args, **kwargs):
+        return getattr(importlib.import_module(modulo), nombre)(*args, **kwargs)
+    funcion.__name__ = funcion.__qualname__ = nombre
+    funcion.__doc__ = f"Llama a {modulo}.{nombre} (importado en la primera llamada)."
+    return funcion
+
+
+cargar_dataset = _funcion_perezosa('src.ejercicio1', 'cargar_dataset')
+ejecutar_ejercicio1 = _funcion_perezosa('src.ejercicio1', 'ejecutar_ejercicio1')
+ejecutar_ejercicio2 = _funcion_perezosa('src.ejercicio2', 'ejecutar_ejercicio2')
+cargar_estaciones_en_bloques = _funcion_perezosa('src.ejercicio2', 'cargar_estaciones_en_bloques')
+ejecutar_ejercicio3 = _funcion_perezosa('src.ejercicio3', 'ejecutar_ejercicio3')
+ejecutar_ejercicio4 = _funcion_perezosa('src.ejercicio4', 'ejecutar_ejercicio4')
+ejecutar_ejercicio5 = _funcion_perezosa('src.ejercicio5', 'ejecutar_ejercicio5')
+visualizar_evolucion_volumen = _funcion_perezosa('src.ejercicio3', 'visualizar_evolucion_volumen')
+visualizar_serie_suavizada = _funcion_perezosa('src.ejercicio4', 'visualizar_serie_suavizada')
+remuestrear_diario = _funcion_perezosa('src.remuestreo', 'remuestrear_diario')
+
+
+# Rutas posibles por defecto del dataset
+RUTAS_DATASET = [
+    'data/Quantitat_d_aigua_als_embassaments_de_les_Conques_Internes_de_Catalunya_20250613.csv',
+    'data/dataset.csv',
+    'Quantitat_d_aigua_als_embassaments_de_les_Conques_Internes_de_Catalunya_20250613.csv'
+]
+
+# Salidas del grafo de etapas (ver construir_grafo) que produce cada ejercicio
+OBJETIVOS_EJERCICIOS = {1: ('df_original',), 2: ('df_baells',),
+                        3: ('df_decimal', 'grafico_volumen'),
+                        4: ('df_suavizado', 'grafico_suavizado'),
+                        5: ('periodos', 'df_info_periodos')}
+
+# Códigos de salida de la línea de comandos (2 es el de argparse para errores de uso)
+CODIGO_EXITO = 0
+CODIGO_ERROR_ETAPA = 1
+CODIGO_ERROR_USO = 2
+CODIGO_SIN_DATASET = 3
+
+
+def buscar_dataset():
+    """
+    Busca el dataset en las rutas por defecto sin preguntar nada.
+    
+    Returns
+    -------
+    str or None
+        Ruta absoluta del primer archivo encontrado, o None si no existe ninguno.
+    """
+    for ruta in RUTAS_DATASET:
+        if os.path.exists(ruta):
+            return os.path.abspath(ruta)
+    return None
 
 
 def verificar_dataset():
@@ -32,22 +113,15 @@ def verificar_dataset():
     print("VERIFICACIÓN DEL DATASET")
     print("="*60)
     
-    # Rutas posibles por defecto
-    rutas_defecto = [
-        'data/Quantitat_d_aigua_als_embassaments_de_les_Conques_Internes_de_Catalunya_20250613.csv',
-        'data/dataset.csv',
-        'Quantitat_d_aigua_als_embassaments_de_les_Conques_Internes_de_Catalunya_20250613.csv'
-    ]
-    
     # Verificar rutas por defecto
-    for ruta in rutas_defecto:
-        if os.path.exists(ruta):
-            print(f"✓ Dataset encontrado en: {ruta}")
-            return os.path.abspath(ruta)
+    ruta = buscar_dataset()
+    if ruta is not None:
+        print(f"✓ Dataset encontrado en: {ruta}")
+        return ruta
     
     # Si no se encuentra, solicitar ruta
     print("⚠️  No se encontró el archivo de dataset en las rutas por defecto:")
-    for ruta in rutas_defecto:
+    for ruta in RUTAS_DATASET:
         print(f"   - {ruta}")
     
     print("\nOpciones:")
@@ -107,10 +181,14 @@ def mostrar_menu():
             print("Opción no válida. Por favor selecciona un número del 0 al 6.")
 
 
-def ejecutar_ejercicio_individual(numero, ruta_dataset, resultados_previos=None):
+def ejecutar_ejercicio_individual(numero, ruta_dataset, resultados_previos=None, cache=False):
     """
     Ejecuta un ejercicio individual.
     
+    Los resultados de los ejercicios previos se toman de resultados_previos,
+    de la caché en disco si se pide (ver cache_etapas) o, si no están, se
+    calculan con el grafo de etapas (ver construir_grafo).
+    
     Parameters
     ----------
     numero : str
@@ -119,6 +197,10 @@ def ejecutar_ejercicio_individual(numero, ruta_dataset, resultados_previos=None)
         Ruta al archivo de dataset.
     resultados_previos : dict, optional
         Diccionario con los resultados de ejercicios anteriores.
+    cache : bool, optional
+        Si se leen y guardan en disco los resultados de cada etapa y la
+        copia columnar del CSV (por defecto False, como en el menú
+        interactivo; la caché se usa desde la línea de comandos).
         
     Returns
     -------
@@ -129,94 +211,11 @@ def ejecutar_ejercicio_individual(numero, ruta_dataset, resultados_previos=None)
         resultados_previos = {}
     
     try:
-        if numero == '1':
-            print("\n🔄 Ejecutando Ejercicio 1...")
-            df = cargar_dataset(ruta_dataset)
-            df = ejecutar_ejercicio1(df)
-            resultados_previos['df_original'] = df
-            print("✅ Ejercicio 1 completado exitosamente")
-            
-        elif numero == '2':
-            print("\n🔄 Ejecutando Ejercicio 2...")
-            if 'df_original' not in resultados_previos:
-                print("⚠️  Ejecutando Ejercicio 1 primero...")
-                df = cargar_dataset(ruta_dataset)
-                df = ejecutar_ejercicio1(df)
-                resultados_previos['df_original'] = df
-            
-            df_baells = ejecutar_ejercicio2(resultados_previos['df_original'])
-            resultados_previos['df_baells'] = df_baells
-            print("✅ Ejercicio 2 completado exitosamente")
-            
-        elif numero == '3':
-            print("\n🔄 Ejecutando Ejercicio 3...")
-            # Ejecutar ejercicios previos si es necesario
-            if 'df_baells' not in resultados_previos:
-                if 'df_original' not in resultados_previos:
-                    print("⚠️  Ejecutando Ejercicio 1 primero...")
-                    df = cargar_dataset(ruta_dataset)
-                    df = ejecutar_ejercicio1(df)
-                    resultados_previos['df_original'] = df
-                
-                print("⚠️  Ejecutando Ejercicio 2 primero...")
-                df_baells = ejecutar_ejercicio2(resultados_previos['df_original'])
-                resultados_previos['df_baells'] = df_baells
-            
-            df_decimal = ejecutar_ejercicio3(resultados_previos['df_baells'])
-            resultados_previos['df_decimal'] = df_decimal
-            print("✅ Ejercicio 3 completado exitosamente")
-            
-        elif numero == '4':
-            print("\n🔄 Ejecutando Ejercicio 4...")
-            # Ejecutar ejercicios previos si es necesario
-            if 'df_decimal' not in resultados_previos:
-                if 'df_original' not in resultados_previos:
-                    print("⚠️  Ejecutando Ejercicio 1 primero...")
-                    df = cargar_dataset(ruta_dataset)
-                    df = ejecutar_ejercicio1(df)
-                    resultados_previos['df_original'] = df
-                
-                if 'df_baells' not in resultados_previos:
-                    print("⚠️  Ejecutando Ejercicio 2 primero...")
-                    df_baells = ejecutar_ejercicio2(resultados_previos['df_original'])
-                    resultados_previos['df_baells'] = df_baells
-                
-                print("⚠️  Ejecutando Ejercicio 3 primero...")
-                df_decimal = ejecutar_ejercicio3(resultados_previos['df_baells'])
-                resultados_previos['df_decimal'] = df_decimal
-            
-            df_suavizado = ejecutar_ejercicio4(resultados_previos['df_decimal'])
-            resultados_previos['df_suavizado'] = df_suavizado
-            print("✅ Ejercicio 4 completado exitosamente")
-            
-        elif numero == '5':
-            print("\n🔄 Ejecutando Ejercicio 5...")
-            # Ejecutar ejercicios previos si es necesario
-            if 'df_suavizado' not in resultados_previos:
-                if 'df_original' not in resultados_previos:
-                    print("⚠️  Ejecutando Ejercicio 1 primero...")
-                    df = cargar_dataset(ruta_dataset)
-                    df = ejecutar_ejercicio1(df)
-                    resultados_previos['df_original'] = df
-                
-                if 'df_baells' not in resultados_previos:
-                    print("⚠️  Ejecutando Ejercicio 2 primero...")
-                    df_baells = ejecutar_ejercicio2(resultados_previos['df_original'])
-                    resultados_previos['df_baells'] = df_baells
-                
-                if 'df_decimal' not in resultados_previos:
-                    print("⚠️  Ejecutando Ejercicio 3 primero...")
-                    df_decimal = ejecutar_ejercicio3(resultados_previos['df_baells'])
-                    resultados_previos['df_decimal'] = df_decimal
-                
-                print("⚠️  Ejecutando Ejercicio 4 primero...")
-                df_suavizado = ejecutar_ejercicio4(resultados_previos['df_decimal'])
-                resultados_previos['df_suavizado'] = df_suavizado
-            
-            periodos, df_info = ejecutar_ejercicio5(resultados_previos['df_suavizado'])
-            resultados_previos['periodos'] = periodos
-            resultados_previos['df_info_periodos'] = df_info
-            print("✅ Ejercicio 5 completado exitosamente")
+        print(f"\n🔄 Ejecutando Ejercicio {numero}...")
+        almacen = crear_almacen(ruta_dataset) if cache else None
+        ejecutar_ejercicios([int(numero)], resultados_previos, ruta_dataset, almacen=almacen,
+                            cache_dataset=cache)
+        print(f"✅ Ejercicio {numero} completado exitosamente")
             
     except Exception as e:
         print(f"❌ Error ejecutando Ejercicio {numero}: {str(e)}")
@@ -262,9 +261,9 @@ def ejecutar_todos_los_ejercicios(ruta_dataset):
         print(f"   • Datos procesados: {len(resultados.get('df_suavizado', []))} registros")
 
 
-def main():
+def menu_interactivo():
     """
-    Función principal del programa.
+    Ejecuta el programa en modo interactivo (menú de ejercicios).
     """
     print("="*60)
     print("PEC4 - ANÁLISIS DE DATOS DE EMBALSES DE CATALUNYA")
@@ -303,8 +302,560 @@ def main():
                 break
 
 
+def crear_almacen(ruta_dataset, window_length=1500, polyorder=3, umbral=60, max_hueco=None):
+    """
+    Crea la caché en disco de las etapas para un dataset y unos parámetros.
+    
+    Parameters
+    ----------
+    ruta_dataset : str
+        Ruta al archivo de dataset.
+    window_length, polyorder : int
+        Parámetros del suavizado del ejercicio 4.
+    umbral : float
+        Umbral de sequía del ejercicio 5.
+    max_hueco : int, optional
+        Huecos que se rellenan antes del suavizado del ejercicio 4.
+        
+    Returns
+    -------
+    AlmacenEtapas
+        Caché de las etapas (en '.cache/etapas' junto al CSV).
+    """
+    from src.cache_etapas import AlmacenEtapas
+    return AlmacenEtapas(ruta_dataset, {'window_length': window_length, 'polyorder': polyorder,
+                                        'umbral': umbral, 'max_hueco': max_hueco})
+
+
+def _etapa_ejercicio1(ruta_dataset, cache_dataset):
+    """Etapa del ejercicio 1: carga el CSV (con su caché columnar si se pide) y hace el EDA."""
+    return ejecutar_ejercicio1(cargar_dataset(ruta_dataset, cache=cache_dataset))
+
+
+def _etapa_ejercicio2(df_original):
+    """Etapa del ejercicio 2: limpieza y filtrado de La Baells."""
+    return ejecutar_ejercicio2(df_original)
+
+
+def _etapa_ejercicio2_bloques(ruta_dataset, tamano_bloque):
+    """Etapa del ejercicio 2 leyendo el CSV por bloques (sin el dataset completo)."""
+    return cargar_estaciones_en_bloques(ruta_dataset, tamano_bloque=tamano_bloque)
+
+
+def _etapa_ejercicio3(df_baells):
+    """Etapa del ejercicio 3 sin el gráfico (ver _etapa_grafico_volumen)."""
+    return ejecutar_ejercicio3(df_baells, visualizar=False)
+
+
+def _etapa_grafico_volumen(df_decimal, directorio, renderizador):
+    """Gráfico del ejercicio 3; devuelve la ruta de la imagen (un Future con renderizador)."""
+    if renderizador is None:
+        return visualizar_evolucion_volumen(df_decimal, directorio=directorio)
+    # Al proceso de dibujo solo se copian las columnas que se dibujan
+    return renderizador.enviar('src.ejercicio3', 'visualizar_evolucion_volumen',
+                               df_decimal[['dia_decimal', 'nivell_perc']], directorio=directorio)
+
+
+def _etapa_ejercicio4(df_decimal, window_length, polyorder, max_hueco):
+    """Etapa del ejercicio 4 sin el gráfico; con max_hueco, antes se rellenan los huecos."""
+    if max_hueco is not None:
+        df_decimal = remuestrear_diario(df_decimal, max_hueco)
+    return ejecutar_ejercicio4(df_decimal, window_length, polyorder, visualizar=False)
+
+
+def _etapa_grafico_suavizado(df_suavizado, directorio, renderizador):
+    """Gráfico del ejercicio 4; devuelve la ruta de la imagen (un Future con renderizador)."""
+    if renderizador is None:
+        return visualizar_serie_suavizada(df_suavizado, directorio=directorio)
+    return renderizador.enviar('src.ejercicio4', 'visualizar_serie_suavizada',
+                               df_suavizado[['dia_decimal', 'nivell_perc', 'nivell_perc_suavizado']],
+                               directorio=directorio)
+
+
+def _etapa_ejercicio5(df_suavizado, umbral):
+    """Etapa del ejercicio 5: devuelve (periodos, df_info_periodos)."""
+    return ejecutar_ejercicio5(df_suavizado, umbral)
+
+
+def _etapa_tabla_periodos(df_info_periodos, umbral, directorio):
+    """Guarda la tabla de períodos del ejercicio 5 y devuelve su ruta."""
+    # Por defecto, 'img' en la raíz del proyecto, como los gráficos
+    if directorio is None:
+        directorio = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img')
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f'periodos_sequia_{umbral:g}.csv')
+    df_info_periodos.to_csv(ruta, index=False)
+    return ruta
+
+
+def construir_grafo(bloques=False):
+    """
+    Construye el grafo de etapas de los ejercicios.
+    
+    Cada ejercicio es una etapa con sus entradas y salidas; los gráficos de
+    los ejercicios 3 y 4 y la tabla del 5 son etapas aparte, de modo que
+    solo se generan si se piden y el gráfico del ejercicio 3 puede
+    dibujarse mientras se suaviza la serie del 4. Las etapas reciben los
+    parámetros 'ruta_dataset', 'cache_dataset', 'directorio',
+    'window_length', 'polyorder', 'max_hueco', 'umbral' y 'renderizador'
+    que necesitan.
+    
+    Parameters
+    ----------
+    bloques : bool, optional
+        Si es True, el ejercicio 2 lee el CSV por bloques de 'tamano_bloque'
+        filas y conserva solo La Baells, sin depender del dataset completo
+        del ejercicio 1 (ver ejercicio2.cargar_estaciones_en_bloques).
+    
+    Returns
+    -------
+    GrafoEtapas
+        Grafo con las etapas registradas.
+    """
+    from src.grafo_etapas import GrafoEtapas
+    grafo = GrafoEtapas()
+    grafo.registrar('ejercicio1', _etapa_ejercicio1, salidas=('df_original',),
+                    parametros=('ruta_dataset', 'cache_dataset'), descripcion='Ejercicio 1')
+    if bloques:
+        grafo.registrar('ejercicio2', _etapa_ejercicio2_bloques, salidas=('df_baells',),
+                        parametros=('ruta_dataset', 'tamano_bloque'), cache='df_baells',
+                        descripcion='Ejercicio 2 (por bloques)')
+    else:
+        grafo.registrar('ejercicio2', _etapa_ejercicio2, entradas=('df_original',),
+                        salidas=('df_baells',), cache='df_baells', descripcion='Ejercicio 2')
+    grafo.registrar('ejercicio3', _etapa_ejercicio3, entradas=('df_baells',),
+                    salidas=('df_decimal',), cache='df_decimal', descripcion='Ejercicio 3')
+    grafo.registrar('grafico_volumen', _etapa_grafico_volumen, entradas=('df_decimal',),
+                    parametros=('directorio', 'renderizador'), descripcion='Ejercicio 3 (gráfico)')
+    grafo.registrar('ejercicio4', _etapa_ejercicio4, entradas=('df_decimal',),
+                    salidas=('df_suavizado',),
+                    parametros=('window_length', 'polyorder', 'max_hueco'),
+                    cache='df_suavizado', descripcion='Ejercicio 4')
+    grafo.registrar('grafico_suavizado', _etapa_grafico_suavizado, entradas=('df_suavizado',),
+                    parametros=('directorio', 'renderizador'), descripcion='Ejercicio 4 (gráfico)')
+    grafo.registrar('ejercicio5', _etapa_ejercicio5, entradas=('df_suavizado',),
+                    salidas=('periodos', 'df_info_periodos'), parametros=('umbral',),
+                    cache='periodos', descripcion='Ejercicio 5')
+    grafo.registrar('tabla_periodos', _etapa_tabla_periodos, entradas=('df_info_periodos',),
+                    parametros=('umbral', 'directorio'), descripcion='Ejercicio 5 (tabla)')
+    return grafo
+
+
+def ejecutar_ejercicios(numeros, resultados, ruta_dataset, window_length=1500, polyorder=3,
+                        umbral=60, directorio=None, almacen=None, tiempos=None, hilos=1,
+                        tabla=False, renderizador=None, cache_dataset=True, max_hueco=None,
+                        tamano_bloque=None):
+    """
+    Ejecuta los ejercicios indicados con el grafo de etapas.
+    
+    Los ejercicios pedidos se ejecutan siempre; de los previos solo se
+    calcula lo que necesitan y no está ya en resultados ni en la caché en
+    disco. Así, con la caché llena, ejecutar el ejercicio 5 en un proceso
+    nuevo solo lee la serie suavizada. No captura los errores.
+    
+    Parameters
+    ----------
+    numeros : iterable of int
+        Ejercicios a ejecutar (1-5).
+    resultados : dict
+        Resultados disponibles; se actualiza en el sitio.
+    ruta_dataset : str
+        Ruta al archivo de dataset.
+    window_length, polyorder : int
+        Parámetros del suavizado del ejercicio 4.
+    umbral : float
+        Umbral de sequía del ejercicio 5.
+    directorio : str, optional
+        Directorio de salida de imágenes y tablas. Por defecto, 'img' en la
+        raíz del proyecto.
+    almacen : AlmacenEtapas, optional
+        Caché en disco de las etapas. Si es None no se usa.
+    tiempos : list, optional
+        Si se indica, se añade {'etapa', 'segundos', 'estado'} por cada
+        etapa ejecutada o leída de la caché.
+    hilos : int, optional
+        Etapas independientes que pueden ejecutarse a la vez (por defecto 1).
+    tabla : bool, optional
+        Si se guarda la tabla de períodos del ejercicio 5 en el directorio.
+    renderizador : RenderizadorGraficos, optional
+        Si se indica, los gráficos se dibujan en sus procesos y en
+        resultados quedan Futures con sus rutas (ver comando_ejecutar).
+    cache_dataset : bool, optional
+        Si el ejercicio 1 lee y guarda la copia columnar del CSV en '.cache'
+        (por defecto True).
+    max_hueco : int, optional
+        Si se indica, antes del suavizado del ejercicio 4 se rellenan por
+        interpolación los huecos de hasta max_hueco días (ver
+        remuestreo.remuestrear_diario).
+    tamano_bloque : int, optional
+        Si se indica, el ejercicio 2 lee el CSV por bloques de ese número
+        de filas en lugar de partir del dataset completo del ejercicio 1.
+    
+    Returns
+    -------
+    dict
+        El diccionario de resultados.
+    """
+    objetivos = [salida for numero in sorted(set(numeros))
+                 for salida in OBJETIVOS_EJERCICIOS[numero]]
+    if tabla and 5 in numeros:
+        objetivos.append('tabla_periodos')
+    parametros = {'ruta_dataset': ruta_dataset, 'cache_dataset': cache_dataset,
+                  'directorio': directorio,
+                  'window_length': window_length, 'polyorder': polyorder,
+                  'max_hueco': max_hueco, 'umbral': umbral, 'renderizador': renderizador,
+                  'tamano_bloque': tamano_bloque}
+    grafo = construir_grafo(bloques=tamano_bloque is not None)
+    return grafo.ejecutar(objetivos, resultados, parametros, almacen, recalcular=objetivos,
+                          hilos=hilos, tiempos=tiempos)
+
+
+def _salida_etapas(silencioso):
+    """Contexto que descarta la salida de las etapas si se pide modo silencioso."""
+    if silencioso:
+        return contextlib.redirect_stdout(io.StringIO())
+    return contextlib.nullcontext()
+
+
+def mostrar_tiempos(tiempos):
+    """
+    Muestra la tabla de tiempos por etapa.
+    
+    Parameters
+    ----------
+    tiempos : list
+        Lista de diccionarios {'etapa', 'segundos', 'estado'}.
+    """
+    print("\n=== Tiempos por etapa ===")
+    for tiempo in tiempos:
+        print(f"  {tiempo['etapa']:<28} {tiempo['segundos']:>8.3f} s  {tiempo['estado']}")
+    print(f"  {'Total':<28} {sum(tiempo['segundos'] for tiempo in tiempos):>8.3f} s")
+
+
+def guardar_tiempos(tiempos, directorio, **extra):
+    """
+    Guarda la tabla de tiempos en 'tiempos.json' dentro del directorio de salida.
+    
+    Parameters
+    ----------
+    tiempos : list
+        Lista de diccionarios {'etapa', 'segundos', 'estado'}.
+    directorio : str
+        Directorio de salida.
+    **extra
+        Campos adicionales del informe (dataset, parámetros...).
+    
+    Returns
+    -------
+    str
+        Ruta del archivo escrito.
+    """
+    ruta = os.path.join(directorio, 'tiempos.json')
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(dict(extra, etapas=tiempos), archivo, ensure_ascii=False, indent=2)
+    return ruta
+
+
+def _directorio_dataset(salida, ruta_dataset, varios):
+    """Directorio de salida de un dataset: un subdirectorio por archivo si hay varios."""
+    if not varios:
+        return salida
+    return os.path.join(salida, os.path.splitext(os.path.basename(ruta_dataset))[0])
+
+
+def comando_ejecutar(args):
+    """
+    Ejecuta los ejercicios pedidos sin interacción para cada dataset.
+    
+    Los ejercicios se ejecutan con el grafo de etapas; los resultados previos
+    que necesitan se leen de la caché de etapas o se calculan. Los gráficos
+    se dibujan en procesos aparte mientras sigue el análisis y se esperan
+    al final, de modo que el tiempo total es el mayor de ambos y no su
+    suma. Si una etapa falla se detiene ese dataset y se pasa al siguiente.
+    
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Argumentos del subcomando 'ejecutar'.
+    
+    Returns
+    -------
+    int
+        Código de salida.
+    """
+    from src.graficos import RenderizadorGraficos
+    
+    codigo = CODIGO_EXITO
+    varios = len(args.dataset) > 1
+    parametros = {'window_length': args.window_length, 'polyorder': args.polyorder,
+                  'umbral': args.umbral, 'max_hueco': args.max_hueco}
+    # Con un solo núcleo los procesos de dibujo compiten con el análisis y no compensan
+    procesos_graficos = args.procesos_graficos
+    if procesos_graficos is None:
+        procesos_graficos = 1 if (os.cpu_count() or 1) > 1 else 0
+    
+    for ruta_dataset in args.dataset:
+        print(f"\n▶ Dataset: {ruta_dataset}")
+        directorio = _directorio_dataset(args.salida, ruta_dataset, varios)
+        os.makedirs(directorio, exist_ok=True)
+        
+        resultados = {}
+        tiempos = []
+        with RenderizadorGraficos(procesos_graficos) as renderizador:
+            renderizador.iniciar()
+            try:
+                with _salida_etapas(args.silencioso):
+                    almacen = None if args.sin_cache else crear_almacen(ruta_dataset, **parametros)
+                    ejecutar_ejercicios(args.ejercicios, resultados, ruta_dataset,
+                                        directorio=directorio, almacen=almacen, tiempos=tiempos,
+                                        hilos=args.hilos, tabla=True, renderizador=renderizador,
+                                        cache_dataset=not args.sin_cache,
+                                        tamano_bloque=args.bloques, **parametros)
+            except Exception as e:
+                etapa = next((tiempo['etapa'] for tiempo in tiempos if tiempo['estado'] == 'error'),
+                             'la preparación')
+                print(f"❌ Error en {etapa}: {e}", file=sys.stderr)
+                codigo = CODIGO_ERROR_ETAPA
+            
+            # Los gráficos se han ido dibujando en paralelo: solo se espera a los que falten
+            inicio = time.perf_counter()
+            try:
+                rutas = renderizador.esperar()
+            except Exception as e:
+                tiempos.append({'etapa': 'Gráficos (espera)', 'segundos': time.perf_counter() - inicio,
+                                'estado': 'error'})
+                print(f"❌ Error dibujando los gráficos: {e}", file=sys.stderr)
+                codigo = CODIGO_ERROR_ETAPA
+            else:
+                if rutas:
+                    tiempos.append({'etapa': 'Gráficos (espera)',
+                                    'segundos': time.perf_counter() - inicio, 'estado': 'ok'})
+                if not args.silencioso:
+                    for ruta in rutas:
+                        print(f"Gráfico guardado en: {ruta}")
+        
+        mostrar_tiempos(tiempos)
+        guardar_tiempos(tiempos, directorio, dataset=ruta_dataset,
+                        window_length=args.window_length, polyorder=args.polyorder,
+                        umbral=args.umbral)
+        if 'periodos' in resultados:
+            print(f"Períodos de sequía (umbral {args.umbral:g}%): {resultados['periodos']}")
+    
+    return codigo
+
+
+def comando_lote(args):
+    """
+    Analiza varias estaciones y umbrales por dataset con analisis_lote.
+    
+    Escribe en el directorio de salida 'periodos_sequia.csv' (con una columna
+    'umbral') y 'tiempos.json' y, con --graficos, el gráfico de cada
+    estación y una cuadrícula con todas (ver graficos_lote).
+    
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Argumentos del subcomando 'lote'.
+    
+    Returns
+    -------
+    int
+        Código de salida.
+    """
+    import pandas as pd
+    from src.analisis_lote import ejecutar_lote, tabla_periodos, COLUMNAS_PERIODOS
+    from src.ejercicio5 import calcula_periodos_multiumbral_arrays
+    
+    codigo = CODIGO_EXITO
+    varios = len(args.dataset) > 1
+    
+    for ruta_dataset in args.dataset:
+        print(f"\n▶ Dataset: {ruta_dataset}")
+        directorio = _directorio_dataset(args.salida, ruta_dataset, varios)
+        os.makedirs(directorio, exist_ok=True)
+        tiempos = []
+        
+        try:
+            inicio = time.perf_counter()
+            with _salida_etapas(args.silencioso):
+                df = cargar_dataset(ruta_dataset, cache=not args.sin_cache)
+            tiempos.append({'etapa': 'Carga', 'segundos': time.perf_counter() - inicio,
+                            'estado': 'ok'})
+            
+            inicio = time.perf_counter()
+            with _salida_etapas(args.silencioso):
+                # Solo se suaviza: los umbrales se calculan todos juntos a continuación
+                _, df_suavizado, metricas = ejecutar_lote(
+                    df, args.estaciones, args.window_length, args.polyorder, umbral=None,
+                    procesos=args.procesos, max_hueco=args.max_hueco)
+            tiempos.append({'etapa': 'Suavizado por estación', 'segundos': time.perf_counter() - inicio,
+                            'estado': 'ok'})
+            
+            # Todos los umbrales en una pasada por estación sobre la serie ya suavizada
+            inicio = time.perf_counter()
+            filas = []
+            for estacion, grupo in df_suavizado.groupby('estacio', observed=True, sort=False):
+                por_umbral = calcula_periodos_multiumbral_arrays(
+                    grupo['dia_decimal'].values, grupo['nivell_perc_suavizado'].values, args.umbrales)
+                for umbral, periodos in por_umbral.items():
+                    filas.extend(dict(fila, umbral=umbral) for fila in tabla_periodos(estacion, periodos))
+            df_periodos = pd.DataFrame(filas, columns=['umbral'] + COLUMNAS_PERIODOS)
+            df_periodos.to_csv(os.path.join(directorio, 'periodos_sequia.csv'), index=False)
+            tiempos.append({'etapa': 'Períodos de sequía', 'segundos': time.perf_counter() - inicio,
+                            'estado': 'ok'})
+            
+            if args.graficos:
+                from src.graficos_lote import visualizar_estaciones, visualizar_cuadricula
+                inicio = time.perf_counter()
+                with _salida_etapas(args.silencioso):
+                    visualizar_estaciones(df_suavizado, args.estaciones, directorio=directorio,
+                                          umbral=args.umbrales[0])
+                    visualizar_cuadricula(df_suavizado, args.estaciones, directorio=directorio,
+                                          umbral=args.umbrales[0])
+                tiempos.append({'etapa': 'Gráficos por estación',
+                                'segundos': time.perf_counter() - inicio, 'estado': 'ok'})
+        except Exception as e:
+            tiempos.append({'etapa': 'Error', 'segundos': time.perf_counter() - inicio,
+                            'estado': 'error'})
+            print(f"❌ Error analizando {ruta_dataset}: {e}", file=sys.stderr)
+            codigo = CODIGO_ERROR_ETAPA
+        else:
+            print(f"Estaciones analizadas: {metricas['estaciones']}, "
+                  f"períodos encontrados: {len(df_periodos)}")
+        
+        mostrar_tiempos(tiempos)
+        guardar_tiempos(tiempos, directorio, dataset=ruta_dataset, umbrales=list(args.umbrales),
+                        window_length=args.window_length, polyorder=args.polyorder)
+    
+    return codigo
+
+
+def construir_parser():
+    """
+    Construye el analizador de argumentos de la línea de comandos.
+    
+    Returns
+    -------
+    argparse.ArgumentParser
+        Parser con los subcomandos 'ejecutar', 'lote' y 'menu'.
+    """
+    parser = argparse.ArgumentParser(
+        description='PEC4 - Análisis de datos de embalses de Catalunya. '
+                    'Sin argumentos se muestra el menú interactivo.')
+    parser.add_argument('-e', '--ejercicio', type=int, choices=range(1, 6),
+                        help='Ejecuta sin interacción los ejercicios 1 a N (atajo de "ejecutar --hasta N")')
+    subparsers = parser.add_subparsers(dest='comando')
+    
+    # Opciones comunes a los subcomandos no interactivos
+    comun = argparse.ArgumentParser(add_help=False)
+    comun.add_argument('-d', '--dataset', nargs='+',
+                       help='Uno o varios CSV de entrada (por defecto, el de las rutas habituales)')
+    comun.add_argument('-o', '--salida', default='img',
+                       help='Directorio de salida; con varios datasets, un subdirectorio por '
+                            'archivo (por defecto img)')
+    comun.add_argument('--window-length', type=int, default=1500,
+                       help='Ventana del filtro Savitzky-Golay (por defecto 1500)')
+    comun.add_argument('--polyorder', type=int, default=3,
+                       help='Orden del polinomio del filtro (por defecto 3)')
+    comun.add_argument('--max-hueco', type=int,
+                       help='Rellena por interpolación huecos de hasta N días antes de suavizar '
+                            '(por defecto no se rellenan)')
+    comun.add_argument('--sin-cache', action='store_true',
+                       help='No lee ni guarda nada en la caché en disco: ni la copia columnar '
+                            'del CSV ni, con "ejecutar", los resultados de las etapas')
+    comun.add_argument('-q', '--silencioso', action='store_true',
+                       help='Muestra solo el resumen y los tiempos por etapa')
+    
+    ejecutar = subparsers.add_parser('ejecutar', parents=[comun],
+                                     help='Ejecuta ejercicios de La Baells sin interacción')
+    grupo = ejecutar.add_mutually_exclusive_group()
+    grupo.add_argument('--ejercicios', type=int, nargs='+', choices=range(1, 6),
+                       help='Ejercicios a ejecutar (por defecto todos); los previos necesarios '
+                            'se ejecutan también')
+    grupo.add_argument('--hasta', type=int, choices=range(1, 6),
+                       help='Ejecuta los ejercicios 1 a N')
+    ejecutar.add_argument('--umbral', type=float, default=60,
+                          help='Umbral de sequía en %% (por defecto 60)')
+    ejecutar.add_argument('--procesos-graficos', type=int,
+                          help='Procesos que dibujan los gráficos en paralelo al análisis; '
+                               '0 los dibuja en el momento (por defecto 1 si hay más de un '
+                               'núcleo y 0 si no)')
+    ejecutar.add_argument('--bloques', type=int, metavar='N',
+                          help='El ejercicio 2 lee el CSV por bloques de N filas y conserva '
+                               'solo La Baells, sin cargar el dataset completo (si se pide el '
+                               'ejercicio 1, este sí lo carga)')
+    ejecutar.add_argument('--hilos', type=int, default=1,
+                          help='Etapas independientes ejecutadas a la vez, por ejemplo el gráfico '
+                               'del ejercicio 3 y el suavizado del 4 (por defecto 1)')
+    
+    lote = subparsers.add_parser('lote', parents=[comun],
+                                 help='Analiza varias estaciones y umbrales sin interacción')
+    lote.add_argument('-s', '--estaciones', nargs='+',
+                      help='Nombres limpios de las estaciones (por defecto todas)')
+    lote.add_argument('-u', '--umbrales', type=float, nargs='+', default=[60],
+                      help='Umbrales de sequía en %% (por defecto 60)')
+    lote.add_argument('-p', '--procesos', type=int, default=1,
+                      help='Procesos para el análisis por estación (por defecto 1)')
+    lote.add_argument('--graficos', action='store_true',
+                      help='Guarda el gráfico de cada estación y una cuadrícula con todas')
+    
+    subparsers.add_parser('menu', help='Menú interactivo (igual que sin argumentos)')
+    return parser
+
+
+def main(argv=None):
+    """
+    Función principal del programa.
+    
+    Sin argumentos muestra el menú interactivo; con un subcomando se ejecuta
+    sin interacción y devuelve un código de salida.
+    
+    Parameters
+    ----------
+    argv : list, optional
+        Argumentos de la línea de comandos (por defecto sys.argv[1:]).
+    
+    Returns
+    -------
+    int
+        Código de salida (ver CODIGO_*).
+    """
+    parser = construir_parser()
+    args = parser.parse_args(argv)
+    
+    if args.ejercicio is not None:
+        if args.comando is not None:
+            parser.error("-e/--ejercicio no se puede combinar con un subcomando")
+        args = parser.parse_args(['ejecutar', '--hasta', str(args.ejercicio)])
+    
+    if args.comando in (None, 'menu'):
+        menu_interactivo()
+        return CODIGO_EXITO
+    
+    if args.dataset is None:
+        ruta = buscar_dataset()
+        if ruta is None:
+            print("❌ No se encontró el dataset en las rutas por defecto; usa --dataset",
+                  file=sys.stderr)
+            return CODIGO_SIN_DATASET
+        args.dataset = [ruta]
+    faltan = [ruta for ruta in args.dataset if not os.path.exists(ruta)]
+    if faltan:
+        print(f"❌ No se encontró el archivo: {', '.join(faltan)}", file=sys.stderr)
+        return CODIGO_SIN_DATASET
+    args.dataset = [os.path.abspath(ruta) for ruta in args.dataset]
+    
+    if args.comando == 'ejecutar':
+        if args.hasta is not None:
+            args.ejercicios = list(range(1, args.hasta + 1))
+        elif args.ejercicios is None:
+            args.ejercicios = [1, 2, 3, 4, 5]
+        return comando_ejecutar(args)
+    return comando_lote(args)
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
 # =============================================================================
 # CAMBIOS NECESARIOS EN LOS OTROS ARCHIVOS:
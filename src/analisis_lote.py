@@ -0,0 +1,341 @@
+"""
+Módulo analisis_lote: Análisis de todos los embalses en una sola pasada.
+
+Este módulo encadena los pasos de los ejercicios 2 a 5 (limpieza, conversión
+de fechas, año decimal, suavizado y detección de sequías) para todas las
+estaciones del dataset, compartiendo el DataFrame ya parseado en lugar de
+repetir el flujo de La Baells para cada embalse.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .ejercicio2 import renombrar_columnas, limpiar_nombres_pantanos, indexar_estaciones
+    from .ejercicio3 import convertir_a_datetime, crear_columna_dia_decimal
+    from .ejercicio4 import suavizar_valores
+    from .ejercicio5 import calcula_periodos_arrays
+    from .remuestreo import remuestrear_diario
+    from . import orden_temporal  # noqa: F401  (registra df.tiempo)
+except ImportError:
+    from ejercicio2 import renombrar_columnas, limpiar_nombres_pantanos, indexar_estaciones
+    from ejercicio3 import convertir_a_datetime, crear_columna_dia_decimal
+    from ejercicio4 import suavizar_valores
+    from ejercicio5 import calcula_periodos_arrays
+    from remuestreo import remuestrear_diario
+    import orden_temporal  # noqa: F401  (registra df.tiempo)
+
+
+COLUMNAS_PERIODOS = ['estacio', 'periodo', 'inicio', 'fin', 'duracion_anios']
+
+
+def preparar_dataset(df):
+    """
+    Aplica una sola vez a todo el dataset los pasos comunes a las estaciones.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame original tal como lo devuelve cargar_dataset().
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame con columnas renombradas, nombres limpios, 'dia' como
+        datetime y la columna 'dia_decimal'.
+    """
+    df_renamed = renombrar_columnas(df)
+    df_limpio = limpiar_nombres_pantanos(df_renamed)
+    df_datetime = convertir_a_datetime(df_limpio)
+    return crear_columna_dia_decimal(df_datetime)
+
+
+def ordenar_estacion(df_estacion):
+    """
+    Devuelve las filas de una estación ordenadas por 'dia_decimal'.
+
+    Parameters
+    ----------
+    df_estacion : pd.DataFrame
+        Filas de una estación con la columna 'dia_decimal'.
+
+    Returns
+    -------
+    pd.DataFrame
+        Copia ordenada con índice continuo, marcada como ordenada en
+        df.tiempo.
+    """
+    df_ordenado = df_estacion.tiempo.ordenar('dia_decimal').reset_index(drop=True)
+    return df_ordenado.tiempo.marcar_ordenado('dia_decimal')
+
+
+def analizar_estacion(df_estacion, window_length=1500, polyorder=3, umbral=60):
+    """
+    Suaviza la serie de una estación y calcula sus períodos de sequía.
+
+    Parameters
+    ----------
+    df_estacion : pd.DataFrame
+        Filas de una estación con 'dia_decimal' y 'nivell_perc'.
+    window_length : int
+        Longitud de la ventana del filtro Savitzky-Golay.
+    polyorder : int
+        Orden del polinomio del filtro.
+    umbral : float or None
+        Porcentaje umbral para definir sequía. Si es None solo se suaviza y
+        la lista de períodos queda vacía.
+
+    Returns
+    -------
+    tuple
+        Tupla con (df_suavizado, periodos), donde df_suavizado está ordenado
+        por 'dia_decimal' e incluye 'nivell_perc_suavizado'.
+    """
+    df_suavizado = ordenar_estacion(df_estacion)
+
+    suavizado = suavizar_valores(df_suavizado['nivell_perc'].values, window_length, polyorder)
+    df_suavizado['nivell_perc_suavizado'] = suavizado
+
+    if umbral is None:
+        return df_suavizado, []
+    periodos = calcula_periodos_arrays(df_suavizado['dia_decimal'].values, suavizado, umbral)
+    return df_suavizado, periodos
+
+
+def _trabajo_estacion(nombre_memoria, total, inicio, fin, window_length, polyorder, umbral):
+    """
+    Analiza una estación dentro de un proceso trabajador.
+
+    Lee las fechas y valores de la estación desde la memoria compartida,
+    escribe allí la serie suavizada y devuelve solo la lista de períodos.
+
+    Parameters
+    ----------
+    nombre_memoria : str
+        Nombre del bloque de memoria compartida.
+    total : int
+        Número total de filas (de todas las estaciones) en el bloque.
+    inicio, fin : int
+        Posiciones de la estación dentro del bloque.
+    window_length, polyorder, umbral
+        Parámetros del suavizado y de la detección de sequías (sin umbral
+        solo se suaviza).
+
+    Returns
+    -------
+    list
+        Lista de períodos de sequía de la estación.
+    """
+    memoria = shared_memory.SharedMemory(name=nombre_memoria)
+    try:
+        datos = np.ndarray((3, total), dtype=np.float64, buffer=memoria.buf)
+        dia_decimal = datos[0, inicio:fin]
+        suavizado = suavizar_valores(datos[1, inicio:fin], window_length, polyorder)
+        datos[2, inicio:fin] = suavizado
+        periodos = ([] if umbral is None
+                    else calcula_periodos_arrays(dia_decimal, suavizado, umbral))
+        del datos, dia_decimal
+    finally:
+        memoria.close()
+    return periodos
+
+
+def _analizar_en_paralelo(bloques, procesos, window_length, polyorder, umbral):
+    """
+    Reparte el suavizado y la detección de sequías entre varios procesos.
+
+    Las fechas y los valores de todas las estaciones se copian una sola vez
+    a un bloque de memoria compartida; cada trabajador recibe únicamente el
+    nombre del bloque y las posiciones de su estación, y los resultados se
+    recogen en el mismo orden en que se enviaron.
+
+    Parameters
+    ----------
+    bloques : list
+        DataFrames de cada estación ordenados por 'dia_decimal'.
+    procesos : int
+        Número de procesos trabajadores.
+    window_length, polyorder, umbral
+        Parámetros del suavizado y de la detección de sequías.
+
+    Returns
+    -------
+    tuple
+        Tupla con (suavizados, periodos): listas, en el orden de bloques, con
+        el array suavizado y los períodos de cada estación.
+    """
+    longitudes = [len(bloque) for bloque in bloques]
+    limites = np.concatenate([[0], np.cumsum(longitudes)])
+    total = int(limites[-1])
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(3 * total * 8, 1))
+    try:
+        datos = np.ndarray((3, total), dtype=np.float64, buffer=memoria.buf)
+        for bloque, inicio, fin in zip(bloques, limites[:-1], limites[1:]):
+            datos[0, inicio:fin] = bloque['dia_decimal'].values
+            datos[1, inicio:fin] = bloque['nivell_perc'].values
+
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            futuros = [ejecutor.submit(_trabajo_estacion, memoria.name, total, int(inicio),
+                                       int(fin), window_length, polyorder, umbral)
+                       for inicio, fin in zip(limites[:-1], limites[1:])]
+            periodos = [futuro.result() for futuro in futuros]
+
+        suavizados = [datos[2, inicio:fin].copy()
+                      for inicio, fin in zip(limites[:-1], limites[1:])]
+        del datos
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+    return suavizados, periodos
+
+
+def tabla_periodos(estacion, periodos):
+    """
+    Convierte la lista de períodos de una estación en filas de la tabla de resultados.
+
+    Parameters
+    ----------
+    estacion : str
+        Nombre de la estación.
+    periodos : list
+        Lista de períodos [inicio, fin] en años decimales.
+
+    Returns
+    -------
+    list
+        Lista de diccionarios con las columnas de COLUMNAS_PERIODOS.
+    """
+    return [{'estacio': estacion, 'periodo': numero, 'inicio': inicio, 'fin': fin,
+             'duracion_anios': round(fin - inicio, 2)}
+            for numero, (inicio, fin) in enumerate(periodos, 1)]
+
+
+def ejecutar_lote(df, estaciones=None, window_length=1500, polyorder=3, umbral=60,
+                  procesos=1, max_hueco=None):
+    """
+    Ejecuta el análisis de sequías para todas las estaciones del dataset.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame original tal como lo devuelve cargar_dataset().
+    estaciones : list, optional
+        Nombres limpios de las estaciones a analizar. Por defecto, todas.
+    window_length : int
+        Longitud de la ventana del filtro Savitzky-Golay.
+    polyorder : int
+        Orden del polinomio del filtro.
+    umbral : float or None
+        Porcentaje umbral para definir sequía. Si es None solo se suavizan
+        las series y la tabla de períodos queda vacía (por ejemplo, para
+        calcular después varios umbrales con
+        ejercicio5.calcula_periodos_multiumbral_arrays).
+    procesos : int
+        Número de procesos para el análisis por estación (por defecto 1, sin
+        paralelismo). Los resultados no dependen del número de procesos.
+    max_hueco : int, optional
+        Si se indica, antes de suavizar se completan por interpolación los
+        huecos de hasta max_hueco días de cada estación (ver
+        remuestreo.remuestrear_diario).
+
+    Returns
+    -------
+    tuple
+        Tupla con (df_periodos, df_suavizado, metricas): la tabla combinada
+        de períodos de sequía, las series suavizadas de todas las estaciones
+        y un diccionario con el rendimiento del lote.
+    """
+    print("\n" + "="*50)
+    print("ANÁLISIS EN LOTE DE TODOS LOS EMBALSES")
+    print("="*50)
+
+    inicio_lote = time.perf_counter()
+    df_decimal = preparar_dataset(df)
+    if max_hueco is not None:
+        df_decimal = remuestrear_diario(df_decimal, max_hueco)
+    indice = indexar_estaciones(df_decimal)
+    if max_hueco is not None:
+        # remuestrear_diario deja cada estación en orden de fecha y el índice lo conserva
+        for df_estacion in indice.values():
+            df_estacion.tiempo.marcar_ordenado('dia_decimal')
+
+    if estaciones is None:
+        estaciones = list(indice)
+
+    print("\n=== Suavizado y períodos de sequía por estación ===" if umbral is not None
+          else "\n=== Suavizado por estación ===")
+    inicio_estaciones = time.perf_counter()
+    validas = []
+    for estacion in estaciones:
+        df_estacion = indice.get(estacion)
+        # suavizar_valores reduce la ventana al mayor impar que cabe en la serie;
+        # si esa ventana no supera polyorder el filtro no se puede aplicar
+        ventana = (min(window_length, len(df_estacion) // 2 * 2 - 1)
+                   if df_estacion is not None else 0)
+        if ventana <= polyorder:
+            print(f"Advertencia: '{estacion}' no tiene datos suficientes, se omite")
+            continue
+        validas.append(estacion)
+
+    if procesos > 1 and len(validas) > 1:
+        print(f"Repartiendo {len(validas)} estaciones entre {procesos} procesos")
+        series = [ordenar_estacion(indice[estacion]) for estacion in validas]
+        suavizados, lista_periodos = _analizar_en_paralelo(series, procesos, window_length,
+                                                           polyorder, umbral)
+        for df_suavizado, suavizado in zip(series, suavizados):
+            df_suavizado['nivell_perc_suavizado'] = suavizado
+    else:
+        resultados = [analizar_estacion(indice[estacion], window_length, polyorder, umbral)
+                      for estacion in validas]
+        series = [df_suavizado for df_suavizado, _ in resultados]
+        lista_periodos = [periodos for _, periodos in resultados]
+
+    filas_periodos = []
+    for estacion, df_suavizado, periodos in zip(validas, series, lista_periodos):
+        filas_periodos.extend(tabla_periodos(estacion, periodos))
+        print(f"  {estacion}: {len(df_suavizado)} registros"
+              + (f", {len(periodos)} períodos" if umbral is not None else ""))
+    analizadas = len(validas)
+
+    fin_lote = time.perf_counter()
+
+    df_periodos = pd.DataFrame(filas_periodos, columns=COLUMNAS_PERIODOS)
+    if series:
+        df_suavizado = pd.concat(series, ignore_index=True)
+        df_suavizado['estacio'] = df_suavizado['estacio'].astype('category')
+    else:
+        df_suavizado = df_decimal.iloc[0:0]
+
+    segundos_estaciones = fin_lote - inicio_estaciones
+    metricas = {
+        'estaciones': analizadas,
+        'procesos': procesos,
+        'segundos_total': fin_lote - inicio_lote,
+        'segundos_estaciones': segundos_estaciones,
+        'estaciones_por_segundo': (analizadas / segundos_estaciones
+                                   if segundos_estaciones > 0 else float('inf'))
+    }
+
+    print("\n=== Rendimiento del lote ===")
+    print(f"Estaciones analizadas: {metricas['estaciones']}")
+    print(f"Tiempo total: {metricas['segundos_total']:.2f} s")
+    print(f"Estaciones por segundo: {metricas['estaciones_por_segundo']:.1f}")
+    if umbral is not None:
+        print(f"Períodos de sequía encontrados: {len(df_periodos)}")
+
+    return df_periodos, df_suavizado, metricas
+
+
+if __name__ == "__main__":
+    # Si se ejecuta este archivo directamente
+    from ejercicio1 import cargar_dataset
+
+    df = cargar_dataset()
+    df_periodos, df_suavizado, metricas = ejecutar_lote(df)
+    print(df_periodos)
@@ -0,0 +1,205 @@
+"""
+Módulo cache_etapas: Caché en disco de los resultados de cada ejercicio.
+
+Guarda la salida de los ejercicios 2 a 5 ('df_baells', 'df_decimal',
+'df_suavizado' y 'periodos') con una clave calculada a partir del contenido
+del CSV de entrada y de los parámetros de esa etapa y de las anteriores.
+Así, al ejecutar el ejercicio 5 en un proceso nuevo basta con leer la serie
+suavizada en lugar de repetir los ejercicios 1 a 4, y cambiar por ejemplo
+el umbral solo invalida la última etapa.
+"""
+
+import hashlib
+import json
+import os
+
+try:
+    from .ejercicio1 import huella_archivo, guardar_columnar, leer_columnar, DIRECTORIO_CACHE
+    from . import orden_temporal  # noqa: F401  (registra df.tiempo)
+except ImportError:
+    from ejercicio1 import huella_archivo, guardar_columnar, leer_columnar, DIRECTORIO_CACHE
+    import orden_temporal  # noqa: F401  (registra df.tiempo)
+
+
+# Incrementar cuando cambie el resultado de alguna etapa para no reutilizar
+# artefactos calculados con el código anterior
+VERSION_CACHE = 1
+
+# Etapas en orden de dependencia y parámetros que afectan a cada una
+PARAMETROS_ETAPAS = {
+    'df_baells': (),
+    'df_decimal': (),
+    'df_suavizado': ('window_length', 'polyorder', 'max_hueco'),
+    'periodos': ('umbral',),
+}
+
+PARAMETROS_DEFECTO = {'window_length': 1500, 'polyorder': 3, 'max_hueco': None, 'umbral': 60}
+
+
+def _escribir_json_atomico(ruta, datos):
+    """Escribe un archivo JSON de forma atómica."""
+    ruta_temporal = ruta + '.tmp'
+    with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo)
+    os.replace(ruta_temporal, ruta)
+
+
+def clave_etapa(clave_entrada, etapa, parametros):
+    """
+    Calcula la clave de una etapa a partir de la de su entrada.
+
+    Parameters
+    ----------
+    clave_entrada : str
+        Hash del CSV (primera etapa) o clave de la etapa anterior.
+    etapa : str
+        Nombre de la etapa.
+    parametros : dict
+        Parámetros propios de la etapa.
+
+    Returns
+    -------
+    str
+        Hash hexadecimal (blake2b de 16 bytes).
+    """
+    contenido = json.dumps({'version': VERSION_CACHE, 'entrada': clave_entrada,
+                            'etapa': etapa, 'parametros': parametros}, sort_keys=True)
+    return hashlib.blake2b(contenido.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class AlmacenEtapas:
+    """
+    Caché en disco, direccionada por contenido, de las etapas de un dataset.
+
+    Cada artefacto se guarda como '<etapa>-<clave>' (datos en formato
+    columnar y un JSON con los metadatos, que se escribe el último). Las
+    claves de distintos parámetros conviven en el directorio.
+
+    Parameters
+    ----------
+    ruta_dataset : str
+        Ruta al CSV de entrada.
+    parametros : dict, optional
+        'window_length', 'polyorder', 'max_hueco' y 'umbral' (por defecto
+        los de los ejercicios, sin relleno de huecos).
+    directorio : str, optional
+        Directorio de la caché. Por defecto '.cache/etapas' junto al CSV.
+    """
+
+    def __init__(self, ruta_dataset, parametros=None, directorio=None):
+        self.ruta_dataset = os.path.abspath(ruta_dataset)
+        if directorio is None:
+            directorio = os.path.join(os.path.dirname(self.ruta_dataset), DIRECTORIO_CACHE,
+                                      'etapas')
+        self.directorio = directorio
+        self.parametros = dict(PARAMETROS_DEFECTO, **(parametros or {}))
+        self._claves = None
+
+    def _huella_dataset(self):
+        """Hash del CSV, reutilizando el guardado si no cambian tamaño ni fecha."""
+        nombre_base = os.path.splitext(os.path.basename(self.ruta_dataset))[0]
+        ruta_huella = os.path.join(self.directorio, f"huella-{nombre_base}.json")
+        huella_previa = None
+        try:
+            with open(ruta_huella, 'r', encoding='utf-8') as archivo:
+                huella_previa = json.load(archivo)
+        except (OSError, ValueError):
+            pass
+
+        huella = huella_archivo(self.ruta_dataset, huella_previa)
+        if huella != huella_previa:
+            try:
+                os.makedirs(self.directorio, exist_ok=True)
+                _escribir_json_atomico(ruta_huella, huella)
+            except OSError as error:
+                print(f"Advertencia: no se pudo escribir la caché en {self.directorio}: {error}")
+        return huella['hash']
+
+    def clave(self, etapa):
+        """
+        Clave de una etapa: depende del CSV y de los parámetros de esa etapa y las previas.
+
+        Parameters
+        ----------
+        etapa : str
+            Una de las etapas de PARAMETROS_ETAPAS.
+
+        Returns
+        -------
+        str
+            Clave hexadecimal.
+        """
+        if self._claves is None:
+            claves = {}
+            clave_entrada = self._huella_dataset()
+            for nombre, parametros in PARAMETROS_ETAPAS.items():
+                clave_entrada = clave_etapa(clave_entrada, nombre,
+                                            {parametro: self.parametros[parametro]
+                                             for parametro in parametros})
+                claves[nombre] = clave_entrada
+            self._claves = claves
+        return self._claves[etapa]
+
+    def _ruta(self, etapa):
+        return os.path.join(self.directorio, f"{etapa}-{self.clave(etapa)}")
+
+    def cargar(self, etapa):
+        """
+        Lee el resultado guardado de una etapa.
+
+        Parameters
+        ----------
+        etapa : str
+            Nombre de la etapa.
+
+        Returns
+        -------
+        object or None
+            DataFrame (o tupla (periodos, df_info_periodos) para 'periodos'),
+            o None si no está en la caché.
+        """
+        ruta = self._ruta(etapa)
+        try:
+            with open(ruta + '.json', 'r', encoding='utf-8') as archivo:
+                metadatos = json.load(archivo)
+            df = leer_columnar(os.path.join(self.directorio, metadatos['archivo']))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as error:
+            print(f"Advertencia: se ignora la caché de '{etapa}': {error}")
+            return None
+
+        # Los artefactos se guardan ordenados: se conserva la marca de df.tiempo
+        if metadatos.get('ordenado'):
+            df.tiempo.marcar_ordenado('dia_decimal')
+        if etapa == 'periodos':
+            return metadatos['periodos'], df
+        return df
+
+    def guardar(self, etapa, valor):
+        """
+        Guarda el resultado de una etapa (los errores de escritura solo se avisan).
+
+        Parameters
+        ----------
+        etapa : str
+            Nombre de la etapa.
+        valor : object
+            DataFrame, o tupla (periodos, df_info_periodos) para 'periodos'.
+        """
+        metadatos = {'etapa': etapa, 'parametros': self.parametros}
+        if etapa == 'periodos':
+            periodos, df = valor
+            metadatos['periodos'] = [[float(inicio), float(fin)] for inicio, fin in periodos]
+        else:
+            df = valor
+            metadatos['ordenado'] = ('dia_decimal' in df.columns
+                                     and df.tiempo.ordenado('dia_decimal', comprobar=False) is True)
+
+        ruta = self._ruta(etapa)
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            metadatos['archivo'] = os.path.basename(guardar_columnar(df, ruta))
+            _escribir_json_atomico(ruta + '.json', metadatos)
+        except OSError as error:
+            print(f"Advertencia: no se pudo escribir la caché en {self.directorio}: {error}")
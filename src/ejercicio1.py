@@ -6,29 +6,320 @@ de las Cuencas Internas de Catalunya y realizar un análisis exploratorio básic
 """
 
 import pandas as pd
+import numpy as np
+import hashlib
+import importlib.util
+import json
 import os
+import time
 
 
-def cargar_dataset(filepath=None):
+# Esquema de tipos del CSV original: la estación como categoría y las
+# medidas en float32 evitan que pandas tenga que inferir cada columna
+ESQUEMA_DATASET = {
+    'Estació': 'category',
+    'Nivell absolut (msnm)': 'float32',
+    'Percentatge volum embassat (%)': 'float32',
+    'Volum embassat (hm3)': 'float32'
+}
+COLUMNA_FECHA = 'Dia'
+FORMATO_FECHA = '%d/%m/%Y'
+
+# Nombre del directorio de caché que se crea junto al CSV de origen
+DIRECTORIO_CACHE = '.cache'
+
+
+def motor_csv_disponible():
     """
-    Carga el dataset de embalses desde un archivo CSV.
+    Devuelve el motor de lectura CSV más rápido que está instalado.
+    
+    Returns
+    -------
+    str
+        'pyarrow' si la librería está instalada, 'c' en caso contrario.
+    """
+    if importlib.util.find_spec('pyarrow') is not None:
+        return 'pyarrow'
+    return 'c'
+
+
+def _leer_csv_pyarrow(filepath):
+    """
+    Lee el CSV con el lector nativo de pyarrow aplicando ESQUEMA_DATASET.
     
     Parameters
     ----------
-    filepath : str, optional
-        Ruta al archivo CSV con los datos de los embalses.
-        Si no se especifica, busca en la ruta por defecto.
+    filepath : str
+        Ruta al archivo CSV.
         
     Returns
     -------
     pd.DataFrame
-        DataFrame con los datos cargados.
+        DataFrame con los tipos del esquema y la columna 'Dia' como datetime.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    
+    tipos_arrow = {COLUMNA_FECHA: pa.timestamp('ns')}
+    for columna, tipo in ESQUEMA_DATASET.items():
+        if tipo == 'category':
+            tipos_arrow[columna] = pa.dictionary(pa.int32(), pa.string())
+        else:
+            tipos_arrow[columna] = pa.from_numpy_dtype(tipo)
+    
+    opciones = pa_csv.ConvertOptions(column_types=tipos_arrow,
+                                     timestamp_parsers=[FORMATO_FECHA])
+    tabla = pa_csv.read_csv(filepath, convert_options=opciones)
+    return tabla.to_pandas()
+
+
+def _leer_csv_tipado(filepath, motor=None):
+    """
+    Lee el CSV declarando el esquema de tipos y parseando las fechas.
+    
+    Parameters
+    ----------
+    filepath : str
+        Ruta al archivo CSV.
+    motor : str, optional
+        Motor de lectura ('c' o 'pyarrow'). Si no se indica, se usa el
+        más rápido disponible.
         
-    Raises
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame con los tipos del esquema y la columna 'Dia' como datetime.
+    """
+    if motor is None:
+        motor = motor_csv_disponible()
+    
+    if motor == 'pyarrow':
+        return _leer_csv_pyarrow(filepath)
+    
+    # Con el motor C la fecha se lee como categoría y solo se parsean los
+    # días distintos, que son muchos menos que las filas del dataset
+    tipos = dict(ESQUEMA_DATASET, **{COLUMNA_FECHA: 'category'})
+    df = pd.read_csv(filepath, engine=motor, dtype=tipos)
+    return _parsear_fechas_categoricas(df)
+
+
+def _parsear_fechas_categoricas(df):
+    """
+    Convierte la columna 'Dia' leída como categoría a datetime.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame con la columna 'Dia' de tipo category.
+        
+    Returns
+    -------
+    pd.DataFrame
+        El mismo DataFrame con 'Dia' como datetime64.
+    """
+    dias = df[COLUMNA_FECHA].cat
+    fechas_unicas = pd.DatetimeIndex(pd.to_datetime(dias.categories, format=FORMATO_FECHA))
+    fechas = fechas_unicas.take(dias.codes, allow_fill=True, fill_value=pd.NaT)
+    df[COLUMNA_FECHA] = pd.Series(fechas, index=df.index)
+    return df
+
+
+def _iterar_bloques(filepath, tipado, tamano_bloque):
+    """
+    Lee el CSV en bloques de un número máximo de filas.
+    
+    Parameters
+    ----------
+    filepath : str
+        Ruta al archivo CSV.
+    tipado : bool
+        Si se aplica ESQUEMA_DATASET y se parsean las fechas de cada bloque.
+    tamano_bloque : int
+        Número máximo de filas por bloque.
+        
+    Yields
     ------
-    FileNotFoundError
-        Si el archivo no se encuentra en la ruta especificada.
+    pd.DataFrame
+        Cada bloque del CSV.
     """
+    if not tipado:
+        with pd.read_csv(filepath, chunksize=tamano_bloque) as lector:
+            yield from lector
+        return
+    
+    tipos = dict(ESQUEMA_DATASET, **{COLUMNA_FECHA: 'category'})
+    with pd.read_csv(filepath, dtype=tipos, chunksize=tamano_bloque) as lector:
+        for bloque in lector:
+            yield _parsear_fechas_categoricas(bloque)
+
+
+def huella_archivo(filepath, huella_previa=None):
+    """
+    Calcula la huella de un archivo: tamaño, fecha de modificación y hash.
+    
+    Parameters
+    ----------
+    filepath : str
+        Ruta al archivo.
+    huella_previa : dict, optional
+        Huella calculada anteriormente. Si el tamaño y la fecha de
+        modificación coinciden, se reutiliza su hash sin releer el archivo.
+        
+    Returns
+    -------
+    dict
+        Diccionario con 'tamano', 'mtime_ns' y 'hash' (blake2b del contenido).
+    """
+    estado = os.stat(filepath)
+    huella = {'tamano': estado.st_size, 'mtime_ns': estado.st_mtime_ns}
+    
+    if (huella_previa is not None
+            and huella_previa.get('tamano') == huella['tamano']
+            and huella_previa.get('mtime_ns') == huella['mtime_ns']):
+        huella['hash'] = huella_previa['hash']
+        return huella
+    
+    resumen = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1024 * 1024), b''):
+            resumen.update(bloque)
+    huella['hash'] = resumen.hexdigest()
+    return huella
+
+
+def guardar_columnar(df, ruta):
+    """
+    Guarda un DataFrame en formato binario columnar.
+    
+    Usa Feather (Arrow IPC) si pyarrow está instalado y pickle en caso
+    contrario; en ambos casos se conservan los tipos de las columnas.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame a guardar.
+    ruta : str
+        Ruta del archivo sin extensión.
+        
+    Returns
+    -------
+    str
+        Ruta completa del archivo escrito.
+    """
+    if motor_csv_disponible() == 'pyarrow':
+        ruta_final = ruta + '.feather'
+        df.reset_index(drop=True).to_feather(ruta_final)
+    else:
+        ruta_final = ruta + '.pkl'
+        df.to_pickle(ruta_final)
+    return ruta_final
+
+
+def leer_columnar(ruta_final):
+    """
+    Lee un DataFrame guardado con guardar_columnar.
+    
+    Parameters
+    ----------
+    ruta_final : str
+        Ruta completa del archivo (con extensión).
+        
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame leído.
+    """
+    if ruta_final.endswith('.feather'):
+        return pd.read_feather(ruta_final)
+    return pd.read_pickle(ruta_final)
+
+
+def _escribir_json(ruta_indice, indice):
+    """Escribe un archivo JSON de forma atómica."""
+    ruta_temporal = ruta_indice + '.tmp'
+    with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(indice, archivo)
+    os.replace(ruta_temporal, ruta_indice)
+
+
+def _cargar_con_cache(filepath, tipado, motor, directorio_cache=None):
+    """
+    Sirve el dataset desde la caché columnar o la reconstruye si el CSV cambió.
+    
+    La caché guarda un índice JSON por CSV con su huella y la copia binaria
+    asociada. Si el tamaño y la fecha de modificación no han cambiado no se
+    vuelve a calcular el hash del contenido.
+    
+    Parameters
+    ----------
+    filepath : str
+        Ruta al CSV de origen.
+    tipado : bool
+        Modo de carga (se guarda una copia distinta por modo).
+    motor : str
+        Motor de lectura para el modo tipado (también se guarda una copia
+        distinta por motor).
+    directorio_cache : str, optional
+        Directorio de la caché. Por defecto '.cache' junto al CSV.
+        
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame con los datos cargados.
+    """
+    if directorio_cache is None:
+        directorio_cache = os.path.join(os.path.dirname(os.path.abspath(filepath)),
+                                        DIRECTORIO_CACHE)
+    if tipado:
+        motor = motor or motor_csv_disponible()
+        modo = f'tipado-{motor}'
+    else:
+        modo = 'inferido'
+    nombre_base = os.path.splitext(os.path.basename(filepath))[0]
+    ruta_indice = os.path.join(directorio_cache, f"{nombre_base}-{modo}.json")
+    
+    indice = None
+    if os.path.exists(ruta_indice):
+        try:
+            with open(ruta_indice, 'r', encoding='utf-8') as archivo:
+                indice = json.load(archivo)
+        except (OSError, ValueError):
+            indice = None
+    
+    huella = huella_archivo(filepath, indice)
+    
+    if indice is not None and indice['hash'] == huella['hash']:
+        ruta_copia = os.path.join(directorio_cache, indice['archivo'])
+        if os.path.exists(ruta_copia):
+            if indice['mtime_ns'] != huella['mtime_ns']:
+                # Mismo contenido con otra fecha: solo se actualiza el índice
+                indice.update(huella)
+                _escribir_json(ruta_indice, indice)
+            return leer_columnar(ruta_copia)
+    
+    # Caché inexistente u obsoleta: parsear el CSV y reconstruir
+    if tipado:
+        df = _leer_csv_tipado(filepath, motor)
+    else:
+        df = pd.read_csv(filepath)
+    
+    try:
+        os.makedirs(directorio_cache, exist_ok=True)
+        ruta_copia = guardar_columnar(
+            df, os.path.join(directorio_cache, f"{nombre_base}-{modo}-{huella['hash']}"))
+        if indice is not None and indice.get('archivo') != os.path.basename(ruta_copia):
+            copia_antigua = os.path.join(directorio_cache, indice['archivo'])
+            if os.path.exists(copia_antigua):
+                os.remove(copia_antigua)
+        _escribir_json(ruta_indice, dict(huella, archivo=os.path.basename(ruta_copia)))
+    except OSError as error:
+        print(f"Advertencia: no se pudo escribir la caché en {directorio_cache}: {error}")
+    
+    return df
+
+
+def _ruta_dataset(filepath):
+    """Ruta indicada o, por defecto, la del CSV en 'data'; comprueba que exista."""
     if filepath is None:
         # Obtener la ruta del directorio actual del script
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -40,11 +331,275 @@ def cargar_dataset(filepath=None):
     
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"No se encuentra el archivo: {filepath}")
+    return filepath
+
+
+def cargar_dataset(filepath=None, tipado=False, motor=None, cache=False,
+                   directorio_cache=None):
+    """
+    Carga el dataset de embalses desde un archivo CSV.
+    
+    Parameters
+    ----------
+    filepath : str, optional
+        Ruta al archivo CSV con los datos de los embalses.
+        Si no se especifica, busca en la ruta por defecto.
+    tipado : bool, optional
+        Si es True, declara los tipos de ESQUEMA_DATASET durante la lectura
+        y parsea la columna 'Dia' como fecha (por defecto False).
+    motor : str, optional
+        Motor de lectura para el modo tipado ('c' o 'pyarrow'). Por defecto
+        se usa el más rápido disponible.
+    cache : bool, optional
+        Si es True, guarda una copia binaria columnar tras el primer parseo
+        y la reutiliza mientras el CSV no cambie (por defecto False).
+    directorio_cache : str, optional
+        Directorio de la caché. Por defecto '.cache' junto al CSV.
+        
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame con los datos cargados.
+        
+    Raises
+    ------
+    FileNotFoundError
+        Si el archivo no se encuentra en la ruta especificada.
+    """
+    filepath = _ruta_dataset(filepath)
+    
+    if cache:
+        return _cargar_con_cache(filepath, tipado, motor, directorio_cache)
+    
+    if tipado:
+        return _leer_csv_tipado(filepath, motor)
     
     df = pd.read_csv(filepath)
     return df
 
 
+def cargar_dataset_en_bloques(filepath=None, tipado=False, tamano_bloque=100_000):
+    """
+    Lee el dataset de embalses por bloques, sin cargar el archivo entero.
+    
+    Parameters
+    ----------
+    filepath : str, optional
+        Ruta al archivo CSV. Si no se especifica, se usa la ruta por defecto.
+    tipado : bool, optional
+        Si es True, aplica ESQUEMA_DATASET y parsea 'Dia' en cada bloque
+        (siempre con el motor C).
+    tamano_bloque : int, optional
+        Número máximo de filas de cada bloque (por defecto 100000).
+        
+    Returns
+    -------
+    iterator
+        Iterador de DataFrames, uno por bloque.
+        
+    Raises
+    ------
+    FileNotFoundError
+        Si el archivo no se encuentra en la ruta especificada.
+    """
+    return _iterar_bloques(_ruta_dataset(filepath), tipado, tamano_bloque)
+
+
+def medir_carga(filepath=None, tipado=True, motor=None):
+    """
+    Carga el dataset y mide la velocidad de lectura y la memoria ocupada.
+    
+    Parameters
+    ----------
+    filepath : str, optional
+        Ruta al archivo CSV. Si no se especifica, se usa la ruta por defecto.
+    tipado : bool, optional
+        Si se usa la carga con esquema de tipos (por defecto True).
+    motor : str, optional
+        Motor de lectura para el modo tipado.
+        
+    Returns
+    -------
+    tuple
+        Tupla con (dataframe, metricas), donde metricas es un diccionario con
+        'filas', 'segundos', 'filas_por_segundo' y 'bytes_memoria'.
+    """
+    inicio = time.perf_counter()
+    df = cargar_dataset(filepath, tipado=tipado, motor=motor)
+    segundos = time.perf_counter() - inicio
+    
+    metricas = {
+        'modo': 'tipado' if tipado else 'inferido',
+        'filas': len(df),
+        'segundos': segundos,
+        'filas_por_segundo': len(df) / segundos if segundos > 0 else float('inf'),
+        'bytes_memoria': int(df.memory_usage(deep=True).sum())
+    }
+    
+    print(f"\n=== Rendimiento de la carga ({metricas['modo']}) ===")
+    print(f"Filas leídas: {metricas['filas']}")
+    print(f"Tiempo de lectura: {metricas['segundos']:.3f} s")
+    print(f"Filas por segundo: {metricas['filas_por_segundo']:,.0f}")
+    print(f"Memoria ocupada: {metricas['bytes_memoria'] / 1024**2:.2f} MB")
+    
+    return df, metricas
+
+
+def _leer_estado_almacen(directorio_almacen):
+    """
+    Lee el estado de un almacén incremental o devuelve uno vacío.
+    
+    Parameters
+    ----------
+    directorio_almacen : str
+        Directorio del almacén.
+        
+    Returns
+    -------
+    dict
+        Estado con 'huella', 'ultimo_dia', 'partes' y 'contexto'.
+    """
+    ruta_estado = os.path.join(directorio_almacen, 'estado.json')
+    if not os.path.exists(ruta_estado):
+        return {'huella': None, 'ultimo_dia': {}, 'partes': [], 'contexto': None}
+    with open(ruta_estado, 'r', encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def cargar_almacen(directorio_almacen):
+    """
+    Carga todas las filas guardadas en un almacén incremental.
+    
+    Parameters
+    ----------
+    directorio_almacen : str
+        Directorio del almacén creado con ingesta_incremental().
+        
+    Returns
+    -------
+    pd.DataFrame
+        Concatenación de todas las partes del almacén, en orden de ingesta.
+    """
+    estado = _leer_estado_almacen(directorio_almacen)
+    partes = [leer_columnar(os.path.join(directorio_almacen, parte))
+              for parte in estado['partes']]
+    if not partes:
+        return pd.DataFrame(columns=[COLUMNA_FECHA] + list(ESQUEMA_DATASET))
+    df = pd.concat(partes, ignore_index=True)
+    df['Estació'] = df['Estació'].astype('category')
+    return df
+
+
+def ingesta_incremental(filepath, directorio_almacen, filas_contexto=1500,
+                        tamano_bloque=500_000):
+    """
+    Añade a un almacén persistente solo las filas nuevas de una exportación.
+    
+    Cada exportación diaria repite todo el histórico. Esta función lee el CSV
+    por bloques, conserva únicamente las filas con 'Dia' posterior al último
+    día ya ingerido de su estación y las guarda como una parte nueva del
+    almacén. También mantiene las últimas filas de cada estación para que los
+    ejercicios posteriores (por ejemplo el suavizado) dispongan de contexto
+    sin leer el histórico completo. Si el CSV es idéntico al último ingerido
+    no se vuelve a leer.
+    
+    Parameters
+    ----------
+    filepath : str
+        Ruta al CSV exportado.
+    directorio_almacen : str
+        Directorio del almacén (se crea si no existe).
+    filas_contexto : int
+        Número de filas previas por estación que se conservan como contexto.
+    tamano_bloque : int
+        Número máximo de filas leídas a la vez del CSV.
+        
+    Returns
+    -------
+    tuple
+        Tupla con (df_nuevas, df_contexto): las filas añadidas en esta ingesta
+        y, para cada estación con filas nuevas, sus filas_contexto filas
+        anteriores.
+    """
+    print("\n=== Ingesta incremental ===")
+    os.makedirs(directorio_almacen, exist_ok=True)
+    estado = _leer_estado_almacen(directorio_almacen)
+    
+    huella = huella_archivo(filepath, estado['huella'])
+    if estado['huella'] is not None and huella['hash'] == estado['huella']['hash']:
+        # Sin filas nuevas ninguna estación necesita contexto
+        print("El archivo ya se había ingerido, no hay filas nuevas")
+        vacio = pd.DataFrame(columns=[COLUMNA_FECHA] + list(ESQUEMA_DATASET))
+        return vacio, vacio
+    
+    contexto_previo = None
+    if estado['contexto'] is not None:
+        contexto_previo = leer_columnar(os.path.join(directorio_almacen, estado['contexto']))
+    
+    ultimos = pd.Series({estacion: pd.Timestamp(dia)
+                         for estacion, dia in estado['ultimo_dia'].items()},
+                        dtype='datetime64[ns]')
+    
+    nuevas = []
+    filas_leidas = 0
+    for bloque in _iterar_bloques(filepath, True, tamano_bloque):
+        filas_leidas += len(bloque)
+        estaciones = bloque['Estació'].cat
+        # Último día ingerido por categoría; el NaT final cubre los códigos -1
+        limites = np.append(ultimos.reindex(estaciones.categories).to_numpy(),
+                            np.datetime64('NaT', 'ns'))
+        limite_fila = limites[estaciones.codes]
+        dias = bloque[COLUMNA_FECHA].to_numpy()
+        mascara = np.isnat(limite_fila) | (dias > limite_fila)
+        if mascara.any():
+            nuevas.append(bloque[mascara])
+    
+    if nuevas:
+        df_nuevas = pd.concat(nuevas, ignore_index=True)
+        df_nuevas['Estació'] = df_nuevas['Estació'].astype('category')
+    else:
+        df_nuevas = pd.DataFrame(columns=[COLUMNA_FECHA] + list(ESQUEMA_DATASET))
+    
+    if len(df_nuevas) > 0:
+        numero_parte = len(estado['partes']) + 1
+        ruta_parte = guardar_columnar(
+            df_nuevas, os.path.join(directorio_almacen, f"parte_{numero_parte:05d}"))
+        estado['partes'].append(os.path.basename(ruta_parte))
+        
+        maximos = df_nuevas.groupby('Estació', observed=True)[COLUMNA_FECHA].max()
+        for estacion, dia in maximos.items():
+            previo = estado['ultimo_dia'].get(estacion)
+            if previo is None or dia > pd.Timestamp(previo):
+                estado['ultimo_dia'][estacion] = dia.isoformat()
+    
+    # Se guarda como contexto de la próxima ingesta la cola de cada estación
+    if contexto_previo is None:
+        df_cola = df_nuevas.copy()
+        df_contexto = df_nuevas.iloc[0:0]
+    else:
+        df_cola = pd.concat([contexto_previo, df_nuevas], ignore_index=True)
+        # Contexto devuelto: solo el de las estaciones con filas nuevas
+        con_novedades = contexto_previo['Estació'].isin(df_nuevas['Estació'].unique())
+        df_contexto = contexto_previo[con_novedades].reset_index(drop=True)
+    
+    df_cola['Estació'] = df_cola['Estació'].astype('category')
+    df_cola = (df_cola.sort_values(['Estació', COLUMNA_FECHA], kind='stable')
+               .groupby('Estació', observed=True).tail(filas_contexto)
+               .reset_index(drop=True))
+    ruta_contexto = guardar_columnar(df_cola, os.path.join(directorio_almacen, 'contexto'))
+    estado['contexto'] = os.path.basename(ruta_contexto)
+    estado['huella'] = huella
+    
+    ruta_estado = os.path.join(directorio_almacen, 'estado.json')
+    _escribir_json(ruta_estado, estado)
+    
+    print(f"Registros leídos: {filas_leidas}")
+    print(f"Registros nuevos: {len(df_nuevas)}")
+    print(f"Partes en el almacén: {len(estado['partes'])}")
+    
+    return df_nuevas, df_contexto
+
+
 def mostrar_primeras_filas(df, n=5):
     """
     Muestra las primeras n filas del DataFrame.
@@ -6,8 +6,45 @@ de embalses y filtrar datos específicos del embalse de La Baells.
 """
 
 import pandas as pd
+import numpy as np
 import re
 
+try:
+    from .ejercicio1 import cargar_dataset_en_bloques
+except ImportError:
+    from ejercicio1 import cargar_dataset_en_bloques
+
+
+# Diccionario de mapeo de nombres de columnas
+DICCIONARIO_COLUMNAS = {
+    'Dia': 'dia',
+    'Estació': 'estacio',
+    'Nivell absolut (msnm)': 'nivell_msnm',
+    'Percentatge volum embassat (%)': 'nivell_perc',
+    'Volum embassat (hm3)': 'volum'
+}
+
+
+def limpiar_nombre(nombre):
+    """
+    Limpia un nombre de pantano eliminando 'Embassament de' y el municipio.
+    
+    Parameters
+    ----------
+    nombre : str
+        Nombre original de la estación.
+        
+    Returns
+    -------
+    str
+        Nombre limpio, por ejemplo 'la Baells'.
+    """
+    # Eliminar 'Embassament de ' del inicio
+    nombre_limpio = re.sub(r'^Embassament de\s+', '', nombre)
+    # Eliminar el municipio entre paréntesis
+    nombre_limpio = re.sub(r'\s*\([^)]*\)', '', nombre_limpio)
+    return nombre_limpio
+
 
 def renombrar_columnas(df):
     """
@@ -23,21 +60,14 @@ def renombrar_columnas(df):
     pd.DataFrame
         DataFrame con las columnas renombradas.
     """
-    # Diccionario de mapeo de nombres
-    diccionario_columnas = {
-        'Dia': 'dia',
-        'Estació': 'estacio',
-        'Nivell absolut (msnm)': 'nivell_msnm',
-        'Percentatge volum embassat (%)': 'nivell_perc',
-        'Volum embassat (hm3)': 'volum'
-    }
-    
     print("\n=== Renombrando columnas ===")
     print("Mapeo de columnas:")
-    for old, new in diccionario_columnas.items():
+    for old, new in DICCIONARIO_COLUMNAS.items():
         print(f"  '{old}' -> '{new}'")
     
-    df_renamed = df.rename(columns=diccionario_columnas)
+    # Copia superficial: se cambian los nombres sin duplicar los datos
+    df_renamed = df.copy(deep=False)
+    df_renamed.rename(columns=DICCIONARIO_COLUMNAS, inplace=True)
     return df_renamed
 
 
@@ -75,36 +105,103 @@ def limpiar_nombres_pantanos(df):
     Returns
     -------
     pd.DataFrame
-        DataFrame con los nombres de pantanos limpiados.
+        DataFrame con los nombres de pantanos limpiados. Cada nombre distinto
+        se limpia una sola vez y la columna 'estacio' pasa a ser category.
     """
     print("\n=== Limpiando nombres de pantanos ===")
     
-    def limpiar_nombre(nombre):
-        """Función auxiliar para limpiar un nombre de pantano."""
-        # Eliminar 'Embassament de ' del inicio
-        nombre_limpio = re.sub(r'^Embassament de\s+', '', nombre)
-        # Eliminar el municipio entre paréntesis
-        nombre_limpio = re.sub(r'\s*\([^)]*\)', '', nombre_limpio)
-        return nombre_limpio
-    
-    # Crear una copia para no modificar el original
-    df_limpio = df.copy()
+    # Copia superficial: solo se sustituye la columna 'estacio'
+    df_limpio = df.copy(deep=False)
     
-    # Aplicar la limpieza
-    df_limpio['estacio'] = df_limpio['estacio'].apply(limpiar_nombre)
+    # Limpiar cada nombre distinto una sola vez y volver a asignarlo a las
+    # filas mediante sus códigos, guardando el resultado como categoría
+    codigos, originales = pd.factorize(df_limpio['estacio'])
+    limpios = np.array([limpiar_nombre(original) for original in originales], dtype=object)
+    codigos_limpios, categorias = pd.factorize(limpios)
+    if len(originales) > 0:
+        codigos = np.where(codigos >= 0, codigos_limpios[codigos], -1)
+    df_limpio['estacio'] = pd.Categorical.from_codes(codigos, categories=categorias)
     
     # Mostrar algunos ejemplos de la transformación
     print("Ejemplos de transformación:")
-    ejemplos = df[['estacio']].drop_duplicates().head(3)
-    for idx, row in ejemplos.iterrows():
-        original = row['estacio']
-        limpio = limpiar_nombre(original)
-        print(f"  '{original}' -> '{limpio}'")
+    for original in originales[:3]:
+        print(f"  '{original}' -> '{limpiar_nombre(original)}'")
     
     return df_limpio
 
 
-def filtrar_la_baells(df):
+def indexar_estaciones(df):
+    """
+    Construye un índice por estación con bloques contiguos de filas.
+    
+    Reordena el DataFrame una sola vez agrupando las filas de cada estación
+    (manteniendo el orden original dentro de cada una) y devuelve, para cada
+    estación, una porción de ese DataFrame sin copiar los datos. Así filtrar
+    N estaciones cuesta una pasada en lugar de N recorridos completos.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame con la columna 'estacio' ya limpia.
+        
+    Returns
+    -------
+    dict
+        Diccionario {nombre_estacion: DataFrame} con índice continuo en cada
+        bloque. Los bloques comparten memoria entre sí.
+    """
+    codigos, estaciones = pd.factorize(df['estacio'], sort=False)
+    
+    # Orden estable por código: un solo reordenamiento para todas las estaciones
+    orden = np.argsort(codigos, kind='stable')
+    df_agrupado = df.take(orden)
+    df_agrupado.reset_index(drop=True, inplace=True)
+    
+    # Límites de cada bloque (los nulos, con código -1, quedan al principio)
+    conteos = np.bincount(codigos[codigos >= 0], minlength=len(estaciones))
+    finales = np.cumsum(conteos) + np.count_nonzero(codigos < 0)
+    
+    indice = {}
+    for estacion, fin, conteo in zip(estaciones, finales, conteos):
+        bloque = df_agrupado.iloc[fin - conteo:fin]
+        bloque.index = pd.RangeIndex(conteo)
+        indice[estacion] = bloque
+    return indice
+
+
+def filtrar_estacion(df, estacion, indice=None):
+    """
+    Devuelve las filas de una estación concreta.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame con todos los datos de embalses.
+    estacion : str
+        Nombre limpio de la estación.
+    indice : dict, optional
+        Índice creado con indexar_estaciones(). Si se proporciona, la
+        consulta no recorre el DataFrame.
+        
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame con solo los datos de la estación e índice continuo.
+    """
+    if indice is not None:
+        if estacion in indice:
+            return indice[estacion]
+        return df.iloc[0:0].reset_index(drop=True)
+    
+    # take devuelve ya un DataFrame propio: no hace falta otra copia
+    df_estacion = df.take(np.flatnonzero(df['estacio'] == estacion))
+    
+    # Índice continuo sin volver a copiar los datos
+    df_estacion.index = pd.RangeIndex(len(df_estacion))
+    return df_estacion
+
+
+def filtrar_la_baells(df, indice=None):
     """
     Filtra los datos correspondientes al embalse de La Baells.
     
@@ -112,6 +209,9 @@ def filtrar_la_baells(df):
     ----------
     df : pd.DataFrame
         DataFrame con todos los datos de embalses.
+    indice : dict, optional
+        Índice creado con indexar_estaciones() para evitar recorrer el
+        DataFrame completo.
         
     Returns
     -------
@@ -121,18 +221,87 @@ def filtrar_la_baells(df):
     print("\n=== Filtrando datos de La Baells ===")
     
     # Filtrar por La Baells
-    df_baells = df[df['estacio'] == 'la Baells'].copy()
+    df_baells = filtrar_estacion(df, 'la Baells', indice)
     
     print(f"Registros totales en el dataset: {len(df)}")
     print(f"Registros de La Baells: {len(df_baells)}")
     print(f"Porcentaje del total: {len(df_baells)/len(df)*100:.2f}%")
     
-    # Reset del índice para tener un índice continuo
-    df_baells.reset_index(drop=True, inplace=True)
-    
     return df_baells
 
 
+def cargar_estaciones_en_bloques(filepath=None, estaciones=('la Baells',),
+                                 tamano_bloque=100_000, tipado=False):
+    """
+    Carga solo las filas de las estaciones indicadas leyendo el CSV por bloques.
+    
+    Cada bloque se renombra, se limpian los nombres de sus estaciones y se
+    descartan las filas de los demás embalses antes de leer el siguiente,
+    de modo que la memoria máxima depende del resultado y no del archivo.
+    El resultado equivale a aplicar renombrar_columnas, limpiar_nombres_pantanos
+    y el filtrado por estación sobre el dataset completo.
+    
+    Parameters
+    ----------
+    filepath : str, optional
+        Ruta al CSV. Si no se especifica, se usa la ruta por defecto.
+    estaciones : iterable of str
+        Nombres limpios de las estaciones a conservar (por defecto La Baells).
+    tamano_bloque : int
+        Número máximo de filas leídas a la vez.
+    tipado : bool
+        Si se aplica el esquema de tipos de la carga tipada en cada bloque.
+        
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame con las columnas renombradas y solo las estaciones pedidas.
+    """
+    print("\n=== Carga por bloques filtrando estaciones ===")
+    print(f"Estaciones: {list(estaciones)}")
+    
+    estaciones = set(estaciones)
+    nombres_limpios = {}
+    seleccion = []
+    filas_leidas = 0
+    num_bloques = 0
+    
+    for bloque in cargar_dataset_en_bloques(filepath, tipado=tipado, tamano_bloque=tamano_bloque):
+        num_bloques += 1
+        filas_leidas += len(bloque)
+        bloque = bloque.rename(columns=DICCIONARIO_COLUMNAS)
+        
+        # Limpiar solo los nombres distintos del bloque, memorizando los ya vistos
+        codigos, originales = pd.factorize(bloque['estacio'])
+        if len(originales) == 0:
+            continue
+        for original in originales:
+            if original not in nombres_limpios:
+                nombres_limpios[original] = limpiar_nombre(original)
+        limpios = np.array([nombres_limpios[original] for original in originales], dtype=object)
+        conservar = np.array([nombre in estaciones for nombre in limpios], dtype=bool)
+        
+        mascara = (codigos >= 0) & conservar[codigos]
+        if not mascara.any():
+            continue
+        
+        filtrado = bloque[mascara]
+        filtrado = filtrado.assign(estacio=limpios[codigos[mascara]])
+        seleccion.append(filtrado)
+    
+    if seleccion:
+        df_estaciones = pd.concat(seleccion, ignore_index=True)
+    else:
+        df_estaciones = pd.DataFrame(columns=list(DICCIONARIO_COLUMNAS.values()))
+    df_estaciones['estacio'] = df_estaciones['estacio'].astype('category')
+    
+    print(f"Bloques leídos: {num_bloques}")
+    print(f"Registros leídos: {filas_leidas}")
+    print(f"Registros conservados: {len(df_estaciones)}")
+    
+    return df_estaciones
+
+
 def ejecutar_ejercicio2(df):
     """
     Función principal que ejecuta todas las tareas del ejercicio 2.
@@ -6,10 +6,20 @@ y visualizar la evolución del volumen del embalse de La Baells.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 from datetime import datetime
 import os
 
+# matplotlib se carga en crear_figura, solo al dibujar
+
+# Registra el accesor df.tiempo (seguimiento del orden cronológico)
+try:
+    from . import orden_temporal  # noqa: F401  (registra df.tiempo)
+    from .graficos import crear_figura, diezmar_serie, ancho_en_pixeles
+except ImportError:
+    import orden_temporal  # noqa: F401  (registra df.tiempo)
+    from graficos import crear_figura, diezmar_serie, ancho_en_pixeles
+
 
 def convertir_a_datetime(df):
     """
@@ -27,8 +37,8 @@ def convertir_a_datetime(df):
     """
     print("\n=== Convirtiendo columna 'dia' a datetime ===")
     
-    # Crear una copia para no modificar el original
-    df_datetime = df.copy()
+    # Copia superficial: solo se sustituye la columna 'dia'
+    df_datetime = df.copy(deep=False)
     
     # Convertir a datetime
     df_datetime['dia'] = pd.to_datetime(df_datetime['dia'], format='%d/%m/%Y')
@@ -55,13 +65,10 @@ def analizar_rango_temporal(df):
     """
     print("\n=== Análisis del rango temporal ===")
     
-    # Ordenar por fecha
-    df_ordenado = df.sort_values('dia', ascending=True).copy()
-    
-    # Obtener fechas extremas
-    fecha_min = df_ordenado['dia'].min()
-    fecha_max = df_ordenado['dia'].max()
-    num_registros = len(df_ordenado)
+    # Las fechas extremas no dependen del orden: no hace falta ordenar
+    fecha_min = df['dia'].min()
+    fecha_max = df['dia'].max()
+    num_registros = len(df)
     
     print(f"Número total de registros: {num_registros}")
     print(f"Fecha más antigua: {fecha_min.strftime('%d/%m/%Y')}")
@@ -107,6 +114,40 @@ def toYearFraction(date):
     return date.year + year_part.total_seconds() / year_length.total_seconds()
 
 
+def toYearFraction_vectorizado(fechas):
+    """
+    Convierte un conjunto de fechas a año decimal en una sola operación.
+    
+    Calcula lo mismo que toYearFraction pero sobre el array completo de
+    datetime64, sin crear objetos datetime por fila. Los resultados son
+    idénticos, incluidos los años bisiestos.
+    
+    Parameters
+    ----------
+    fechas : pd.Series, pd.DatetimeIndex o np.ndarray
+        Fechas en formato datetime64 (sin zona horaria).
+        
+    Returns
+    -------
+    np.ndarray
+        Array de float64 con el año decimal de cada fecha (NaN para NaT).
+    """
+    valores = np.asarray(fechas, dtype='datetime64[ns]')
+    
+    # Inicio del año de cada fecha y del año siguiente
+    anios = valores.astype('datetime64[Y]')
+    inicio_anio = anios.astype('datetime64[us]')
+    inicio_siguiente = (anios + 1).astype('datetime64[us]')
+    
+    # Igual que timedelta.total_seconds(): microsegundos enteros / 10**6
+    transcurrido = (valores.astype('datetime64[us]') - inicio_anio).astype(np.int64) / 10**6
+    duracion = (inicio_siguiente - inicio_anio).astype(np.int64) / 10**6
+    
+    resultado = (anios.astype(np.int64) + 1970) + transcurrido / duracion
+    resultado[np.isnat(valores)] = np.nan
+    return resultado
+
+
 def crear_columna_dia_decimal(df):
     """
     Crea una nueva columna 'dia_decimal' con el año decimal.
@@ -123,11 +164,11 @@ def crear_columna_dia_decimal(df):
     """
     print("\n=== Creando columna 'dia_decimal' ===")
     
-    # Crear copia
-    df_decimal = df.copy()
+    # Copia superficial: solo se añade la columna 'dia_decimal'
+    df_decimal = df.copy(deep=False)
     
-    # Aplicar la función toYearFraction a cada fecha
-    df_decimal['dia_decimal'] = df_decimal['dia'].apply(toYearFraction)
+    # Aplicar la conversión de toYearFraction a toda la columna a la vez
+    df_decimal['dia_decimal'] = toYearFraction_vectorizado(df_decimal['dia'])
     
     # Mostrar algunos ejemplos
     print("Ejemplos de conversión:")
@@ -138,7 +179,7 @@ def crear_columna_dia_decimal(df):
     return df_decimal
 
 
-def visualizar_evolucion_volumen(df, nombre_alumno="Samuel Viciana"):
+def visualizar_evolucion_volumen(df, nombre_alumno="Samuel Viciana", directorio=None):
     """
     Crea y guarda una gráfica de la evolución del volumen del embalse.
     
@@ -148,6 +189,9 @@ def visualizar_evolucion_volumen(df, nombre_alumno="Samuel Viciana"):
         DataFrame con las columnas 'dia_decimal' y 'nivell_perc'.
     nombre_alumno : str
         Nombre del alumno para incluir en el gráfico.
+    directorio : str, optional
+        Directorio donde guardar la imagen. Por defecto, 'img' en la raíz
+        del proyecto.
         
     Returns
     -------
@@ -156,46 +200,49 @@ def visualizar_evolucion_volumen(df, nombre_alumno="Samuel Viciana"):
     """
     print("\n=== Creando visualización del volumen ===")
     
-    # Ordenar por fecha
-    df_plot = df.sort_values('dia_decimal').copy()
+    # Ordenar por fecha solo si hace falta (el gráfico no modifica los datos)
+    df_plot = df.tiempo.ordenar('dia_decimal')
     
-    # Crear la figura
-    plt.figure(figsize=(12, 6))
+    # Crear la figura (sin pyplot: matplotlib se carga al dibujar)
+    figura, eje = crear_figura(figsize=(12, 6))
     
-    # Graficar
-    plt.plot(df_plot['dia_decimal'], df_plot['nivell_perc'], 
+    # Graficar solo los puntos que se distinguen al ancho de la imagen
+    ancho_px = ancho_en_pixeles(figura, dpi=300)
+    eje.plot(*diezmar_serie(df_plot['dia_decimal'], df_plot['nivell_perc'], ancho_px),
              linewidth=0.8, color='blue', alpha=0.7)
     
     # Configurar el gráfico
-    plt.title('Evolución del volumen del embalse de La Baells', fontsize=16, pad=20)
-    plt.xlabel('Año', fontsize=12)
-    plt.ylabel('Porcentaje de volumen embalsado (%)', fontsize=12)
-    plt.grid(True, alpha=0.3)
+    eje.set_title('Evolución del volumen del embalse de La Baells', fontsize=16, pad=20)
+    eje.set_xlabel('Año', fontsize=12)
+    eje.set_ylabel('Porcentaje de volumen embalsado (%)', fontsize=12)
+    eje.grid(True, alpha=0.3)
     
     # Añadir subtítulo con el nombre del alumno
-    plt.text(0.5, 0.02, nombre_alumno, ha='center', transform=plt.gca().transAxes,
+    eje.text(0.5, 0.02, nombre_alumno, ha='center', transform=eje.transAxes,
              fontsize=10, style='italic', color='gray')
     
     # Ajustar diseño
-    plt.tight_layout()
-    
-    # Crear directorio img si no existe
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(script_dir)
-    img_dir = os.path.join(project_root, 'img')
+    figura.tight_layout()
+    
+    # Crear directorio img si no existe (o el directorio indicado)
+    if directorio is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.dirname(script_dir)
+        img_dir = os.path.join(project_root, 'img')
+    else:
+        img_dir = directorio
     os.makedirs(img_dir, exist_ok=True)
     
     # Guardar la imagen
     filename = f"labaells_{nombre_alumno.replace(' ', '_')}.png"
     filepath = os.path.join(img_dir, filename)
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
+    figura.savefig(filepath, dpi=300, bbox_inches='tight')
     
     print(f"Gráfico guardado en: {filepath}")
     return filepath
 
 
-def ejecutar_ejercicio3(df_baells):
+def ejecutar_ejercicio3(df_baells, directorio=None, visualizar=True):
     """
     Función principal que ejecuta todas las tareas del ejercicio 3.
     
@@ -203,6 +250,11 @@ def ejecutar_ejercicio3(df_baells):
     ----------
     df_baells : pd.DataFrame
         DataFrame filtrado con los datos de La Baells del ejercicio 2.
+    directorio : str, optional
+        Directorio de las imágenes. Por defecto, 'img' en la raíz del proyecto.
+    visualizar : bool, optional
+        Si se genera el gráfico (por defecto True). El grafo de etapas de
+        main.py lo genera en una etapa aparte.
         
     Returns
     -------
@@ -223,7 +275,8 @@ def ejecutar_ejercicio3(df_baells):
     df_decimal = crear_columna_dia_decimal(df_datetime)
     
     # Visualizar evolución
-    visualizar_evolucion_volumen(df_decimal)
+    if visualizar:
+        visualizar_evolucion_volumen(df_decimal, directorio=directorio)
     
     # Mostrar resumen del dataframe resultante
     print("\n=== Resumen del DataFrame resultante ===")
@@ -7,12 +7,419 @@ del embalse y visualizar las tendencias para identificar períodos de sequía.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.signal import savgol_filter
+from functools import lru_cache
+from math import factorial
 import os
 
+# scipy y matplotlib se importan dentro de las funciones que los usan, para
+# que importar el módulo (p. ej. desde main.py) no los cargue
 
-def suavizar_serie_temporal(df, window_length=1500, polyorder=3):
+# Registra el accesor df.tiempo (seguimiento del orden cronológico)
+try:
+    from . import orden_temporal  # noqa: F401  (registra df.tiempo)
+    from .graficos import crear_figura, diezmar_serie, ancho_en_pixeles
+except ImportError:
+    import orden_temporal  # noqa: F401  (registra df.tiempo)
+    from graficos import crear_figura, diezmar_serie, ancho_en_pixeles
+
+
+# Ventana a partir de la cual la convolución se hace por FFT (overlap-add)
+VENTANA_MINIMA_FFT = 64
+
+# Equivalencia entre los modos de borde de savgol_filter y los de np.pad
+MODOS_RELLENO = {'mirror': 'reflect', 'nearest': 'edge', 'constant': 'constant', 'wrap': 'wrap'}
+
+# Longitudes de ventana que se ajustan a la vez en el arranque del filtro causal
+BLOQUE_ARRANQUE = 128
+
+
+def _matrices_ajuste(window_length, polyorder, deriv):
+    """
+    Matrices del ajuste polinómico por mínimos cuadrados de una ventana.
+    
+    Devuelve (evaluacion, proyeccion): proyeccion @ ventana da los
+    coeficientes del polinomio y evaluacion @ coeficientes su valor (o su
+    derivada) en cada posición de la ventana.
+    """
+    # Posiciones centradas y escaladas para que el ajuste esté bien condicionado
+    centro = (window_length - 1) / 2
+    escala = max(centro, 1.0)
+    posiciones = (np.arange(window_length) - centro) / escala
+    
+    vandermonde = np.vander(posiciones, polyorder + 1, increasing=True)
+    derivadas = np.zeros_like(vandermonde)
+    for grado in range(deriv, polyorder + 1):
+        derivadas[:, grado] = (factorial(grado) / factorial(grado - deriv)
+                               * posiciones ** (grado - deriv))
+    
+    return derivadas, np.linalg.pinv(vandermonde) / escala ** deriv
+
+
+@lru_cache(maxsize=32)
+def banco_savgol(window_length, polyorder, deriv=0, mode='interp'):
+    """
+    Coeficientes precalculados del filtro Savitzky-Golay.
+    
+    Se guardan en una caché LRU por (window_length, polyorder, deriv, mode),
+    de modo que repetir una combinación de parámetros (por ejemplo, en cada
+    estación) no vuelve a calcularlos.
+    
+    Parameters
+    ----------
+    window_length : int
+        Longitud de la ventana del filtro.
+    polyorder : int
+        Orden del polinomio para el ajuste.
+    deriv : int
+        Orden de la derivada (0 para suavizar).
+    mode : str
+        Modo de borde de savgol_filter.
+        
+    Returns
+    -------
+    dict
+        Diccionario con 'coeficientes' (para convolución) y, en modo 'interp',
+        'proyeccion', 'borde_inicial' y 'borde_final': los valores de los
+        extremos son borde @ (proyeccion @ ventana) con la primera y la última
+        ventana. Los arrays son de solo lectura.
+    """
+    if mode not in MODOS_RELLENO and mode != 'interp':
+        raise ValueError(f"Modo desconocido: {mode}")
+    
+    from scipy.signal import savgol_coeffs
+    
+    banco = {'coeficientes': savgol_coeffs(window_length, polyorder, deriv=deriv)}
+    if mode == 'interp':
+        mitad = window_length // 2
+        evaluacion, banco['proyeccion'] = _matrices_ajuste(window_length, polyorder, deriv)
+        banco['borde_inicial'] = evaluacion[:mitad]
+        banco['borde_final'] = evaluacion[window_length - mitad:]
+    
+    for array in banco.values():
+        array.flags.writeable = False
+    return banco
+
+
+def filtrar_savgol(valores, window_length, polyorder, deriv=0, delta=1.0, mode='interp', cval=0.0):
+    """
+    Filtro Savitzky-Golay con coeficientes en caché y convolución por FFT.
+    
+    Equivale a scipy.signal.savgol_filter (salvo redondeos del orden de
+    1e-12). Usa los coeficientes de banco_savgol; para ventanas grandes
+    convoluciona por overlap-add y, en modo 'interp', obtiene los extremos
+    con las matrices precalculadas en lugar de ajustar polinomios en cada
+    llamada.
+    
+    Parameters
+    ----------
+    valores : np.ndarray
+        Serie a filtrar.
+    window_length : int
+        Longitud de la ventana del filtro.
+    polyorder : int
+        Orden del polinomio para el ajuste.
+    deriv : int
+        Orden de la derivada (0 para suavizar).
+    delta : float
+        Separación entre muestras (solo se usa si deriv > 0).
+    mode : str
+        'interp', 'mirror', 'nearest', 'constant' o 'wrap', como en savgol_filter.
+    cval : float
+        Valor de relleno en modo 'constant'.
+        
+    Returns
+    -------
+    np.ndarray
+        Serie filtrada.
+    """
+    valores = np.asarray(valores, dtype=float)
+    total = len(valores)
+    if mode == 'interp' and window_length > total:
+        raise ValueError("Con mode='interp', window_length no puede superar la longitud de la serie")
+    
+    banco = banco_savgol(window_length, polyorder, deriv, mode)
+    coeficientes = banco['coeficientes']
+    
+    if window_length < VENTANA_MINIMA_FFT:
+        from scipy.ndimage import convolve1d
+        modo_convolucion = 'constant' if mode == 'interp' else mode
+        filtrado = convolve1d(valores, coeficientes, mode=modo_convolucion, cval=cval)
+    else:
+        # Rellenar como lo haría convolve1d y quedarse con la parte válida
+        relleno = (window_length - 1 - window_length // 2, window_length // 2)
+        if mode in ('interp', 'constant'):
+            extendidos = np.pad(valores, relleno, constant_values=cval if mode == 'constant' else 0)
+        else:
+            extendidos = np.pad(valores, relleno, mode=MODOS_RELLENO[mode])
+        from scipy.signal import oaconvolve
+        filtrado = oaconvolve(extendidos, coeficientes, mode='valid')
+    
+    if mode == 'interp':
+        mitad = window_length // 2
+        proyeccion = banco['proyeccion']
+        filtrado[:mitad] = banco['borde_inicial'] @ (proyeccion @ valores[:window_length])
+        filtrado[total - mitad:] = banco['borde_final'] @ (proyeccion @ valores[total - window_length:])
+    
+    if deriv > 0:
+        filtrado /= delta ** deriv
+    return filtrado
+
+
+@lru_cache(maxsize=32)
+def coeficientes_causales(window_length, polyorder):
+    """
+    Coeficientes del filtro Savitzky-Golay causal (de un solo lado).
+    
+    El valor suavizado de cada día se obtiene ajustando el polinomio a los
+    window_length días anteriores (incluido él mismo) y evaluándolo en el
+    último, de modo que no depende de datos futuros.
+    
+    Parameters
+    ----------
+    window_length : int
+        Número de muestras de la ventana (puede ser par).
+    polyorder : int
+        Orden del polinomio, menor que window_length.
+        
+    Returns
+    -------
+    np.ndarray
+        Coeficientes de solo lectura; el valor suavizado es su producto
+        escalar con las últimas window_length muestras en orden cronológico.
+        
+    Raises
+    ------
+    ValueError
+        Si window_length no es mayor que polyorder.
+    """
+    if window_length <= polyorder:
+        raise ValueError("window_length debe ser mayor que polyorder")
+    
+    coeficientes = coeficientes_arranque([window_length], polyorder)[0]
+    coeficientes.flags.writeable = False
+    return coeficientes
+
+
+def coeficientes_arranque(disponibles, polyorder):
+    """
+    Coeficientes causales de varias longitudes de ventana a la vez.
+    
+    En el arranque del filtro causal aún no hay una ventana completa y cada
+    día se ajusta con todas las muestras anteriores, así que cada longitud
+    se usa una sola vez por serie: estos coeficientes no se guardan en la
+    caché de coeficientes_causales, sino que se calculan juntos con la
+    recurrencia de los polinomios de Gram (ortogonales sobre n puntos
+    equiespaciados), escalados para que no crezcan con la ventana.
+    
+    Parameters
+    ----------
+    disponibles : array-like
+        Longitudes de ventana, todas mayores que polyorder.
+    polyorder : int
+        Orden del polinomio.
+        
+    Returns
+    -------
+    np.ndarray
+        Matriz de forma (len(disponibles), max(disponibles)). La fila i
+        contiene los coeficientes de la ventana disponibles[i] seguidos de
+        ceros, de modo que su producto con las primeras max(disponibles)
+        muestras es el valor suavizado del último día de la ventana.
+        
+    Raises
+    ------
+    ValueError
+        Si alguna longitud no es mayor que polyorder.
+    """
+    n = np.asarray(disponibles, dtype=float)[:, None]
+    if n.min() <= polyorder:
+        raise ValueError("Las longitudes de ventana deben ser mayores que polyorder")
+    posiciones = np.arange(int(n.max()), dtype=float)
+    
+    # Polinomio de grado k dividido por n^k, en cada muestra y en el último día
+    x = (2 * posiciones - n + 1) / n
+    x_ultimo = (n - 1) / n
+    anterior, actual = np.zeros_like(x), np.ones_like(x)
+    anterior_ultimo, actual_ultimo = np.zeros_like(n), np.ones_like(n)
+    norma = n.copy()
+    
+    coeficientes = actual * actual_ultimo / norma
+    for k in range(polyorder):
+        factor = k * (1 - (k / n) ** 2)
+        anterior, actual = actual, ((2 * k + 1) * x * actual - factor * anterior) / (k + 1)
+        anterior_ultimo, actual_ultimo = actual_ultimo, (
+            ((2 * k + 1) * x_ultimo * actual_ultimo - factor * anterior_ultimo) / (k + 1))
+        norma = norma * (1 - ((k + 1) / n) ** 2) * (2 * k + 1) / (2 * k + 3)
+        coeficientes += actual * actual_ultimo / norma
+    
+    return np.where(posiciones < n, coeficientes, 0.0)
+
+
+def suavizar_valores(valores, window_length, polyorder):
+    """
+    Aplica el filtro Savitzky-Golay a un array ya ordenado por fecha.
+    
+    Si hay menos muestras que la ventana, la ventana se reduce al mayor
+    número impar que cabe en la serie.
+    
+    Parameters
+    ----------
+    valores : np.ndarray
+        Valores de la serie ordenados en el tiempo.
+    window_length : int
+        Longitud de la ventana del filtro (debe ser impar).
+    polyorder : int
+        Orden del polinomio para el ajuste.
+        
+    Returns
+    -------
+    np.ndarray
+        Serie suavizada.
+    """
+    if len(valores) < window_length:
+        window_length = len(valores) // 2 * 2 - 1  # Asegurar que sea impar
+    
+    return filtrar_savgol(valores, window_length=window_length, polyorder=polyorder)
+
+
+def _suavizar_causal_desde(valores, inicio, window_length, polyorder):
+    """
+    Suavizado causal de las muestras valores[inicio:].
+    
+    Las primeras window_length - 1 muestras de la serie no tienen una ventana
+    completa: se ajustan con todas las muestras anteriores disponibles.
+    """
+    if window_length <= polyorder:
+        raise ValueError("window_length debe ser mayor que polyorder")
+    
+    total = len(valores)
+    suavizado = np.empty(total - inicio)
+    
+    # Muestras sin ventana completa (solo al principio de la serie)
+    fin_arranque = min(total, window_length - 1)
+    for posicion in range(inicio, min(fin_arranque, polyorder)):
+        # Con tan pocas muestras el polinomio pasa por todas ellas
+        suavizado[posicion - inicio] = valores[posicion]
+    for bloque in range(max(inicio, polyorder), fin_arranque, BLOQUE_ARRANQUE):
+        disponibles = np.arange(bloque, min(bloque + BLOQUE_ARRANQUE, fin_arranque)) + 1
+        productos = coeficientes_arranque(disponibles, polyorder) * valores[:disponibles[-1]]
+        # Suma acumulada (en orden) para que el resultado no dependa de cómo se agrupen los días
+        suavizado[bloque - inicio:bloque - inicio + len(disponibles)] = (
+            np.cumsum(productos, axis=1)[np.arange(len(disponibles)), disponibles - 1])
+    
+    # Resto: correlación con los coeficientes de la ventana completa
+    primera = max(inicio, window_length - 1)
+    if primera < total:
+        suavizado[primera - inicio:] = np.correlate(
+            valores[primera - window_length + 1:],
+            coeficientes_causales(window_length, polyorder), mode='valid')
+    
+    return suavizado
+
+
+def suavizar_causal(valores, window_length=1500, polyorder=3):
+    """
+    Aplica el filtro Savitzky-Golay causal (de un solo lado) a una serie.
+    
+    Cada valor suavizado depende solo de ese día y los anteriores, por lo
+    que no cambia al añadir datos nuevos. Es el mismo suavizado que aplica
+    sequia_online.DetectorSequia lectura a lectura.
+    
+    Parameters
+    ----------
+    valores : np.ndarray
+        Valores de la serie ordenados en el tiempo.
+    window_length : int
+        Longitud de la ventana del filtro.
+    polyorder : int
+        Orden del polinomio para el ajuste.
+        
+    Returns
+    -------
+    np.ndarray
+        Serie suavizada.
+        
+    Raises
+    ------
+    ValueError
+        Si window_length no es mayor que polyorder.
+    """
+    return _suavizar_causal_desde(np.asarray(valores, dtype=float), 0, window_length, polyorder)
+
+
+def suavizar_incremental(nuevos, estado=None, window_length=1500, polyorder=3, causal=False):
+    """
+    Suaviza una serie que crece por el final sin volver a filtrarla entera.
+    
+    La serie completa y su suavizado los guarda quien llama; el estado solo
+    conserva las últimas 2 * window_length muestras. Con el filtro centrado,
+    al añadir muestras solo cambian las últimas window_length muestras
+    suavizadas (las afectadas por el ajuste del borde): se filtra únicamente
+    ese tramo final más las nuevas, con el mismo resultado (salvo redondeos)
+    que filtrar toda la serie. Con el filtro causal solo se calculan las
+    muestras nuevas.
+    
+    Parameters
+    ----------
+    nuevos : array-like
+        Valores añadidos al final de la serie, en orden cronológico.
+    estado : dict, optional
+        Estado devuelto por la llamada anterior. Si es None se empieza una
+        serie nueva.
+    window_length : int
+        Longitud de la ventana del filtro.
+    polyorder : int
+        Orden del polinomio para el ajuste.
+    causal : bool
+        Si es True usa el filtro causal (ver suavizar_causal).
+        
+    Returns
+    -------
+    tuple
+        Tupla con (tramo, desde, estado): los valores suavizados desde la
+        posición desde (contada desde el principio de la serie) hasta el
+        final, que sustituyen a los que se tenían a partir de esa posición,
+        y el nuevo estado, con las claves 'cola', 'total', 'window_length',
+        'polyorder', 'causal' y 'muestras_recalculadas'.
+        
+    Raises
+    ------
+    ValueError
+        Si los parámetros no coinciden con los del estado: hay que volver a
+        empezar con la serie completa y estado=None.
+    """
+    nuevos = np.asarray(nuevos, dtype=float)
+    parametros = {'window_length': window_length, 'polyorder': polyorder, 'causal': causal}
+    
+    if estado is None:
+        cola, previas = nuevos, 0
+    else:
+        if any(estado[clave] != valor for clave, valor in parametros.items()):
+            raise ValueError("Los parámetros no coinciden con los del estado; "
+                             "suaviza de nuevo la serie completa con estado=None")
+        cola, previas = np.concatenate([estado['cola'], nuevos]), estado['total']
+    
+    # Posición en la serie de la primera muestra de la cola
+    offset = previas + len(nuevos) - len(cola)
+    
+    if causal:
+        tramo = _suavizar_causal_desde(cola, previas - offset, window_length, polyorder)
+        desde = previas
+    elif offset > 0:
+        # Solo cambian las muestras a menos de una ventana del final anterior;
+        # la cola tiene al menos una ventana más antes de ellas
+        tramo = suavizar_valores(cola, window_length, polyorder)[window_length:]
+        desde = offset + window_length
+    else:
+        tramo = suavizar_valores(cola, window_length, polyorder)
+        desde = 0
+    
+    estado = dict(parametros, cola=cola[-2 * window_length:].copy(),
+                  total=previas + len(nuevos), muestras_recalculadas=len(tramo))
+    return tramo, desde, estado
+
+
+def suavizar_serie_temporal(df, window_length=1500, polyorder=3, causal=False):
     """
     Aplica el filtro Savitzky-Golay para suavizar la serie temporal del volumen.
     
@@ -24,6 +431,9 @@ def suavizar_serie_temporal(df, window_length=1500, polyorder=3):
         Longitud de la ventana del filtro (debe ser impar).
     polyorder : int
         Orden del polinomio para el ajuste.
+    causal : bool
+        Si es True aplica el filtro causal (ver suavizar_causal) en lugar del
+        filtro centrado.
         
     Returns
     -------
@@ -31,26 +441,31 @@ def suavizar_serie_temporal(df, window_length=1500, polyorder=3):
         DataFrame con la columna adicional 'nivell_perc_suavizado'.
     """
     print("\n=== Aplicando suavizado con savgol_filter ===")
-    print(f"Parámetros: window_length={window_length}, polyorder={polyorder}")
-    
-    # Crear copia del dataframe
-    df_suavizado = df.copy()
+    print(f"Parámetros: window_length={window_length}, polyorder={polyorder}"
+          + (" (causal)" if causal else ""))
     
-    # Ordenar por fecha para asegurar continuidad
-    df_suavizado = df_suavizado.sort_values('dia_decimal').reset_index(drop=True)
+    # Ordenar por fecha para asegurar continuidad. Si ya está ordenado basta
+    # una copia superficial; si no, la copia ordenada ya es un DataFrame propio
+    df_suavizado = df.tiempo.ordenar('dia_decimal')
+    if df_suavizado is df:
+        df_suavizado = df.copy(deep=False)
+    df_suavizado.index = pd.RangeIndex(len(df_suavizado))
     
     # Verificar que tenemos suficientes datos
-    if len(df_suavizado) < window_length:
+    if len(df_suavizado) < window_length and not causal:
         print(f"Advertencia: Ajustando window_length de {window_length} a {len(df_suavizado)//2*2-1}")
-        window_length = len(df_suavizado) // 2 * 2 - 1  # Asegurar que sea impar
     
     # Aplicar el filtro Savitzky-Golay
-    y_suavizado = savgol_filter(df_suavizado['nivell_perc'].values, 
-                                window_length=window_length, 
-                                polyorder=polyorder)
-    
-    # Añadir la columna suavizada
+    if causal:
+        y_suavizado = suavizar_causal(df_suavizado['nivell_perc'].values,
+                                      window_length, polyorder)
+    else:
+        y_suavizado = suavizar_valores(df_suavizado['nivell_perc'].values,
+                                       window_length, polyorder)
+    
+    # Añadir la columna suavizada y dejar constancia de que ya está ordenado
     df_suavizado['nivell_perc_suavizado'] = y_suavizado
+    df_suavizado.tiempo.marcar_ordenado('dia_decimal')
     
     # Mostrar estadísticas
     print(f"\nEstadísticas del suavizado:")
@@ -62,7 +477,7 @@ def suavizar_serie_temporal(df, window_length=1500, polyorder=3):
     return df_suavizado
 
 
-def visualizar_serie_suavizada(df, nombre_alumno="Samuel Viciana"):
+def visualizar_serie_suavizada(df, nombre_alumno="Samuel Viciana", directorio=None):
     """
     Crea una visualización comparando la serie original con la suavizada.
     
@@ -72,6 +487,9 @@ def visualizar_serie_suavizada(df, nombre_alumno="Samuel Viciana"):
         DataFrame con las columnas 'dia_decimal', 'nivell_perc' y 'nivell_perc_suavizado'.
     nombre_alumno : str
         Nombre del alumno para incluir en el gráfico.
+    directorio : str, optional
+        Directorio donde guardar la imagen. Por defecto, 'img' en la raíz
+        del proyecto.
         
     Returns
     -------
@@ -80,53 +498,58 @@ def visualizar_serie_suavizada(df, nombre_alumno="Samuel Viciana"):
     """
     print("\n=== Creando visualización con serie suavizada ===")
     
-    # Ordenar por fecha
-    df_plot = df.sort_values('dia_decimal').copy()
+    # Ordenar por fecha solo si hace falta (el gráfico no modifica los datos)
+    df_plot = df.tiempo.ordenar('dia_decimal')
+    
+    # Crear la figura (sin pyplot: matplotlib se carga al dibujar)
+    figura, eje = crear_figura(figsize=(14, 8))
     
-    # Crear la figura
-    plt.figure(figsize=(14, 8))
+    # Solo se dibujan los puntos que se distinguen al ancho de la imagen
+    ancho_px = ancho_en_pixeles(figura, dpi=300)
     
     # Graficar serie original
-    plt.plot(df_plot['dia_decimal'], df_plot['nivell_perc'], 
+    eje.plot(*diezmar_serie(df_plot['dia_decimal'], df_plot['nivell_perc'], ancho_px),
              linewidth=0.5, color='lightblue', alpha=0.6, label='Datos originales')
     
     # Graficar serie suavizada
-    plt.plot(df_plot['dia_decimal'], df_plot['nivell_perc_suavizado'], 
+    eje.plot(*diezmar_serie(df_plot['dia_decimal'], df_plot['nivell_perc_suavizado'], ancho_px),
              linewidth=3, color='darkblue', label='Señal suavizada')
     
     # Añadir línea de referencia al 60%
-    plt.axhline(y=60, color='red', linestyle='--', alpha=0.5, 
+    eje.axhline(y=60, color='red', linestyle='--', alpha=0.5, 
                 label='Umbral sequía (60%)')
     
     # Configurar el gráfico
-    plt.title('Evolución del volumen del embalse de La Baells - Análisis de tendencias', 
-              fontsize=16, pad=20)
-    plt.xlabel('Año', fontsize=12)
-    plt.ylabel('Porcentaje de volumen embalsado (%)', fontsize=12)
-    plt.legend(loc='upper right', fontsize=10)
-    plt.grid(True, alpha=0.3)
+    eje.set_title('Evolución del volumen del embalse de La Baells - Análisis de tendencias', 
+                  fontsize=16, pad=20)
+    eje.set_xlabel('Año', fontsize=12)
+    eje.set_ylabel('Porcentaje de volumen embalsado (%)', fontsize=12)
+    eje.legend(loc='upper right', fontsize=10)
+    eje.grid(True, alpha=0.3)
     
     # Establecer límites del eje Y
-    plt.ylim(0, 105)
+    eje.set_ylim(0, 105)
     
     # Añadir subtítulo con el nombre del alumno
-    plt.text(0.5, 0.02, nombre_alumno, ha='center', transform=plt.gca().transAxes,
+    eje.text(0.5, 0.02, nombre_alumno, ha='center', transform=eje.transAxes,
              fontsize=10, style='italic', color='gray')
     
     # Ajustar diseño
-    plt.tight_layout()
-    
-    # Crear directorio img si no existe
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(script_dir)
-    img_dir = os.path.join(project_root, 'img')
+    figura.tight_layout()
+    
+    # Crear directorio img si no existe (o el directorio indicado)
+    if directorio is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.dirname(script_dir)
+        img_dir = os.path.join(project_root, 'img')
+    else:
+        img_dir = directorio
     os.makedirs(img_dir, exist_ok=True)
     
     # Guardar la imagen
     filename = f"labaells_smoothed_{nombre_alumno.replace(' ', '_')}.png"
     filepath = os.path.join(img_dir, filename)
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
+    figura.savefig(filepath, dpi=300, bbox_inches='tight')
     
     print(f"Gráfico guardado en: {filepath}")
     return filepath
@@ -148,17 +571,19 @@ def analizar_tendencias(df):
     """
     print("\n=== Análisis de tendencias ===")
     
-    # Identificar períodos por debajo del 60%
-    df_analisis = df.sort_values('dia_decimal').copy()
-    periodos_sequia = df_analisis[df_analisis['nivell_perc_suavizado'] < 60]
+    # Ordenar por fecha solo si hace falta (el análisis no modifica los datos)
+    df_analisis = df.tiempo.ordenar('dia_decimal')
+    
+    # Identificar días por debajo del 60% sin materializar un DataFrame filtrado
+    dias_bajo_60 = int(np.count_nonzero(df_analisis['nivell_perc_suavizado'].values < 60))
     
     estadisticas = {
         'min_volumen': df_analisis['nivell_perc_suavizado'].min(),
         'fecha_min_volumen': df_analisis.loc[df_analisis['nivell_perc_suavizado'].idxmin(), 'dia'],
         'max_volumen': df_analisis['nivell_perc_suavizado'].max(),
         'fecha_max_volumen': df_analisis.loc[df_analisis['nivell_perc_suavizado'].idxmax(), 'dia'],
-        'dias_bajo_60': len(periodos_sequia),
-        'porcentaje_tiempo_sequia': len(periodos_sequia) / len(df_analisis) * 100
+        'dias_bajo_60': dias_bajo_60,
+        'porcentaje_tiempo_sequia': dias_bajo_60 / len(df_analisis) * 100
     }
     
     print(f"Volumen mínimo: {estadisticas['min_volumen']:.1f}% ({estadisticas['fecha_min_volumen'].strftime('%d/%m/%Y')})")
@@ -168,7 +593,8 @@ def analizar_tendencias(df):
     return estadisticas
 
 
-def ejecutar_ejercicio4(df_decimal):
+def ejecutar_ejercicio4(df_decimal, window_length=1500, polyorder=3, directorio=None,
+                        visualizar=True):
     """
     Función principal que ejecuta todas las tareas del ejercicio 4.
     
@@ -176,6 +602,14 @@ def ejecutar_ejercicio4(df_decimal):
     ----------
     df_decimal : pd.DataFrame
         DataFrame con los datos del ejercicio 3 incluyendo 'dia_decimal'.
+    window_length : int
+        Longitud de la ventana del filtro Savitzky-Golay.
+    polyorder : int
+        Orden del polinomio del filtro.
+    directorio : str, optional
+        Directorio de las imágenes. Por defecto, 'img' en la raíz del proyecto.
+    visualizar : bool, optional
+        Si se genera el gráfico (por defecto True).
         
     Returns
     -------
@@ -187,10 +621,11 @@ def ejecutar_ejercicio4(df_decimal):
     print("="*50)
     
     # Aplicar suavizado
-    df_suavizado = suavizar_serie_temporal(df_decimal)
+    df_suavizado = suavizar_serie_temporal(df_decimal, window_length, polyorder)
     
     # Visualizar serie suavizada
-    visualizar_serie_suavizada(df_suavizado)
+    if visualizar:
+        visualizar_serie_suavizada(df_suavizado, directorio=directorio)
     
     # Analizar tendencias
     analizar_tendencias(df_suavizado)
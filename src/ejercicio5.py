@@ -8,8 +8,14 @@ de sequía basándose en la serie temporal suavizada del embalse.
 import pandas as pd
 import numpy as np
 
+# Registra el accesor df.tiempo (seguimiento del orden cronológico)
+try:
+    from . import orden_temporal  # noqa: F401  (registra df.tiempo)
+except ImportError:
+    import orden_temporal  # noqa: F401  (registra df.tiempo)
 
-def calcula_periodos(df, umbral=60):
+
+def calcula_periodos(df, umbral=60, ordenado=None):
     """
     Calcula los períodos de sequía cuando el volumen suavizado está por debajo del umbral.
     
@@ -19,6 +25,9 @@ def calcula_periodos(df, umbral=60):
         DataFrame con las columnas 'dia_decimal' y 'nivell_perc_suavizado'.
     umbral : float
         Porcentaje umbral para definir sequía (por defecto 60%).
+    ordenado : bool, optional
+        Indica si el DataFrame ya está ordenado por 'dia_decimal'. Si es None
+        se consulta df.tiempo (ver orden_temporal); si ya lo está, no se reordena.
         
     Returns
     -------
@@ -32,38 +41,209 @@ def calcula_periodos(df, umbral=60):
     """
     print(f"\n=== Calculando períodos de sequía (umbral: {umbral}%) ===")
     
-    # Ordenar por fecha
-    df_ordenado = df.sort_values('dia_decimal').copy()
+    if ordenado is None:
+        ordenado = df.tiempo.ordenado('dia_decimal')
     
-    # Identificar puntos bajo el umbral
-    bajo_umbral = df_ordenado['nivell_perc_suavizado'] < umbral
+    # Ordenar por fecha solo si hace falta
+    df_ordenado = df if ordenado else df.tiempo.ordenar('dia_decimal')
     
-    # Encontrar cambios (inicio y fin de períodos)
-    # diff() encuentra donde cambia de False a True (inicio) o True a False (fin)
-    cambios = bajo_umbral.astype(int).diff()
+    return calcula_periodos_arrays(df_ordenado['dia_decimal'].values,
+                                   df_ordenado['nivell_perc_suavizado'].values,
+                                   umbral)
+
+
+def limites_periodos(suavizado, umbral=60):
+    """
+    Localiza las rachas consecutivas por debajo del umbral.
     
-    # Inicio de sequía: cambio de 0 a 1 (False a True)
-    inicios = df_ordenado[cambios == 1]['dia_decimal'].values
+    Parameters
+    ----------
+    suavizado : np.ndarray
+        Volumen suavizado en orden cronológico.
+    umbral : float
+        Porcentaje umbral para definir sequía (por defecto 60%).
+        
+    Returns
+    -------
+    tuple
+        Tupla con (inicios, finales): posiciones de la primera muestra de cada
+        racha y de la primera muestra posterior a ella (exclusiva).
+    """
+    bajo_umbral = np.asarray(suavizado) < umbral
+    if len(bajo_umbral) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
     
-    # Fin de sequía: cambio de 1 a 0 (True a False)
-    finales = df_ordenado[cambios == -1]['dia_decimal'].values
+    # Posiciones donde el estado cambia respecto a la muestra anterior
+    bordes = np.flatnonzero(bajo_umbral[1:] != bajo_umbral[:-1]) + 1
     
-    # Manejar casos especiales
-    # Si empieza en sequía, añadir el primer valor como inicio
-    if bajo_umbral.iloc[0]:
-        inicios = np.insert(inicios, 0, df_ordenado['dia_decimal'].iloc[0])
+    # Si la serie empieza en sequía, el primer borde es de bajada: se añade
+    # el inicio en la posición 0; si termina en sequía, se cierra al final
+    if bajo_umbral[0]:
+        bordes = np.concatenate(([0], bordes))
+    if bajo_umbral[-1]:
+        bordes = np.concatenate((bordes, [len(bajo_umbral)]))
+    return bordes[0::2], bordes[1::2]
+
+
+def redondear_fechas(valores):
+    """
+    Redondea años decimales a 2 decimales con el mismo resultado que round().
+    
+    Se redondea de forma vectorizada y solo se recurre a round() en los
+    valores que quedan prácticamente a mitad entre dos centésimas.
+    
+    Parameters
+    ----------
+    valores : np.ndarray
+        Años decimales.
+        
+    Returns
+    -------
+    list
+        Lista de floats de Python redondeados a 2 decimales.
+    """
+    valores = np.asarray(valores, dtype=float)
+    escalados = valores * 100
+    redondeados = (np.rint(escalados) / 100).tolist()
+    with np.errstate(invalid='ignore'):
+        empates = np.flatnonzero(np.abs(escalados - np.floor(escalados) - 0.5) < 1e-6)
+    for posicion in empates.tolist():
+        redondeados[posicion] = round(float(valores[posicion]), 2)
+    return redondeados
+
+
+def calcula_periodos_arrays(dia_decimal, suavizado, umbral=60):
+    """
+    Calcula los períodos de sequía a partir de arrays ordenados por fecha.
     
-    # Si termina en sequía, añadir el último valor como final
-    if bajo_umbral.iloc[-1]:
-        finales = np.append(finales, df_ordenado['dia_decimal'].iloc[-1])
+    Parameters
+    ----------
+    dia_decimal : np.ndarray
+        Fechas en año decimal, en orden creciente.
+    suavizado : np.ndarray
+        Volumen suavizado correspondiente a cada fecha.
+    umbral : float
+        Porcentaje umbral para definir sequía (por defecto 60%).
+        
+    Returns
+    -------
+    list
+        Lista de períodos [inicio, fin] en años decimales redondeados a 2 decimales.
+    """
+    dia_decimal = np.asarray(dia_decimal)
+    inicios, finales = limites_periodos(suavizado, umbral)
     
-    # Crear lista de períodos
-    periodos = []
-    for inicio, fin in zip(inicios, finales):
-        # Convertir a float nativo de Python para evitar np.float64
-        periodos.append([round(float(inicio), 2), round(float(fin), 2)])
+    # El fin de un período es el primer día fuera de sequía; si la serie
+    # termina en sequía, es el último día disponible
+    finales = np.minimum(finales, len(dia_decimal) - 1)
     
-    return periodos
+    # Convertir a float nativo de Python para evitar np.float64
+    return [list(periodo) for periodo in zip(redondear_fechas(dia_decimal[inicios]),
+                                             redondear_fechas(dia_decimal[finales]))]
+
+
+def calcula_periodos_multiumbral(df, umbrales=(30, 40, 50, 60, 70), ordenado=None):
+    """
+    Calcula los períodos de sequía para varios umbrales en una sola pasada.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame con las columnas 'dia_decimal' y 'nivell_perc_suavizado'.
+    umbrales : sequence
+        Porcentajes umbral para definir sequía.
+    ordenado : bool, optional
+        Indica si el DataFrame ya está ordenado por 'dia_decimal'. Si es None
+        se consulta df.tiempo (ver orden_temporal); si ya lo está, no se reordena.
+        
+    Returns
+    -------
+    dict
+        Diccionario {umbral: lista de períodos [inicio, fin]}, igual a llamar
+        a calcula_periodos con cada umbral.
+    """
+    print(f"\n=== Calculando períodos de sequía (umbrales: {list(umbrales)}) ===")
+    
+    if ordenado is None:
+        ordenado = df.tiempo.ordenado('dia_decimal')
+    
+    # Se ordena una única vez para todos los umbrales
+    df_ordenado = df if ordenado else df.tiempo.ordenar('dia_decimal')
+    
+    return calcula_periodos_multiumbral_arrays(df_ordenado['dia_decimal'].values,
+                                               df_ordenado['nivell_perc_suavizado'].values,
+                                               umbrales)
+
+
+def calcula_periodos_multiumbral_arrays(dia_decimal, suavizado, umbrales):
+    """
+    Calcula los períodos de sequía de varios umbrales a partir de arrays ordenados.
+    
+    Cada día se clasifica una sola vez por el número de umbrales que su
+    volumen no alcanza; los días en que esa cuenta cambia son los cruces de
+    umbral, y de ellos salen los bordes de las rachas de todos los umbrales.
+    
+    Parameters
+    ----------
+    dia_decimal : np.ndarray
+        Fechas en año decimal, en orden creciente.
+    suavizado : np.ndarray
+        Volumen suavizado correspondiente a cada fecha.
+    umbrales : sequence
+        Porcentajes umbral para definir sequía.
+        
+    Returns
+    -------
+    dict
+        Diccionario {umbral: lista de períodos [inicio, fin]} en años
+        decimales redondeados a 2 decimales.
+    """
+    dia_decimal = np.asarray(dia_decimal)
+    umbrales = list(umbrales)
+    total = len(dia_decimal)
+    if total == 0:
+        return {umbral: [] for umbral in umbrales}
+    
+    orden = np.argsort(np.asarray(umbrales, dtype=float), kind='stable')
+    ordenados = np.asarray(umbrales, dtype=float)[orden]
+    
+    # nivel[i]: número de umbrales que el volumen alcanza; el día i está en
+    # sequía para el umbral ordenado j si j >= nivel[i]. Se cuenta con una
+    # sola comparación umbrales x días, y los NaN quedan fuera de sequía.
+    # Se rodea con el nivel máximo para que toda racha se abra y se cierre.
+    nivel = np.full(total + 2, len(ordenados), dtype=np.int16)
+    nivel[1:-1] -= np.less(np.asarray(suavizado)[np.newaxis, :],
+                           ordenados[:, np.newaxis]).sum(axis=0, dtype=np.int16)
+    
+    # Cruces: posiciones donde cambia el nivel; cada uno abre o cierra una
+    # racha para los umbrales entre el nivel anterior y el nuevo
+    cruces = np.flatnonzero(nivel[1:] != nivel[:-1])
+    antes = nivel[cruces].astype(np.intp)
+    despues = nivel[cruces + 1].astype(np.intp)
+    desde = np.minimum(antes, despues)
+    cuantos = np.abs(despues - antes)
+    primeros = np.repeat(np.cumsum(cuantos) - cuantos, cuantos)
+    filas = np.repeat(desde, cuantos) + np.arange(len(primeros)) - primeros
+    columnas = np.repeat(cruces, cuantos)
+    
+    # Agrupar por umbral; dentro de cada uno los bordes alternan inicio/fin
+    agrupado = np.lexsort((columnas, filas))
+    filas, columnas = filas[agrupado], columnas[agrupado]
+    
+    # El fin es el primer día fuera de sequía o, si la serie termina en
+    # sequía, el último día
+    inicios = redondear_fechas(dia_decimal[columnas[0::2]])
+    finales = redondear_fechas(dia_decimal[np.minimum(columnas[1::2], total - 1)])
+    cortes = np.searchsorted(filas[0::2], np.arange(len(ordenados) + 1)).tolist()
+    
+    periodos = {}
+    for posicion, indice in enumerate(orden.tolist()):
+        desde, hasta = cortes[posicion], cortes[posicion + 1]
+        periodos[umbrales[indice]] = [list(periodo) for periodo in zip(inicios[desde:hasta],
+                                                                       finales[desde:hasta])]
+    
+    # Mismo orden de claves que los umbrales recibidos
+    return {umbral: periodos[umbral] for umbral in umbrales}
 
 
 def analizar_periodos_sequia(df, periodos):
@@ -84,39 +264,51 @@ def analizar_periodos_sequia(df, periodos):
     """
     print("\n=== Análisis detallado de períodos de sequía ===")
     
-    # Crear DataFrame con información de períodos
-    info_periodos = []
+    # Ordenar por fecha solo si hace falta
+    df = df.tiempo.ordenar('dia_decimal')
+    
+    dia_decimal = df['dia_decimal'].values
+    suavizado = df['nivell_perc_suavizado'].values
     
-    for i, (inicio, fin) in enumerate(periodos, 1):
-        # Filtrar datos del período
-        mask = (df['dia_decimal'] >= inicio) & (df['dia_decimal'] <= fin)
-        datos_periodo = df[mask]
+    # Localizar cada período por búsqueda binaria: filas [izquierda, derecha)
+    limites = np.asarray(periodos, dtype=float).reshape(-1, 2)
+    izquierda = np.searchsorted(dia_decimal, limites[:, 0], side='left')
+    derecha = np.searchsorted(dia_decimal, limites[:, 1], side='right')
+    
+    # Solo se describen los períodos que contienen datos
+    con_datos = derecha > izquierda
+    numeros = np.flatnonzero(con_datos) + 1
+    limites, izquierda, derecha = limites[con_datos], izquierda[con_datos], derecha[con_datos]
+    
+    if len(numeros) == 0:
+        df_info = pd.DataFrame()
+    else:
+        # Mínimo y media por período con reducciones agrupadas: reduceat sobre
+        # los índices [izq0, der0, izq1, der1, ...] reduce cada tramo en las
+        # posiciones pares (se añade un elemento final para admitir der == n)
+        tramos = np.column_stack([izquierda, derecha]).ravel()
+        validos = np.append(~np.isnan(suavizado), False)
+        valores = np.append(suavizado, np.nan)
+        minimos = np.minimum.reduceat(np.where(validos, valores, np.inf), tramos)[::2]
+        sumas = np.add.reduceat(np.where(validos, valores, 0.0), tramos)[::2]
+        cuentas = np.add.reduceat(validos.astype(np.int64), tramos)[::2]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            medias = np.where(cuentas > 0, sumas / cuentas, np.nan)
+            minimos = np.where(cuentas > 0, minimos, np.nan)
         
-        if len(datos_periodo) > 0:
-            # Calcular estadísticas
-            duracion_años = fin - inicio
-            duracion_dias = int(duracion_años * 365.25)
-            volumen_min = datos_periodo['nivell_perc_suavizado'].min()
-            volumen_medio = datos_periodo['nivell_perc_suavizado'].mean()
-            
-            # Encontrar fechas aproximadas
-            fecha_inicio = datos_periodo.iloc[0]['dia']
-            fecha_fin = datos_periodo.iloc[-1]['dia']
-            
-            info = {
-                'Período': i,
-                'Inicio (decimal)': inicio,
-                'Fin (decimal)': fin,
-                'Inicio (fecha)': fecha_inicio.strftime('%d/%m/%Y'),
-                'Fin (fecha)': fecha_fin.strftime('%d/%m/%Y'),
-                'Duración (años)': round(duracion_años, 2),
-                'Duración (días)': duracion_dias,
-                'Volumen mínimo (%)': round(volumen_min, 1),
-                'Volumen medio (%)': round(volumen_medio, 1)
-            }
-            info_periodos.append(info)
-    
-    df_info = pd.DataFrame(info_periodos)
+        duraciones = limites[:, 1] - limites[:, 0]
+        fechas = df['dia']
+        df_info = pd.DataFrame({
+            'Período': numeros,
+            'Inicio (decimal)': limites[:, 0],
+            'Fin (decimal)': limites[:, 1],
+            'Inicio (fecha)': fechas.iloc[izquierda].dt.strftime('%d/%m/%Y').values,
+            'Fin (fecha)': fechas.iloc[derecha - 1].dt.strftime('%d/%m/%Y').values,
+            'Duración (años)': [round(duracion, 2) for duracion in duraciones.tolist()],
+            'Duración (días)': [int(duracion * 365.25) for duracion in duraciones.tolist()],
+            'Volumen mínimo (%)': np.round(minimos, 1),
+            'Volumen medio (%)': np.round(medias, 1)
+        })
     
     # Mostrar información
     for _, periodo in df_info.iterrows():
@@ -130,7 +322,7 @@ def analizar_periodos_sequia(df, periodos):
     return df_info
 
 
-def ejecutar_ejercicio5(df_suavizado):
+def ejecutar_ejercicio5(df_suavizado, umbral=60):
     """
     Función principal que ejecuta todas las tareas del ejercicio 5.
     
@@ -138,6 +330,8 @@ def ejecutar_ejercicio5(df_suavizado):
     ----------
     df_suavizado : pd.DataFrame
         DataFrame con los datos suavizados del ejercicio 4.
+    umbral : float
+        Porcentaje umbral para definir sequía (por defecto 60%).
         
     Returns
     -------
@@ -149,7 +343,7 @@ def ejecutar_ejercicio5(df_suavizado):
     print("="*50)
     
     # Calcular períodos de sequía
-    periodos = calcula_periodos(df_suavizado)
+    periodos = calcula_periodos(df_suavizado, umbral)
     
     # Mostrar períodos encontrados
     print(f"\n=== Períodos de sequía encontrados ===")
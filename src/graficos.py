@@ -0,0 +1,281 @@
+"""
+Módulo graficos: Creación de figuras de matplotlib sin pyplot.
+
+Las figuras se crean directamente con matplotlib.figure.Figure y el lienzo
+Agg, que no necesita pantalla. Así no se importa pyplot ni se elige un
+backend gráfico, y matplotlib solo se carga la primera vez que se dibuja.
+
+diezmar_serie reduce las series diarias a los puntos que se distinguen al
+ancho en píxeles de la imagen, y RenderizadorGraficos dibuja y guarda los
+gráficos en procesos aparte para que el análisis no tenga que esperar a
+que se escriban los PNG.
+"""
+
+import threading
+
+import numpy as np
+
+
+def crear_figura(figsize):
+    """
+    Crea una figura con un único eje, lista para guardar en PNG.
+
+    No queda registrada en pyplot, así que no hace falta cerrarla: se libera
+    cuando deja de usarse.
+
+    Parameters
+    ----------
+    figsize : tuple
+        Tamaño (ancho, alto) en pulgadas.
+
+    Returns
+    -------
+    tuple
+        Tupla con (figura, eje).
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figura = Figure(figsize=figsize)
+    FigureCanvasAgg(figura)
+    return figura, figura.add_subplot()
+
+
+def crear_cuadricula(filas, columnas, figsize, **opciones):
+    """
+    Crea una figura con una cuadrícula de ejes (gráficos pequeños múltiples).
+
+    Parameters
+    ----------
+    filas, columnas : int
+        Dimensiones de la cuadrícula.
+    figsize : tuple
+        Tamaño (ancho, alto) en pulgadas.
+    **opciones
+        Opciones de Figure.subplots (por ejemplo sharex o sharey).
+
+    Returns
+    -------
+    tuple
+        Tupla con (figura, ejes), con ejes como matriz filas x columnas.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figura = Figure(figsize=figsize)
+    FigureCanvasAgg(figura)
+    return figura, figura.subplots(filas, columnas, squeeze=False, **opciones)
+
+
+def ancho_en_pixeles(figura, dpi):
+    """
+    Ancho de la figura en píxeles al guardarla con la resolución indicada.
+
+    Es una cota superior del ancho de cualquiera de sus ejes, así que diezmar
+    con ella no pierde detalle visible.
+
+    Parameters
+    ----------
+    figura : matplotlib.figure.Figure
+        Figura que se va a guardar.
+    dpi : float
+        Resolución con la que se guarda.
+
+    Returns
+    -------
+    int
+        Número de píxeles.
+    """
+    return max(1, int(np.ceil(figura.get_figwidth() * dpi)))
+
+
+def diezmar_serie(x, y, ancho_px):
+    """
+    Reduce una serie a los puntos visibles en un ancho dado de píxeles.
+
+    Divide el rango de x en ancho_px columnas y conserva de cada una el
+    primer y el último punto y los de valor mínimo y máximo (M4). La línea
+    dibujada con esos puntos ocupa los mismos píxeles que la de la serie
+    completa. Los puntos con y NaN se conservan para no unir los huecos.
+    Está vectorizado: una ordenación por columna y valor en lugar de un
+    bucle por columna.
+
+    Parameters
+    ----------
+    x : array-like
+        Abscisas ordenadas de menor a mayor.
+    y : array-like
+        Valores de la serie.
+    ancho_px : int
+        Ancho del gráfico en píxeles (ver ancho_en_pixeles).
+
+    Returns
+    -------
+    tuple
+        Tupla con (x, y) diezmados, en el mismo orden. Si la serie tiene
+        menos de cuatro puntos por píxel se devuelve entera.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if ancho_px <= 0 or n <= 4 * ancho_px:
+        return x, y
+
+    # Columna de píxel de cada punto y límites de cada columna no vacía
+    escala = ancho_px / (x[-1] - x[0]) if x[-1] > x[0] else 0.0
+    columna = np.minimum(((x - x[0]) * escala).astype(np.int64), ancho_px - 1)
+    inicios = np.flatnonzero(np.r_[True, columna[1:] != columna[:-1]])
+    finales = np.r_[inicios[1:], n] - 1
+
+    # Dentro de cada columna, ordenar por valor: el primero es el mínimo y el último el máximo
+    huecos = np.isnan(y)
+    orden_minimo = np.lexsort((np.where(huecos, np.inf, y), columna))
+    orden_maximo = np.lexsort((np.where(huecos, -np.inf, y), columna))
+
+    indices = np.unique(np.concatenate([inicios, finales, orden_minimo[inicios],
+                                        orden_maximo[finales], np.flatnonzero(huecos)]))
+    return x[indices], y[indices]
+
+
+def _precargar():
+    """Importa pandas y matplotlib en un proceso de dibujo recién creado."""
+    import pandas
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+
+def _arrancar():
+    """Tarea vacía: solo hace que el pool arranque un proceso de dibujo más."""
+
+
+def _dibujar(modulo, nombre, args, kwargs):
+    """Llama a modulo.nombre en un proceso de dibujo, descartando lo que imprime."""
+    import contextlib
+    import importlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return getattr(importlib.import_module(modulo), nombre)(*args, **kwargs)
+
+
+class RenderizadorGraficos:
+    """
+    Dibuja y guarda gráficos en procesos aparte, fuera del camino crítico.
+
+    Cada gráfico se envía como el nombre de una función de dibujo y sus
+    argumentos, y se obtiene un Future con la ruta del archivo guardado.
+    Mientras tanto, el proceso principal sigue con el análisis; esperar()
+    recoge todos los gráficos al final. Se usan procesos (con 'spawn') y no
+    hilos porque el dibujo de matplotlib apenas libera el GIL.
+
+    Parameters
+    ----------
+    procesos : int
+        Procesos de dibujo. Con 0 los gráficos se dibujan en el momento, en
+        el proceso principal, y se devuelven Futures ya resueltos.
+
+    Examples
+    --------
+    >>> with RenderizadorGraficos(procesos=1) as renderizador:
+    ...     futuro = renderizador.enviar('src.ejercicio4', 'visualizar_serie_suavizada', df)
+    ...     rutas = renderizador.esperar()
+    """
+
+    def __init__(self, procesos=1):
+        self.procesos = procesos
+        self._ejecutor = None
+        self._futuros = []
+        # Las etapas del grafo pueden enviar gráficos desde varios hilos
+        self._cerrojo = threading.Lock()
+
+    def _crear_ejecutor(self):
+        """Crea el pool de procesos la primera vez que hace falta."""
+        with self._cerrojo:
+            if self._ejecutor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                self._ejecutor = ProcessPoolExecutor(
+                    max_workers=self.procesos, mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_precargar)
+            return self._ejecutor
+
+    def iniciar(self):
+        """
+        Arranca ya los procesos de dibujo.
+
+        Así la importación de pandas y matplotlib en ellos (la hace el
+        inicializador de cada proceso) se solapa con el análisis en lugar de
+        retrasar el primer gráfico. Con 'spawn' el pool solo crea un proceso
+        por tarea pendiente, así que se envía una tarea vacía por proceso.
+        """
+        if self.procesos > 0:
+            ejecutor = self._crear_ejecutor()
+            for _ in range(self.procesos):
+                ejecutor.submit(_arrancar)
+
+    def enviar(self, modulo, nombre, *args, **kwargs):
+        """
+        Envía un gráfico a dibujar.
+
+        Parameters
+        ----------
+        modulo : str
+            Módulo que define la función de dibujo (por ejemplo 'src.ejercicio3').
+        nombre : str
+            Nombre de la función; debe devolver la ruta del archivo guardado.
+        *args, **kwargs
+            Argumentos de la función (se copian al proceso de dibujo).
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future con la ruta del archivo guardado.
+        """
+        from concurrent.futures import Future
+
+        if self.procesos <= 0:
+            futuro = Future()
+            try:
+                futuro.set_result(_dibujar(modulo, nombre, args, kwargs))
+            except Exception as error:
+                futuro.set_exception(error)
+        else:
+            futuro = self._crear_ejecutor().submit(_dibujar, modulo, nombre, args, kwargs)
+        with self._cerrojo:
+            self._futuros.append(futuro)
+        return futuro
+
+    def esperar(self):
+        """
+        Espera a que terminen todos los gráficos enviados.
+
+        Returns
+        -------
+        list
+            Rutas de los archivos guardados, en el orden de envío.
+
+        Raises
+        ------
+        Exception
+            El primer error de un gráfico, después de esperar a los demás.
+        """
+        from concurrent.futures import wait
+
+        with self._cerrojo:
+            futuros, self._futuros = self._futuros, []
+        wait(futuros)
+        return [futuro.result() for futuro in futuros]
+
+    def cerrar(self):
+        """Termina los procesos de dibujo (esperando a los gráficos pendientes)."""
+        with self._cerrojo:
+            ejecutor, self._ejecutor = self._ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.cerrar()
+        return False
@@ -0,0 +1,223 @@
+"""
+Módulo graficos_lote: Gráficos de las series suavizadas de muchas estaciones.
+
+Genera el gráfico del ejercicio 4 para cada estación del análisis en lote
+reutilizando una sola figura: las líneas, la leyenda, los ejes y el
+maquetado se crean una vez y para cada estación solo se cambian los datos
+de las líneas, el título y los límites del eje X antes de guardar. También
+genera una cuadrícula con todas las estaciones en una sola imagen.
+"""
+
+import math
+import os
+import re
+import unicodedata
+
+try:
+    from .graficos import crear_figura, crear_cuadricula, diezmar_serie, ancho_en_pixeles
+    from . import orden_temporal  # noqa: F401  (registra df.tiempo)
+except ImportError:
+    from graficos import crear_figura, crear_cuadricula, diezmar_serie, ancho_en_pixeles
+    import orden_temporal  # noqa: F401  (registra df.tiempo)
+
+
+def _directorio_imagenes(directorio):
+    """Directorio indicado o, por defecto, 'img' en la raíz del proyecto."""
+    if directorio is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        directorio = os.path.join(os.path.dirname(script_dir), 'img')
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def nombre_archivo_estacion(estacion, nombre_alumno="Samuel Viciana"):
+    """
+    Nombre del PNG de una estación, sin acentos ni espacios.
+
+    Parameters
+    ----------
+    estacion : str
+        Nombre limpio de la estación (por ejemplo 'la Baells').
+    nombre_alumno : str
+        Nombre del alumno, como en los gráficos de los ejercicios.
+
+    Returns
+    -------
+    str
+        Por ejemplo 'la_baells_smoothed_Samuel_Viciana.png'.
+    """
+    sin_acentos = unicodedata.normalize('NFKD', estacion).encode('ascii', 'ignore').decode('ascii')
+    base = re.sub(r'[^a-z0-9]+', '_', sin_acentos.lower()).strip('_') or 'estacion'
+    return f"{base}_smoothed_{nombre_alumno.replace(' ', '_')}.png"
+
+
+def series_estaciones(df_suavizado, estaciones=None):
+    """
+    Separa las series de cada estación, ordenadas por 'dia_decimal'.
+
+    Parameters
+    ----------
+    df_suavizado : pd.DataFrame
+        Series suavizadas de varias estaciones (columnas 'estacio',
+        'dia_decimal', 'nivell_perc' y 'nivell_perc_suavizado'), como las
+        devuelve analisis_lote.ejecutar_lote.
+    estaciones : list, optional
+        Estaciones a incluir, en ese orden. Por defecto, todas.
+
+    Returns
+    -------
+    list
+        Lista de tuplas (estacion, dia_decimal, nivell_perc,
+        nivell_perc_suavizado) con arrays de NumPy.
+    """
+    grupos = dict(tuple(df_suavizado.groupby('estacio', observed=True, sort=False)))
+    if estaciones is None:
+        estaciones = list(grupos)
+
+    series = []
+    for estacion in estaciones:
+        grupo = grupos.get(estacion)
+        if grupo is None or grupo.empty:
+            print(f"Advertencia: '{estacion}' no tiene datos, se omite")
+            continue
+        grupo = grupo.tiempo.ordenar('dia_decimal')
+        series.append((estacion, grupo['dia_decimal'].to_numpy(), grupo['nivell_perc'].to_numpy(),
+                       grupo['nivell_perc_suavizado'].to_numpy()))
+    return series
+
+
+def visualizar_estaciones(df_suavizado, estaciones=None, nombre_alumno="Samuel Viciana",
+                          directorio=None, umbral=60, dpi=300):
+    """
+    Guarda el gráfico de la serie suavizada de cada estación.
+
+    La figura se crea y se maqueta una sola vez; para cada estación solo se
+    actualizan los datos de las líneas (diezmados al ancho de la imagen),
+    el título y el eje X. Las imágenes tienen todas el mismo tamaño (no se
+    recortan con bbox_inches='tight', que dibuja la figura dos veces).
+
+    Parameters
+    ----------
+    df_suavizado : pd.DataFrame
+        Series suavizadas de varias estaciones (ver series_estaciones).
+    estaciones : list, optional
+        Estaciones a dibujar. Por defecto, todas.
+    nombre_alumno : str
+        Nombre del alumno para incluir en el gráfico.
+    directorio : str, optional
+        Directorio donde guardar las imágenes. Por defecto, 'img' en la raíz
+        del proyecto.
+    umbral : float
+        Umbral de sequía que se marca con una línea horizontal.
+    dpi : int
+        Resolución de las imágenes.
+
+    Returns
+    -------
+    dict
+        Ruta del PNG de cada estación.
+    """
+    print("\n=== Creando visualizaciones por estación ===")
+    img_dir = _directorio_imagenes(directorio)
+    series = series_estaciones(df_suavizado, estaciones)
+
+    # Figura, líneas y decoración comunes a todas las estaciones
+    figura, eje = crear_figura(figsize=(14, 8))
+    linea_original, = eje.plot([], [], linewidth=0.5, color='lightblue', alpha=0.6,
+                               label='Datos originales')
+    linea_suavizada, = eje.plot([], [], linewidth=3, color='darkblue', label='Señal suavizada')
+    eje.axhline(y=umbral, color='red', linestyle='--', alpha=0.5,
+                label=f'Umbral sequía ({umbral:g}%)')
+    titulo = eje.set_title('', fontsize=16, pad=20)
+    eje.set_xlabel('Año', fontsize=12)
+    eje.set_ylabel('Porcentaje de volumen embalsado (%)', fontsize=12)
+    eje.legend(loc='upper right', fontsize=10)
+    eje.grid(True, alpha=0.3)
+    eje.set_ylim(0, 105)
+    eje.text(0.5, 0.02, nombre_alumno, ha='center', transform=eje.transAxes,
+             fontsize=10, style='italic', color='gray')
+    ancho_px = ancho_en_pixeles(figura, dpi)
+
+    rutas = {}
+    for estacion, dia_decimal, nivel, suavizado in series:
+        linea_original.set_data(*diezmar_serie(dia_decimal, nivel, ancho_px))
+        linea_suavizada.set_data(*diezmar_serie(dia_decimal, suavizado, ancho_px))
+        titulo.set_text(f'Evolución del volumen del embalse de {estacion} - Análisis de tendencias')
+        eje.relim()
+        eje.autoscale_view(scaley=False)
+
+        # El maquetado solo se calcula con la primera estación
+        if not rutas:
+            figura.tight_layout()
+
+        filepath = os.path.join(img_dir, nombre_archivo_estacion(estacion, nombre_alumno))
+        figura.savefig(filepath, dpi=dpi)
+        rutas[estacion] = filepath
+
+    print(f"Gráficos guardados: {len(rutas)} en {img_dir}")
+    return rutas
+
+
+def visualizar_cuadricula(df_suavizado, estaciones=None, nombre_alumno="Samuel Viciana",
+                          directorio=None, umbral=60, columnas=4, dpi=150):
+    """
+    Guarda una cuadrícula con la serie suavizada de cada estación.
+
+    Parameters
+    ----------
+    df_suavizado : pd.DataFrame
+        Series suavizadas de varias estaciones (ver series_estaciones).
+    estaciones : list, optional
+        Estaciones a dibujar. Por defecto, todas.
+    nombre_alumno : str
+        Nombre del alumno para incluir en el gráfico.
+    directorio : str, optional
+        Directorio donde guardar la imagen. Por defecto, 'img' en la raíz
+        del proyecto.
+    umbral : float
+        Umbral de sequía que se marca en cada gráfico.
+    columnas : int
+        Gráficos por fila.
+    dpi : int
+        Resolución de la imagen.
+
+    Returns
+    -------
+    str or None
+        Ruta del archivo guardado, o None si no hay estaciones.
+    """
+    print("\n=== Creando cuadrícula de estaciones ===")
+    series = series_estaciones(df_suavizado, estaciones)
+    if not series:
+        print("No hay estaciones que dibujar")
+        return None
+
+    columnas = max(1, min(columnas, len(series)))
+    filas = math.ceil(len(series) / columnas)
+    figura, ejes = crear_cuadricula(filas, columnas, figsize=(3.5 * columnas, 2.6 * filas),
+                                    sharex=True, sharey=True)
+    ancho_px = ancho_en_pixeles(figura, dpi) // columnas
+
+    for eje, (estacion, dia_decimal, nivel, suavizado) in zip(ejes.flat, series):
+        eje.plot(*diezmar_serie(dia_decimal, nivel, ancho_px), linewidth=0.4,
+                 color='lightblue', alpha=0.6)
+        eje.plot(*diezmar_serie(dia_decimal, suavizado, ancho_px), linewidth=1.5,
+                 color='darkblue')
+        eje.axhline(y=umbral, color='red', linestyle='--', linewidth=0.8, alpha=0.5)
+        eje.set_title(estacion, fontsize=10)
+        eje.grid(True, alpha=0.3)
+    for eje in ejes.flat[len(series):]:
+        eje.set_visible(False)
+
+    ejes[0, 0].set_ylim(0, 105)
+    figura.suptitle(f'Volumen embalsado y señal suavizada por estación - {nombre_alumno}',
+                    fontsize=14)
+    figura.supxlabel('Año')
+    figura.supylabel('Porcentaje de volumen embalsado (%)')
+    figura.tight_layout()
+
+    filepath = os.path.join(_directorio_imagenes(directorio),
+                            f"estaciones_{nombre_alumno.replace(' ', '_')}.png")
+    figura.savefig(filepath, dpi=dpi)
+    print(f"Gráfico guardado en: {filepath}")
+    return filepath
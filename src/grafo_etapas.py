@@ -0,0 +1,289 @@
+"""
+Módulo grafo_etapas: Ejecución de etapas como un grafo de dependencias.
+
+Cada etapa se registra con las entradas que necesita y las salidas que
+produce. Para obtener unas salidas concretas el grafo calcula solo el
+subgrafo necesario, reutiliza los resultados ya disponibles (en memoria o
+en una caché en disco) y, si se le dan varios hilos, ejecuta a la vez las
+etapas independientes (por ejemplo, un gráfico y el suavizado siguiente).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Etapa:
+    """
+    Nodo del grafo: una función con entradas y salidas declaradas.
+
+    Parameters
+    ----------
+    nombre : str
+        Identificador único de la etapa.
+    funcion : callable
+        Se llama con las entradas y los parámetros como argumentos con
+        nombre. Devuelve el valor de la salida o, si hay varias, una tupla
+        en el orden de salidas.
+    entradas : tuple
+        Nombres de los resultados que necesita.
+    salidas : tuple
+        Nombres de los resultados que produce.
+    parametros : tuple
+        Nombres de los parámetros de ejecución que recibe.
+    cache : str, optional
+        Nombre con el que se guarda en la caché en disco. Si es None, la
+        etapa no se guarda.
+    descripcion : str, optional
+        Texto para los mensajes y la tabla de tiempos.
+    """
+
+    def __init__(self, nombre, funcion, entradas=(), salidas=(), parametros=(), cache=None,
+                 descripcion=None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.entradas = tuple(entradas)
+        self.salidas = tuple(salidas)
+        self.parametros = tuple(parametros)
+        self.cache = cache
+        self.descripcion = descripcion or nombre
+
+    def __repr__(self):
+        return f"Etapa({self.nombre!r}, entradas={self.entradas}, salidas={self.salidas})"
+
+
+class GrafoEtapas:
+    """
+    Grafo de etapas con resolución de dependencias y ejecución memorizada.
+
+    Examples
+    --------
+    >>> grafo = GrafoEtapas()
+    >>> grafo.registrar('doble', lambda x: 2 * x, entradas=('x',), salidas=('y',))
+    >>> grafo.ejecutar(['y'], {'x': 3})['y']
+    6
+    """
+
+    def __init__(self):
+        self._etapas = {}
+        self._productores = {}
+
+    def registrar(self, nombre, funcion, entradas=(), salidas=None, parametros=(), cache=None,
+                  descripcion=None):
+        """
+        Añade una etapa al grafo.
+
+        Parameters
+        ----------
+        nombre, funcion, entradas, parametros, cache, descripcion
+            Ver Etapa.
+        salidas : tuple, optional
+            Resultados que produce. Por defecto, uno con el nombre de la etapa.
+
+        Returns
+        -------
+        Etapa
+            La etapa registrada.
+        """
+        if nombre in self._etapas:
+            raise ValueError(f"La etapa '{nombre}' ya está registrada")
+        etapa = Etapa(nombre, funcion, entradas, salidas or (nombre,), parametros, cache,
+                      descripcion)
+        for salida in etapa.salidas:
+            if salida in self._productores:
+                raise ValueError(f"'{salida}' ya lo produce la etapa "
+                                 f"'{self._productores[salida].nombre}'")
+        self._etapas[nombre] = etapa
+        for salida in etapa.salidas:
+            self._productores[salida] = etapa
+        return etapa
+
+    def productor(self, salida):
+        """Etapa que produce la salida indicada."""
+        if salida not in self._productores:
+            raise ValueError(f"Ninguna etapa produce '{salida}'")
+        return self._productores[salida]
+
+    def planificar(self, objetivos, resultados, almacen=None, recalcular=(), tiempos=None):
+        """
+        Calcula las etapas necesarias para obtener los objetivos.
+
+        Una salida que ya está en resultados no se vuelve a calcular; una
+        etapa con caché cuyo resultado está en el almacén se lee (y se
+        añade a resultados) en lugar de ejecutar sus dependencias.
+
+        Parameters
+        ----------
+        objetivos : iterable of str
+            Salidas que se quieren obtener.
+        resultados : dict
+            Resultados disponibles; se completa con los leídos de la caché.
+        almacen : object, optional
+            Caché con métodos cargar(nombre) y guardar(nombre, valor).
+        recalcular : iterable of str
+            Salidas cuyas etapas se ejecutan aunque su resultado ya esté
+            disponible (sus entradas sí se reutilizan).
+        tiempos : list, optional
+            Si se indica, se añade una entrada por cada lectura de la caché.
+
+        Returns
+        -------
+        list
+            Etapas a ejecutar, en un orden compatible con sus dependencias.
+        """
+        forzadas = {self.productor(salida).nombre for salida in recalcular}
+        plan = []
+        planificadas = set()
+
+        def visitar(salida, camino):
+            etapa = self.productor(salida)
+            if etapa.nombre in planificadas:
+                return
+            if etapa.nombre not in forzadas:
+                if salida in resultados:
+                    return
+                if almacen is not None and etapa.cache is not None:
+                    if self._cargar(etapa, resultados, almacen, tiempos):
+                        return
+            if etapa.nombre in camino:
+                raise ValueError(f"Dependencia circular en la etapa '{etapa.nombre}'")
+            for entrada in etapa.entradas:
+                visitar(entrada, camino | {etapa.nombre})
+            planificadas.add(etapa.nombre)
+            plan.append(etapa)
+
+        for objetivo in objetivos:
+            visitar(objetivo, frozenset())
+        return plan
+
+    def _cargar(self, etapa, resultados, almacen, tiempos):
+        """Lee de la caché el resultado de una etapa; devuelve si estaba."""
+        inicio = time.perf_counter()
+        valor = almacen.cargar(etapa.cache)
+        if valor is None:
+            return False
+        self._guardar_salidas(etapa, valor, resultados)
+        print(f"📦 {etapa.descripcion}: resultado leído de la caché")
+        if tiempos is not None:
+            tiempos.append({'etapa': etapa.descripcion, 'segundos': time.perf_counter() - inicio,
+                            'estado': 'caché'})
+        return True
+
+    @staticmethod
+    def _guardar_salidas(etapa, valor, resultados):
+        """Reparte el valor devuelto por una etapa entre sus salidas."""
+        if len(etapa.salidas) == 1:
+            resultados[etapa.salidas[0]] = valor
+        else:
+            for salida, parte in zip(etapa.salidas, valor):
+                resultados[salida] = parte
+
+    @staticmethod
+    def _llamar(etapa, argumentos):
+        """Ejecuta la función de una etapa y devuelve (valor, segundos)."""
+        inicio = time.perf_counter()
+        valor = etapa.funcion(**argumentos)
+        return valor, time.perf_counter() - inicio
+
+    def ejecutar(self, objetivos, resultados=None, parametros=None, almacen=None,
+                 recalcular=(), hilos=1, tiempos=None):
+        """
+        Obtiene los objetivos ejecutando solo las etapas necesarias.
+
+        Parameters
+        ----------
+        objetivos : iterable of str
+            Salidas que se quieren obtener.
+        resultados : dict, optional
+            Resultados ya disponibles; se actualiza en el sitio y hace de
+            memoria entre llamadas.
+        parametros : dict, optional
+            Parámetros de ejecución; cada etapa recibe los que declara.
+        almacen : object, optional
+            Caché en disco (ver planificar). Las etapas con caché guardan en
+            ella lo que calculan.
+        recalcular : iterable of str
+            Ver planificar.
+        hilos : int
+            Número de etapas que pueden ejecutarse a la vez (por defecto 1,
+            en el orden del plan).
+        tiempos : list, optional
+            Si se indica, se añade {'etapa', 'segundos', 'estado'} por cada
+            etapa ejecutada o leída de la caché.
+
+        Returns
+        -------
+        dict
+            El diccionario de resultados.
+
+        Raises
+        ------
+        Exception
+            La primera excepción de una etapa; las que estaban en marcha se
+            dejan terminar y no se lanza ninguna etapa más.
+        """
+        if resultados is None:
+            resultados = {}
+        parametros = parametros or {}
+        if tiempos is None:
+            tiempos = []
+        plan = self.planificar(objetivos, resultados, almacen, recalcular, tiempos)
+
+        def argumentos(etapa):
+            valores = {entrada: resultados[entrada] for entrada in etapa.entradas}
+            valores.update({parametro: parametros[parametro] for parametro in etapa.parametros})
+            return valores
+
+        def terminar(etapa, valor, segundos):
+            self._guardar_salidas(etapa, valor, resultados)
+            if almacen is not None and etapa.cache is not None:
+                almacen.guardar(etapa.cache, valor)
+            tiempos.append({'etapa': etapa.descripcion, 'segundos': segundos, 'estado': 'ok'})
+
+        def fallar(etapa, segundos):
+            tiempos.append({'etapa': etapa.descripcion, 'segundos': segundos, 'estado': 'error'})
+
+        if hilos <= 1:
+            for etapa in plan:
+                inicio = time.perf_counter()
+                try:
+                    valor, segundos = self._llamar(etapa, argumentos(etapa))
+                except Exception:
+                    fallar(etapa, time.perf_counter() - inicio)
+                    raise
+                terminar(etapa, valor, segundos)
+            return resultados
+
+        pendientes = list(plan)
+        salidas_pendientes = {salida for etapa in plan for salida in etapa.salidas}
+        en_curso = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+            while en_curso or (pendientes and error is None):
+                if error is None:
+                    for etapa in list(pendientes):
+                        if len(en_curso) >= hilos:
+                            break
+                        if not salidas_pendientes.intersection(etapa.entradas):
+                            pendientes.remove(etapa)
+                            en_curso[ejecutor.submit(self._llamar, etapa,
+                                                     argumentos(etapa))] = (etapa, time.perf_counter())
+                if not en_curso:
+                    raise RuntimeError("No hay etapas listas para ejecutar: "
+                                       f"{[etapa.nombre for etapa in pendientes]}")
+
+                terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    etapa, inicio = en_curso.pop(futuro)
+                    try:
+                        valor, segundos = futuro.result()
+                    except Exception as excepcion:
+                        fallar(etapa, time.perf_counter() - inicio)
+                        if error is None:
+                            error = excepcion
+                        continue
+                    terminar(etapa, valor, segundos)
+                    salidas_pendientes.difference_update(etapa.salidas)
+
+        if error is not None:
+            raise error
+        return resultados
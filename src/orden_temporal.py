@@ -0,0 +1,147 @@
+"""
+Módulo orden_temporal: Seguimiento del orden cronológico de los DataFrames.
+
+Registra el accesor ``df.tiempo``, que recuerda si una columna temporal
+('dia_decimal' por defecto) está en orden creciente. Las funciones de los
+ejercicios 3 a 5 lo consultan antes de ordenar, de modo que un DataFrame
+ordenado una vez no se vuelve a ordenar ni a comprobar en cada paso.
+
+Examples
+--------
+>>> df_ordenado = df.tiempo.ordenar()
+>>> df_ordenado.tiempo.ordenado()
+True
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Nombre del accesor registrado en pd.DataFrame
+ACCESOR = 'tiempo'
+
+
+class OrdenTemporal:
+    """
+    Accesor ``df.tiempo`` que guarda si las columnas temporales están ordenadas.
+
+    pandas crea un accesor por DataFrame y lo reutiliza, así que el estado
+    dura lo mismo que el propio DataFrame. Cada marca guarda la vista de la
+    columna con la que se calculó: si la columna se sustituye (por ejemplo
+    ``df['dia_decimal'] = ...``) la marca deja de valer y se vuelve a
+    comprobar. Las modificaciones de valores sueltos sobre el mismo array
+    (``df.loc[i, 'dia_decimal'] = x``) no se detectan; en ese caso hay que
+    llamar a olvidar().
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame al que pertenece el accesor.
+    """
+
+    def __init__(self, df):
+        self._df = df
+        self._estado = {}
+
+    def _valores(self, columna):
+        """Vista numpy de la columna (sin copia para columnas numéricas y fechas)."""
+        return self._df[columna].to_numpy()
+
+    def _marca_vigente(self, columna):
+        """Devuelve la marca guardada para la columna o None si ya no vale."""
+        marca = self._estado.get(columna)
+        if marca is None:
+            return None
+
+        # La vista guardada mantiene vivo el array original, así que su
+        # dirección no puede reutilizarla otra columna nueva
+        vista, ordenado = marca
+        actual = self._valores(columna)
+        if (len(actual) != len(vista)
+                or actual.__array_interface__['data'][0] != vista.__array_interface__['data'][0]):
+            del self._estado[columna]
+            return None
+        return ordenado
+
+    def ordenado(self, columna='dia_decimal', comprobar=True):
+        """
+        Indica si la columna está en orden creciente.
+
+        Parameters
+        ----------
+        columna : str
+            Columna temporal a consultar.
+        comprobar : bool
+            Si es False y no hay una marca vigente, devuelve None en lugar
+            de recorrer la columna.
+
+        Returns
+        -------
+        bool or None
+            True si la columna está en orden creciente. Una columna con nulos
+            solo cuenta como ordenada si la ha ordenado ordenar() (los nulos
+            quedan al final).
+        """
+        ordenado = self._marca_vigente(columna)
+        if ordenado is None and comprobar:
+            ordenado = bool(self._df[columna].is_monotonic_increasing)
+            self._estado[columna] = (self._valores(columna), ordenado)
+        return ordenado
+
+    def marcar_ordenado(self, columna='dia_decimal'):
+        """
+        Registra, sin comprobarlo, que la columna está en orden creciente.
+
+        Parameters
+        ----------
+        columna : str
+            Columna temporal que se sabe ordenada.
+
+        Returns
+        -------
+        pd.DataFrame
+            El propio DataFrame, para poder encadenar llamadas.
+        """
+        self._estado[columna] = (self._valores(columna), True)
+        return self._df
+
+    def olvidar(self, columna=None):
+        """
+        Descarta las marcas guardadas (todas o solo las de una columna).
+
+        Parameters
+        ----------
+        columna : str, optional
+            Columna cuya marca se descarta. Por defecto, todas.
+        """
+        if columna is None:
+            self._estado.clear()
+        else:
+            self._estado.pop(columna, None)
+
+    def ordenar(self, columna='dia_decimal'):
+        """
+        Devuelve el DataFrame ordenado por la columna, ordenando solo si hace falta.
+
+        Si ya está ordenado se devuelve el mismo objeto; si no, una copia
+        ordenada de forma estable (conserva el índice, como sort_values) y
+        marcada como ordenada.
+
+        Parameters
+        ----------
+        columna : str
+            Columna temporal por la que ordenar.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame en orden creciente de la columna.
+        """
+        if self.ordenado(columna):
+            return self._df
+
+        df_ordenado = self._df.take(np.argsort(self._df[columna].to_numpy(), kind='stable'))
+        return df_ordenado.tiempo.marcar_ordenado(columna)
+
+
+pd.api.extensions.register_dataframe_accessor(ACCESOR)(OrdenTemporal)
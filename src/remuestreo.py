@@ -0,0 +1,128 @@
+"""
+Módulo remuestreo: Regularización de las series a una rejilla diaria.
+
+Este módulo contiene la etapa que va entre el ejercicio 3 y el ejercicio 4:
+el filtro Savitzky-Golay trata las filas como muestras equiespaciadas, así
+que los días que faltan en una estación se rellenan por interpolación
+lineal antes de suavizar. Los huecos más largos que un límite no se
+rellenan, para no inventar datos en períodos sin medidas.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .ejercicio3 import toYearFraction_vectorizado
+    from . import orden_temporal  # noqa: F401  (registra df.tiempo)
+except ImportError:
+    from ejercicio3 import toYearFraction_vectorizado
+    import orden_temporal  # noqa: F401  (registra df.tiempo)
+
+
+# Número máximo de días seguidos que se rellenan por interpolación
+MAX_HUECO_DIAS = 7
+
+UN_DIA = np.timedelta64(1, 'D')
+
+
+def remuestrear_diario(df, max_hueco=MAX_HUECO_DIAS):
+    """
+    Completa los días que faltan en cada estación con interpolación lineal.
+    
+    Todas las estaciones se procesan a la vez con operaciones vectorizadas.
+    Las columnas numéricas de coma flotante se interpolan linealmente en el
+    tiempo, 'dia_decimal' se recalcula para los días añadidos y el resto de
+    columnas (por ejemplo 'estacio') se copian del día anterior.
+    
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame con la columna 'dia' en formato datetime, con fechas sin
+        hora (una lectura por día), y, opcionalmente, 'estacio' con varias
+        estaciones.
+    max_hueco : int
+        Longitud máxima, en días, de los huecos que se rellenan. Los huecos
+        más largos se dejan tal cual.
+        
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame ordenado por estación y fecha, con índice continuo y la
+        columna booleana 'interpolado' que marca los días añadidos. Si solo
+        hay una estación, 'dia' y 'dia_decimal' quedan marcadas como
+        ordenadas en df.tiempo.
+        
+    Raises
+    ------
+    ValueError
+        Si alguna fecha de 'dia' tiene hora: la rejilla es de días enteros
+        y se perdería al redondear.
+    """
+    print(f"\n=== Remuestreo diario (huecos de hasta {max_hueco} días) ===")
+    
+    originales = df['dia'].values
+    dias = originales.astype('datetime64[D]')
+    con_hora = (originales != dias.astype(originales.dtype)) & ~np.isnat(originales)
+    if con_hora.any():
+        raise ValueError("La columna 'dia' tiene fechas con hora; el remuestreo es diario")
+    if 'estacio' in df.columns:
+        codigos = pd.factorize(df['estacio'], sort=True)[0]
+        orden = np.lexsort((dias, codigos))
+    else:
+        codigos = np.zeros(len(df), dtype=np.intp)
+        orden = np.argsort(dias, kind='stable')
+    
+    dias = dias[orden]
+    codigos = codigos[orden]
+    
+    # Días que faltan entre cada fila y la siguiente de la misma estación
+    faltan = np.zeros(len(dias), dtype=np.int64)
+    if len(dias) > 1:
+        faltan[:-1] = (dias[1:] - dias[:-1]).astype(np.int64) - 1
+        faltan[:-1][codigos[1:] != codigos[:-1]] = 0
+    rellenar = np.where((faltan > 0) & (faltan <= max_hueco), faltan, 0)
+    
+    # Cada fila original va seguida de los días que se añaden tras ella:
+    # 'origen' es la fila anterior y 'paso' los días transcurridos desde ella
+    filas_por_origen = rellenar + 1
+    origen = np.repeat(np.arange(len(dias)), filas_por_origen)
+    inicio_grupo = np.repeat(np.cumsum(filas_por_origen) - filas_por_origen, filas_por_origen)
+    paso = np.arange(len(origen)) - inicio_grupo
+    interpolado = paso > 0
+    
+    # Peso del día siguiente en la interpolación lineal
+    peso = paso / (rellenar[origen] + 1)
+    siguiente = np.where(interpolado, origen + 1, origen)
+    
+    df_ordenado = df.iloc[orden]
+    columnas = {}
+    for columna in df.columns:
+        if columna == 'dia':
+            columnas[columna] = dias[origen].astype(df['dia'].values.dtype) + paso * UN_DIA
+        elif columna != 'dia_decimal' and pd.api.types.is_float_dtype(df[columna]):
+            valores = df_ordenado[columna].values
+            anterior = valores[origen]
+            columnas[columna] = np.where(interpolado,
+                                         anterior + peso * (valores[siguiente] - anterior),
+                                         anterior).astype(valores.dtype, copy=False)
+        else:
+            columnas[columna] = df_ordenado[columna].take(origen).values
+    
+    df_diario = pd.DataFrame(columnas)
+    if 'dia_decimal' in df_diario.columns:
+        dia_decimal = df_diario['dia_decimal'].values.copy()
+        dia_decimal[interpolado] = toYearFraction_vectorizado(df_diario['dia'][interpolado])
+        df_diario['dia_decimal'] = dia_decimal
+    df_diario['interpolado'] = interpolado
+    
+    # Con una sola estación el resultado está en orden cronológico
+    if len(codigos) == 0 or codigos[0] == codigos[-1]:
+        df_diario.tiempo.marcar_ordenado('dia')
+        if 'dia_decimal' in df_diario.columns:
+            df_diario.tiempo.marcar_ordenado('dia_decimal')
+    
+    huecos_largos = int(np.count_nonzero(faltan > max_hueco))
+    print(f"Días añadidos por interpolación: {int(rellenar.sum())}")
+    print(f"Huecos de más de {max_hueco} días sin rellenar: {huecos_largos}")
+    
+    return df_diario
@@ -0,0 +1,172 @@
+"""
+Módulo sequia_online: Detección de sequías en tiempo real.
+
+Este módulo contiene un detector con estado que recibe las lecturas diarias
+de un embalse una a una (o en pequeños lotes) y emite eventos de inicio y
+fin de sequía sin volver a ejecutar el análisis completo. Reproducido sobre
+el histórico obtiene los mismos períodos que ejercicio5.calcula_periodos.
+"""
+
+import numpy as np
+
+try:
+    from .ejercicio4 import coeficientes_causales, coeficientes_arranque
+    from .ejercicio5 import redondear_fechas
+except ImportError:
+    from ejercicio4 import coeficientes_causales, coeficientes_arranque
+    from ejercicio5 import redondear_fechas
+
+
+class DetectorSequia:
+    """
+    Detector de sequías en línea para la serie de un embalse.
+    
+    Mantiene el estado del suavizado (las últimas window_length lecturas) y
+    el estado de sequía actual, de modo que cada lectura cuesta un tiempo
+    constante, independiente de la longitud del histórico.
+    
+    Parameters
+    ----------
+    umbral : float
+        Porcentaje umbral para definir sequía (por defecto 60%).
+    window_length : int, optional
+        Ventana del suavizado Savitzky-Golay causal. Si es None (por defecto)
+        las lecturas se consideran ya suavizadas.
+    polyorder : int
+        Orden del polinomio del suavizado.
+        
+    Examples
+    --------
+    >>> detector = DetectorSequia(umbral=60)
+    >>> detector.actualizar(2024.10, 58.3)
+    [{'tipo': 'inicio', 'dia_decimal': 2024.1, 'valor': 58.3}]
+    """
+    
+    def __init__(self, umbral=60, window_length=None, polyorder=3):
+        if window_length is not None and window_length <= polyorder:
+            raise ValueError("window_length debe ser mayor que polyorder")
+        
+        self.umbral = umbral
+        self.window_length = window_length
+        self.polyorder = polyorder
+        
+        self.en_sequia = False
+        self.lecturas = 0
+        self.ultimo_dia = None
+        self.ultimo_valor = None
+        self._inicio_actual = None
+        self._inicios = []
+        self._finales = []
+        
+        if window_length is not None:
+            # Buffer circular duplicado: cada lectura se escribe en dos
+            # posiciones para que la ventana sea siempre un tramo contiguo
+            self._buffer = np.zeros(2 * window_length)
+            self._posicion = 0
+    
+    def _suavizar(self, valor):
+        """Añade la lectura al buffer y devuelve su valor suavizado causal."""
+        ventana = self.window_length
+        self._buffer[self._posicion] = valor
+        self._buffer[self._posicion + ventana] = valor
+        self._posicion = (self._posicion + 1) % ventana
+        
+        disponibles = min(self.lecturas + 1, ventana)
+        if disponibles <= self.polyorder:
+            # Con tan pocas lecturas el polinomio pasa por todas ellas
+            return float(valor)
+        
+        if disponibles < ventana:
+            # Arranque: cada longitud se usa una sola vez, no se guarda en la caché
+            coeficientes = coeficientes_arranque([disponibles], self.polyorder)[0]
+        else:
+            coeficientes = coeficientes_causales(ventana, self.polyorder)
+        fin = self._posicion + ventana
+        return float(coeficientes @ self._buffer[fin - disponibles:fin])
+    
+    def actualizar(self, dia_decimal, valor):
+        """
+        Procesa una lectura diaria.
+        
+        Parameters
+        ----------
+        dia_decimal : float
+            Fecha de la lectura en año decimal, posterior a la anterior.
+        valor : float
+            Porcentaje de volumen embalsado.
+            
+        Returns
+        -------
+        list
+            Eventos emitidos por la lectura (vacía si no cambia el estado).
+            Cada evento es un diccionario con 'tipo' ('inicio' o 'fin'),
+            'dia_decimal' y 'valor' (el valor suavizado si hay suavizado).
+        """
+        if self.ultimo_dia is not None and dia_decimal <= self.ultimo_dia:
+            raise ValueError(f"Lectura fuera de orden: {dia_decimal} no es posterior a "
+                             f"{self.ultimo_dia}")
+        
+        if self.window_length is not None:
+            valor = self._suavizar(valor)
+        
+        eventos = []
+        bajo_umbral = valor < self.umbral
+        if bajo_umbral and not self.en_sequia:
+            self._inicio_actual = dia_decimal
+            eventos.append({'tipo': 'inicio', 'dia_decimal': dia_decimal, 'valor': valor})
+        elif self.en_sequia and not bajo_umbral:
+            # Como en calcula_periodos, la sequía acaba el primer día fuera de ella
+            self._inicios.append(self._inicio_actual)
+            self._finales.append(dia_decimal)
+            self._inicio_actual = None
+            eventos.append({'tipo': 'fin', 'dia_decimal': dia_decimal, 'valor': valor})
+        
+        self.en_sequia = bajo_umbral
+        self.lecturas += 1
+        self.ultimo_dia = dia_decimal
+        self.ultimo_valor = valor
+        return eventos
+    
+    def actualizar_lote(self, dias_decimales, valores):
+        """
+        Procesa un pequeño lote de lecturas en orden cronológico.
+        
+        Parameters
+        ----------
+        dias_decimales : array-like
+            Fechas de las lecturas en año decimal.
+        valores : array-like
+            Porcentajes de volumen embalsado.
+            
+        Returns
+        -------
+        list
+            Eventos emitidos por todas las lecturas del lote, en orden.
+        """
+        eventos = []
+        for dia_decimal, valor in zip(np.asarray(dias_decimales, dtype=float).tolist(),
+                                      np.asarray(valores, dtype=float).tolist()):
+            eventos.extend(self.actualizar(dia_decimal, valor))
+        return eventos
+    
+    def periodos(self):
+        """
+        Devuelve los períodos de sequía detectados hasta ahora.
+        
+        Si la serie está en sequía, el último período se cierra en la última
+        lectura, igual que hace calcula_periodos al final de la serie.
+        
+        Returns
+        -------
+        list
+            Lista de períodos [inicio, fin] en años decimales redondeados a
+            2 decimales.
+        """
+        inicios = list(self._inicios)
+        finales = list(self._finales)
+        if self.en_sequia:
+            inicios.append(self._inicio_actual)
+            finales.append(self.ultimo_dia)
+        
+        return [list(periodo) for periodo in zip(redondear_fechas(inicios),
+                                                 redondear_fechas(finales))]
@@ -16,5 +16,14 @@ __all__ = [
     'test_ejercicio3',
     'test_ejercicio4',
     'test_ejercicio5',
+    'test_analisis_lote',
+    'test_sequia_online',
+    'test_remuestreo',
+    'test_orden_temporal',
+    'test_main',
+    'test_cache_etapas',
+    'test_grafo_etapas',
+    'test_graficos',
+    'test_graficos_lote',
     'test_runner'
 ]
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Tests para el módulo analisis_lote: análisis de todos los embalses.
+
+Este módulo comprueba que el análisis en lote obtiene, para cada estación,
+los mismos resultados que el flujo individual de los ejercicios 2 a 5.
+"""
+
+import unittest
+import os
+import sys
+import pandas as pd
+import numpy as np
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analisis_lote import ejecutar_lote, COLUMNAS_PERIODOS
+from src.ejercicio2 import ejecutar_ejercicio2
+from src.ejercicio3 import convertir_a_datetime, crear_columna_dia_decimal
+from src.ejercicio4 import suavizar_serie_temporal
+from src.ejercicio5 import calcula_periodos
+
+
+def crear_dataset_sintetico(dias=400):
+    """Crea un dataset original con dos estaciones intercaladas."""
+    fechas = pd.date_range('2020-01-01', periods=dias, freq='D')
+    tiempo = np.arange(dias)
+    baells = 60 + 20 * np.sin(2 * np.pi * tiempo / 180)
+    sau = 70 + 25 * np.cos(2 * np.pi * tiempo / 120)
+    return pd.DataFrame({
+        'Dia': np.repeat(fechas.strftime('%d/%m/%Y'), 2),
+        'Estació': ['Embassament de la Baells (Berga)',
+                    'Embassament de Sau (Vilanova de Sau)'] * dias,
+        'Nivell absolut (msnm)': np.ravel(np.column_stack([baells, sau])) + 600,
+        'Percentatge volum embassat (%)': np.ravel(np.column_stack([baells, sau])),
+        'Volum embassat (hm3)': np.ravel(np.column_stack([baells, sau])) * 1.1
+    })
+
+
+class TestAnalisisLote(unittest.TestCase):
+    """Tests del análisis en lote."""
+
+    def setUp(self):
+        """Configuración para cada test individual."""
+        self.df_test = crear_dataset_sintetico()
+
+    def test_coincide_con_flujo_individual(self):
+        """Los períodos de La Baells coinciden con los del flujo de los ejercicios."""
+        with patch('sys.stdout', new=StringIO()):
+            df_periodos, df_suavizado, _ = ejecutar_lote(self.df_test, window_length=31)
+
+            df_baells = ejecutar_ejercicio2(self.df_test)
+            df_decimal = crear_columna_dia_decimal(convertir_a_datetime(df_baells))
+            df_individual = suavizar_serie_temporal(df_decimal, window_length=31)
+            periodos = calcula_periodos(df_individual)
+
+        periodos_lote = df_periodos[df_periodos['estacio'] == 'la Baells']
+        self.assertListEqual(periodos_lote[['inicio', 'fin']].values.tolist(), periodos)
+
+        suavizado_lote = df_suavizado[df_suavizado['estacio'] == 'la Baells']
+        np.testing.assert_allclose(suavizado_lote['nivell_perc_suavizado'].values,
+                                   df_individual['nivell_perc_suavizado'].values)
+
+    def test_tabla_y_metricas(self):
+        """La tabla combinada tiene las columnas esperadas y se mide el rendimiento."""
+        with patch('sys.stdout', new=StringIO()):
+            df_periodos, df_suavizado, metricas = ejecutar_lote(self.df_test, window_length=31)
+
+        self.assertListEqual(list(df_periodos.columns), COLUMNAS_PERIODOS)
+        self.assertEqual(set(df_periodos['estacio']), {'la Baells', 'Sau'})
+        self.assertEqual(len(df_suavizado), len(self.df_test))
+        self.assertEqual(metricas['estaciones'], 2)
+        self.assertGreater(metricas['estaciones_por_segundo'], 0)
+
+    def test_estaciones_seleccionadas(self):
+        """Solo se analizan las estaciones pedidas y se omiten las inexistentes."""
+        with patch('sys.stdout', new=StringIO()) as salida:
+            df_periodos, _, metricas = ejecutar_lote(self.df_test, estaciones=['Sau', 'Foix'],
+                                                     window_length=31)
+
+        self.assertEqual(set(df_periodos['estacio']), {'Sau'})
+        self.assertEqual(metricas['estaciones'], 1)
+        self.assertIn("Foix", salida.getvalue())
+
+    def test_estacion_demasiado_corta(self):
+        """Una estación con menos muestras de las que necesita el filtro se omite."""
+        df_corta = self.df_test[self.df_test['Estació'].str.contains('Sau')].head(5).copy()
+        df_corta['Estació'] = 'Embassament de Foix (Castellet i la Gornal)'
+        df_mixto = pd.concat([self.df_test, df_corta], ignore_index=True)
+        with patch('sys.stdout', new=StringIO()) as salida:
+            df_periodos, df_suavizado, metricas = ejecutar_lote(df_mixto, window_length=31,
+                                                                polyorder=3)
+
+        self.assertEqual(metricas['estaciones'], 2)
+        self.assertNotIn('Foix', set(df_suavizado['estacio']))
+        self.assertIn("'Foix' no tiene datos suficientes", salida.getvalue())
+
+    def test_solo_suavizado(self):
+        """Sin umbral se suavizan las series igual pero no se calculan períodos."""
+        with patch('sys.stdout', new=StringIO()):
+            _, df_completo, _ = ejecutar_lote(self.df_test, window_length=31)
+            for procesos in (1, 2):
+                with patch('src.analisis_lote.calcula_periodos_arrays') as periodos:
+                    df_periodos, df_suavizado, _ = ejecutar_lote(
+                        self.df_test, window_length=31, umbral=None, procesos=procesos)
+                    periodos.assert_not_called()
+                self.assertTrue(df_periodos.empty)
+                pd.testing.assert_frame_equal(df_suavizado, df_completo)
+
+    def test_procesos_mismo_resultado(self):
+        """Repartir las estaciones entre procesos no cambia los resultados ni su orden."""
+        with patch('sys.stdout', new=StringIO()):
+            secuencial = ejecutar_lote(self.df_test, window_length=31)
+            paralelo = ejecutar_lote(self.df_test, window_length=31, procesos=2)
+
+        pd.testing.assert_frame_equal(paralelo[0], secuencial[0])
+        pd.testing.assert_frame_equal(paralelo[1], secuencial[1])
+        self.assertEqual(paralelo[2]['procesos'], 2)
+
+    def test_remuestreo_antes_de_suavizar(self):
+        """Con max_hueco se rellenan los días que faltan antes de suavizar."""
+        df_huecos = self.df_test.drop(index=range(100, 110))
+        with patch('sys.stdout', new=StringIO()):
+            _, df_suavizado, _ = ejecutar_lote(df_huecos, window_length=31, max_hueco=7)
+
+        self.assertEqual(len(df_suavizado), len(self.df_test))
+        self.assertEqual(int(df_suavizado['interpolado'].sum()), 10)
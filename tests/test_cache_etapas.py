@@ -0,0 +1,108 @@
+"""
+Tests para el módulo cache_etapas: caché en disco de los resultados de cada ejercicio.
+
+Este módulo comprueba que las claves dependen del contenido del CSV y de
+los parámetros de cada etapa, que los resultados se recuperan intactos y
+que ejecutar un ejercicio en un proceso nuevo solo lee los previos.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from src.cache_etapas import AlmacenEtapas
+
+
+class TestAlmacenEtapas(unittest.TestCase):
+    """Tests de AlmacenEtapas."""
+
+    def setUp(self):
+        """CSV pequeño de La Baells en un directorio temporal."""
+        self.directorio = tempfile.mkdtemp(prefix='pec4_cache_')
+        fechas = pd.date_range('2000-01-01', periods=700, freq='D')
+        porcentaje = 60 + 30 * np.sin(np.arange(700) / 60.0)
+        self.ruta_csv = os.path.join(self.directorio, 'embalses.csv')
+        pd.DataFrame({
+            'Dia': fechas.strftime('%d/%m/%Y'),
+            'Estació': 'Embassament de la Baells (Cercs)',
+            'Nivell absolut (msnm)': 600 + porcentaje * 0.4,
+            'Percentatge volum embassat (%)': np.round(porcentaje, 1),
+            'Volum embassat (hm3)': porcentaje * 1.1
+        }).to_csv(self.ruta_csv, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_claves(self):
+        """Cambiar un parámetro solo cambia la clave de su etapa y las siguientes."""
+        base = AlmacenEtapas(self.ruta_csv, {'window_length': 101})
+        otro_umbral = AlmacenEtapas(self.ruta_csv, {'window_length': 101, 'umbral': 50})
+        otra_ventana = AlmacenEtapas(self.ruta_csv, {'window_length': 201})
+
+        self.assertEqual(base.clave('df_suavizado'), otro_umbral.clave('df_suavizado'))
+        self.assertNotEqual(base.clave('periodos'), otro_umbral.clave('periodos'))
+        self.assertEqual(base.clave('df_decimal'), otra_ventana.clave('df_decimal'))
+        self.assertNotEqual(base.clave('df_suavizado'), otra_ventana.clave('df_suavizado'))
+
+        # Otro contenido del CSV cambia todas las claves
+        with open(self.ruta_csv, 'a', encoding='utf-8') as archivo:
+            archivo.write('10/12/2001,Embassament de la Baells (Cercs),610.0,50.0,55.0\n')
+        self.assertNotEqual(AlmacenEtapas(self.ruta_csv).clave('df_baells'),
+                            base.clave('df_baells'))
+
+    def test_guardar_y_cargar(self):
+        """Los DataFrames y los períodos se recuperan iguales, con la marca de orden."""
+        almacen = AlmacenEtapas(self.ruta_csv)
+        self.assertIsNone(almacen.cargar('df_suavizado'))
+
+        df = pd.DataFrame({'dia': pd.date_range('2000-01-01', periods=5),
+                           'estacio': pd.Categorical(['la Baells'] * 5),
+                           'dia_decimal': np.linspace(2000, 2000.1, 5),
+                           'nivell_perc_suavizado': np.arange(5.0)})
+        df.tiempo.marcar_ordenado('dia_decimal')
+        almacen.guardar('df_suavizado', df)
+        df_info = pd.DataFrame({'Período': [1], 'Duración (días)': [30]})
+        almacen.guardar('periodos', ([[2000.5, 2000.58]], df_info))
+
+        nuevo = AlmacenEtapas(self.ruta_csv)
+        df_leido = nuevo.cargar('df_suavizado')
+        pd.testing.assert_frame_equal(df_leido, df)
+        self.assertTrue(df_leido.tiempo.ordenado(comprobar=False))
+        periodos, df_info_leido = nuevo.cargar('periodos')
+        self.assertEqual(periodos, [[2000.5, 2000.58]])
+        pd.testing.assert_frame_equal(df_info_leido, df_info)
+
+    def test_menu_sin_cache(self):
+        """Por defecto (como en el menú) no se escribe nada en '.cache'."""
+        with patch('sys.stdout', new=StringIO()):
+            resultados = main.ejecutar_ejercicio_individual('2', self.ruta_csv, {})
+        self.assertIn('df_baells', resultados)
+        self.assertFalse(os.path.exists(os.path.join(self.directorio, '.cache')))
+
+    def test_ejercicio5_en_proceso_nuevo(self):
+        """Con la caché llena, el ejercicio 5 solo lee 'df_suavizado'."""
+        with patch('sys.stdout', new=StringIO()):
+            esperado = main.ejecutar_ejercicio_individual('5', self.ruta_csv, {}, cache=True)
+
+            with patch.object(main, 'ejecutar_ejercicio1') as ejercicio1, \
+                    patch.object(main, 'ejecutar_ejercicio4') as ejercicio4:
+                resultados = main.ejecutar_ejercicio_individual('5', self.ruta_csv, {}, cache=True)
+            ejercicio1.assert_not_called()
+            ejercicio4.assert_not_called()
+
+        self.assertNotIn('df_decimal', resultados)
+        self.assertEqual(resultados['periodos'], esperado['periodos'])
+        pd.testing.assert_frame_equal(resultados['df_suavizado'], esperado['df_suavizado'])
+
+
+if __name__ == '__main__':
+    unittest.main()
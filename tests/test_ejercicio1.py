@@ -22,7 +22,12 @@ from src.ejercicio1 import (
     mostrar_primeras_filas, 
     mostrar_columnas, 
     mostrar_informacion,
-    ejecutar_ejercicio1
+    ejecutar_ejercicio1,
+    medir_carga,
+    motor_csv_disponible,
+    huella_archivo,
+    ingesta_incremental,
+    cargar_almacen
 )
 
 
@@ -261,4 +266,182 @@ class TestEjercicio1(unittest.TestCase):
             print(f"{status} {test_name}: {score}/1")
         print(f"{'='*50}")
         print(f"PUNTUACIÓN TOTAL: {cls.score}/{cls.max_score}")
-        print(f"{'='*50}\n")
\ No newline at end of file
+        print(f"{'='*50}\n")
+
+
+class TestCargaTipada(unittest.TestCase):
+    """Tests de la carga con esquema de tipos explícito."""
+    
+    def setUp(self):
+        """Crea un CSV temporal con el formato original."""
+        self.df_test = pd.DataFrame({
+            'Dia': ['01/01/2024', '02/01/2024', '03/01/2024'],
+            'Estació': ['Embassament de la Baells (Berga)', 
+                       'Embassament de Sau (Vilanova de Sau)', 
+                       'Embassament de la Baells (Berga)'],
+            'Nivell absolut (msnm)': [632.5, 425.3, 633.1],
+            'Percentatge volum embassat (%)': [75.2, 68.5, 76.8],
+            'Volum embassat (hm3)': [82.3, 125.6, 84.1]
+        })
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            self.df_test.to_csv(f.name, index=False)
+            self.temp_file = f.name
+    
+    def tearDown(self):
+        """Elimina el CSV temporal."""
+        os.unlink(self.temp_file)
+    
+    def test_tipos_declarados(self):
+        """La carga tipada aplica categoría, float32 y fechas parseadas."""
+        df = cargar_dataset(self.temp_file, tipado=True, motor='c')
+        
+        self.assertEqual(df['Estació'].dtype, 'category')
+        self.assertEqual(df['Percentatge volum embassat (%)'].dtype, 'float32')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['Dia']))
+        self.assertEqual(df['Dia'].iloc[1], pd.Timestamp('2024-01-02'))
+    
+    @unittest.skipUnless(motor_csv_disponible() == 'pyarrow', "pyarrow no instalado")
+    def test_motores_equivalentes(self):
+        """Los motores C y pyarrow producen el mismo DataFrame."""
+        df_c = cargar_dataset(self.temp_file, tipado=True, motor='c')
+        df_arrow = cargar_dataset(self.temp_file, tipado=True, motor='pyarrow')
+        pd.testing.assert_frame_equal(df_c, df_arrow, check_categorical=False)
+    
+    def test_medir_carga(self):
+        """medir_carga devuelve filas por segundo y bytes en memoria."""
+        with patch('sys.stdout'):
+            df, metricas = medir_carga(self.temp_file, tipado=True, motor='c')
+        
+        self.assertEqual(metricas['filas'], 3)
+        self.assertGreater(metricas['filas_por_segundo'], 0)
+        self.assertEqual(metricas['bytes_memoria'],
+                         df.memory_usage(deep=True).sum())
+
+
+class TestCacheColumnar(unittest.TestCase):
+    """Tests de la caché columnar de cargar_dataset."""
+    
+    def setUp(self):
+        """Crea un CSV en un directorio temporal."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.ruta_csv = os.path.join(self.temp_dir, 'embalses.csv')
+        self.df_test = pd.DataFrame({
+            'Dia': ['01/01/2024', '02/01/2024'],
+            'Estació': ['Embassament de la Baells (Berga)', 
+                       'Embassament de Sau (Vilanova de Sau)'],
+            'Nivell absolut (msnm)': [632.5, 425.3],
+            'Percentatge volum embassat (%)': [75.2, 68.5],
+            'Volum embassat (hm3)': [82.3, 125.6]
+        })
+        self.df_test.to_csv(self.ruta_csv, index=False)
+    
+    def tearDown(self):
+        """Elimina el directorio temporal."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def test_segunda_carga_desde_cache(self):
+        """La segunda carga se sirve desde la copia binaria sin leer el CSV."""
+        df_primera = cargar_dataset(self.ruta_csv, tipado=True, cache=True)
+        self.assertTrue(os.listdir(os.path.join(self.temp_dir, '.cache')))
+        
+        with patch('src.ejercicio1._leer_csv_tipado') as lector:
+            df_segunda = cargar_dataset(self.ruta_csv, tipado=True, cache=True)
+            lector.assert_not_called()
+        pd.testing.assert_frame_equal(df_primera, df_segunda)
+    
+    @unittest.skipUnless(motor_csv_disponible() == 'pyarrow', "pyarrow no instalado")
+    def test_copia_por_motor(self):
+        """Una carga con otro motor no se sirve con la copia parseada por el primero."""
+        cargar_dataset(self.ruta_csv, tipado=True, motor='c', cache=True)
+        with patch('src.ejercicio1._leer_csv_tipado', return_value=self.df_test) as lector:
+            cargar_dataset(self.ruta_csv, tipado=True, motor='pyarrow', cache=True)
+            lector.assert_called_once_with(self.ruta_csv, 'pyarrow')
+    
+    def test_cache_se_reconstruye_si_cambia_el_csv(self):
+        """Si el CSV cambia, la caché se invalida y se vuelve a parsear."""
+        cargar_dataset(self.ruta_csv, cache=True)
+        
+        df_nuevo = pd.concat([self.df_test, self.df_test], ignore_index=True)
+        df_nuevo.to_csv(self.ruta_csv, index=False)
+        
+        df_cargado = cargar_dataset(self.ruta_csv, cache=True)
+        self.assertEqual(len(df_cargado), 4)
+        # Solo queda una copia binaria por modo de carga
+        copias = [f for f in os.listdir(os.path.join(self.temp_dir, '.cache'))
+                  if not f.endswith('.json')]
+        self.assertEqual(len(copias), 1)
+    
+    def test_huella_reutiliza_hash(self):
+        """Con el mismo tamaño y fecha no se vuelve a leer el contenido."""
+        huella = huella_archivo(self.ruta_csv)
+        with patch('builtins.open') as apertura:
+            huella_repetida = huella_archivo(self.ruta_csv, huella)
+            apertura.assert_not_called()
+        self.assertEqual(huella, huella_repetida)
+
+
+class TestIngestaIncremental(unittest.TestCase):
+    """Tests de la ingesta incremental de exportaciones diarias."""
+    
+    def setUp(self):
+        """Crea dos exportaciones: la segunda repite la primera y añade un día."""
+        import shutil
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.almacen = os.path.join(self.temp_dir, 'almacen')
+        
+        fechas = pd.date_range('2024-01-01', periods=5, freq='D').strftime('%d/%m/%Y')
+        estaciones = ['Embassament de la Baells (Berga)', 'Embassament de Sau (Vilanova de Sau)']
+        self.df_completo = pd.DataFrame({
+            'Dia': [dia for dia in fechas for _ in estaciones],
+            'Estació': estaciones * len(fechas),
+            'Nivell absolut (msnm)': range(10),
+            'Percentatge volum embassat (%)': range(10),
+            'Volum embassat (hm3)': range(10)
+        })
+        self.ruta_csv = os.path.join(self.temp_dir, 'export.csv')
+    
+    def test_solo_se_anaden_filas_nuevas(self):
+        """La segunda ingesta devuelve solo el día nuevo y su contexto."""
+        with patch('sys.stdout'):
+            self.df_completo.iloc[:8].to_csv(self.ruta_csv, index=False)
+            df_nuevas, df_contexto = ingesta_incremental(self.ruta_csv, self.almacen,
+                                                         filas_contexto=2)
+            self.assertEqual(len(df_nuevas), 8)
+            self.assertEqual(len(df_contexto), 0)
+            
+            self.df_completo.to_csv(self.ruta_csv, index=False)
+            df_nuevas, df_contexto = ingesta_incremental(self.ruta_csv, self.almacen,
+                                                         filas_contexto=2)
+        
+        self.assertEqual(len(df_nuevas), 2)
+        self.assertTrue((df_nuevas['Dia'] == pd.Timestamp('2024-01-05')).all())
+        # Dos filas de contexto por estación, anteriores al día nuevo
+        self.assertEqual(len(df_contexto), 4)
+        self.assertTrue((df_contexto['Dia'] < pd.Timestamp('2024-01-05')).all())
+        self.assertEqual(len(cargar_almacen(self.almacen)), 10)
+    
+    def test_exportacion_repetida_no_anade_filas(self):
+        """Ingerir dos veces el mismo archivo no duplica filas."""
+        with patch('sys.stdout'):
+            self.df_completo.to_csv(self.ruta_csv, index=False)
+            ingesta_incremental(self.ruta_csv, self.almacen)
+            df_nuevas, _ = ingesta_incremental(self.ruta_csv, self.almacen)
+        
+        self.assertEqual(len(df_nuevas), 0)
+        self.assertEqual(len(cargar_almacen(self.almacen)), 10)
+    
+    def test_archivo_sin_cambios_no_devuelve_contexto(self):
+        """Si el archivo no cambia no se devuelve contexto de ninguna estación."""
+        with patch('sys.stdout'):
+            self.df_completo.iloc[:8].to_csv(self.ruta_csv, index=False)
+            ingesta_incremental(self.ruta_csv, self.almacen, filas_contexto=2)
+            self.df_completo.to_csv(self.ruta_csv, index=False)
+            ingesta_incremental(self.ruta_csv, self.almacen, filas_contexto=2)
+            df_nuevas, df_contexto = ingesta_incremental(self.ruta_csv, self.almacen,
+                                                         filas_contexto=2)
+        
+        self.assertEqual(len(df_nuevas), 0)
+        self.assertEqual(len(df_contexto), 0)
+        self.assertEqual(len(cargar_almacen(self.almacen)), 10)
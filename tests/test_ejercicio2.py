@@ -14,15 +14,21 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+import tempfile
+from io import StringIO
+from unittest.mock import patch
 
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ejercicio2 import (
     renombrar_columnas,
     mostrar_pantanos_unicos,
     limpiar_nombres_pantanos,
     filtrar_la_baells,
-    ejecutar_ejercicio2
+    ejecutar_ejercicio2,
+    cargar_estaciones_en_bloques,
+    indexar_estaciones,
+    filtrar_estacion
 )
 
 
@@ -259,4 +265,115 @@ class TestEjercicio2(unittest.TestCase):
             print(f"{status} {test_name}: {score}/1")
         print(f"{'='*50}")
         print(f"PUNTUACIÓN TOTAL: {cls.score}/{cls.max_score}")
-        print(f"{'='*50}\n")
\ No newline at end of file
+        print(f"{'='*50}\n")
+
+
+class TestCargaEnBloques(unittest.TestCase):
+    """Tests de la carga por bloques filtrando estaciones."""
+    
+    def setUp(self):
+        """Crea un CSV temporal con varias estaciones intercaladas."""
+        self.df_test = pd.DataFrame({
+            'Dia': ['01/01/2024', '01/01/2024', '02/01/2024', '02/01/2024', '03/01/2024'],
+            'Estació': ['Embassament de la Baells (Berga)', 
+                       'Embassament de Sau (Vilanova de Sau)', 
+                       'Embassament de la Baells (Berga)',
+                       'Embassament de Susqueda (Susqueda)',
+                       'Embassament de la Baells (Berga)'],
+            'Nivell absolut (msnm)': [632.5, 425.3, 633.1, 337.2, 633.4],
+            'Percentatge volum embassat (%)': [75.2, 68.5, 76.8, 82.1, 77.0],
+            'Volum embassat (hm3)': [82.3, 125.6, 84.1, 178.9, 84.5]
+        })
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            self.df_test.to_csv(f.name, index=False)
+            self.temp_file = f.name
+    
+    def tearDown(self):
+        """Elimina el CSV temporal."""
+        os.unlink(self.temp_file)
+    
+    def test_equivale_a_filtrar_el_dataset_completo(self):
+        """El resultado por bloques coincide con el flujo del ejercicio 2."""
+        with patch('sys.stdout', new=StringIO()):
+            df_completo = filtrar_la_baells(
+                limpiar_nombres_pantanos(renombrar_columnas(self.df_test)))
+            df_bloques = cargar_estaciones_en_bloques(self.temp_file, tamano_bloque=2)
+        
+        pd.testing.assert_frame_equal(df_completo, df_bloques, check_categorical=False)
+    
+    def test_varias_estaciones(self):
+        """Se pueden conservar varias estaciones a la vez."""
+        with patch('sys.stdout', new=StringIO()):
+            df_bloques = cargar_estaciones_en_bloques(
+                self.temp_file, estaciones=['Sau', 'Susqueda'], tamano_bloque=2, tipado=True)
+        
+        self.assertEqual(set(df_bloques['estacio']), {'Sau', 'Susqueda'})
+        self.assertEqual(len(df_bloques), 2)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df_bloques['dia']))
+
+
+class TestLimpiezaCategorica(unittest.TestCase):
+    """Tests de la limpieza de nombres sobre los valores únicos."""
+    
+    def setUp(self):
+        """DataFrame con nombres repetidos, un nulo y dos originales equivalentes."""
+        self.df_test = pd.DataFrame({
+            'estacio': ['Embassament de la Baells (Berga)',
+                        'Embassament de Sau (Vilanova de Sau)',
+                        'Embassament de la Baells (Berga)',
+                        'Embassament de la Baells (Cercs)',
+                        None],
+            'nivell_perc': [75.2, 68.5, 76.8, 77.0, 50.0]
+        })
+    
+    def test_resultado_categorico(self):
+        """La columna limpia es categórica y conserva el nombre de cada fila."""
+        with patch('sys.stdout', new=StringIO()):
+            df_limpio = limpiar_nombres_pantanos(self.df_test)
+        
+        self.assertEqual(df_limpio['estacio'].dtype, 'category')
+        self.assertListEqual(list(df_limpio['estacio'].cat.categories), ['la Baells', 'Sau'])
+        self.assertListEqual(df_limpio['estacio'].iloc[:4].tolist(),
+                             ['la Baells', 'Sau', 'la Baells', 'la Baells'])
+        self.assertTrue(pd.isna(df_limpio['estacio'].iloc[4]))
+    
+    def test_limpieza_una_vez_por_nombre(self):
+        """limpiar_nombre se llama una vez por cada nombre original distinto."""
+        import src.ejercicio2
+        with patch('sys.stdout', new=StringIO()), \
+                patch.object(src.ejercicio2, 'limpiar_nombre',
+                             wraps=src.ejercicio2.limpiar_nombre) as limpiador:
+            limpiar_nombres_pantanos(pd.concat([self.df_test] * 100, ignore_index=True))
+        
+        # 3 nombres distintos más los 3 ejemplos que se imprimen
+        self.assertEqual(limpiador.call_count, 6)
+
+
+class TestIndiceEstaciones(unittest.TestCase):
+    """Tests del índice por estación."""
+    
+    def setUp(self):
+        """DataFrame limpio con estaciones intercaladas."""
+        self.df_test = pd.DataFrame({
+            'dia': ['01/01/2024', '01/01/2024', '02/01/2024', '02/01/2024', '03/01/2024'],
+            'estacio': pd.Categorical(['la Baells', 'Sau', 'la Baells', 'Susqueda', 'la Baells']),
+            'nivell_perc': [75.2, 68.5, 76.8, 82.1, 77.0]
+        })
+    
+    def test_bloques_equivalen_al_filtrado(self):
+        """Cada bloque coincide con el filtrado por comparación booleana."""
+        indice = indexar_estaciones(self.df_test)
+        
+        self.assertEqual(set(indice), {'la Baells', 'Sau', 'Susqueda'})
+        for estacion, bloque in indice.items():
+            pd.testing.assert_frame_equal(bloque, filtrar_estacion(self.df_test, estacion))
+    
+    def test_filtrar_la_baells_con_indice(self):
+        """Con índice, filtrar_la_baells devuelve el bloque sin recorrer el DataFrame."""
+        indice = indexar_estaciones(self.df_test)
+        with patch('sys.stdout', new=StringIO()):
+            df_baells = filtrar_la_baells(self.df_test, indice)
+        
+        self.assertIs(df_baells, indice['la Baells'])
+        self.assertListEqual(df_baells['nivell_perc'].tolist(), [75.2, 76.8, 77.0])
+        self.assertEqual(len(filtrar_estacion(self.df_test, 'Foix', indice)), 0)
@@ -17,13 +17,16 @@ import numpy as np
 from datetime import datetime
 import tempfile
 import shutil
+from io import StringIO
+from unittest.mock import patch
 
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ejercicio3 import (
     convertir_a_datetime,
     analizar_rango_temporal,
     toYearFraction,
+    toYearFraction_vectorizado,
     crear_columna_dia_decimal,
     visualizar_evolucion_volumen,
     ejecutar_ejercicio3
@@ -298,4 +301,52 @@ class TestEjercicio3(unittest.TestCase):
         print(f"{'='*50}\n")
         
         # Limpiar directorio temporal
-        shutil.rmtree(cls.temp_dir)
\ No newline at end of file
+        shutil.rmtree(cls.temp_dir)
+
+
+class TestDiaDecimalVectorizado(unittest.TestCase):
+    """Tests de la conversión vectorizada a año decimal."""
+    
+    def test_identico_a_toYearFraction(self):
+        """Coincide exactamente con toYearFraction, incluidos los bisiestos."""
+        fechas = pd.Series(pd.date_range('1999-12-25', '2005-01-05', freq='D'))
+        fechas = pd.concat([fechas, pd.Series(pd.to_datetime(
+            ['2000-02-29 13:45:10', '2024-12-31 23:59:59', '1900-03-01 00:00:00']))])
+        
+        esperado = fechas.apply(toYearFraction).to_numpy()
+        obtenido = toYearFraction_vectorizado(fechas)
+        
+        np.testing.assert_array_equal(obtenido, esperado)
+    
+    def test_fechas_nulas(self):
+        """Las fechas NaT se convierten en NaN."""
+        fechas = pd.Series([pd.Timestamp('2024-07-01'), pd.NaT])
+        resultado = toYearFraction_vectorizado(fechas)
+        
+        self.assertEqual(resultado[0], toYearFraction(datetime(2024, 7, 1)))
+        self.assertTrue(np.isnan(resultado[1]))
+
+
+class TestSinCopias(unittest.TestCase):
+    """Tests de que los pasos del ejercicio 3 no duplican ni modifican los datos."""
+    
+    def setUp(self):
+        """Configuración para cada test individual."""
+        self.df_test = pd.DataFrame({
+            'dia': ['01/01/2023', '15/06/2023', '31/12/2023', '01/01/2024'],
+            'estacio': ['la Baells'] * 4,
+            'nivell_perc': [75.2, 65.5, 82.8, 79.3]
+        })
+    
+    def test_columnas_compartidas_y_original_intacto(self):
+        """Las columnas que no cambian se comparten y el DataFrame de entrada no se toca."""
+        original = self.df_test.copy()
+        
+        with patch('sys.stdout', new=StringIO()):
+            df_datetime = convertir_a_datetime(self.df_test)
+            df_decimal = crear_columna_dia_decimal(df_datetime)
+        
+        self.assertTrue(np.shares_memory(df_decimal['nivell_perc'].values,
+                                         self.df_test['nivell_perc'].values))
+        self.assertNotIn('dia_decimal', df_datetime.columns)
+        pd.testing.assert_frame_equal(self.df_test, original)
@@ -16,11 +16,20 @@ import pandas as pd
 import numpy as np
 import tempfile
 import shutil
+from io import StringIO
+from unittest.mock import patch
+from scipy.signal import savgol_filter
 
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ejercicio4 import (
     suavizar_serie_temporal,
+    suavizar_causal,
+    suavizar_incremental,
+    coeficientes_causales,
+    coeficientes_arranque,
+    banco_savgol,
+    filtrar_savgol,
     visualizar_serie_suavizada,
     analizar_tendencias,
     ejecutar_ejercicio4
@@ -288,3 +297,157 @@ class TestEjercicio4(unittest.TestCase):
             shutil.rmtree(cls.temp_dir)
         except:
             pass  # No es crítico si falla la limpieza
+
+
+class TestSuavizadoIncremental(unittest.TestCase):
+    """Tests del suavizado incremental y del suavizado causal."""
+    
+    def setUp(self):
+        """Serie larga de paseo aleatorio repartida en entregas."""
+        generador = np.random.default_rng(5)
+        self.valores = 60 + generador.normal(0, 1, 6000).cumsum()
+        self.entregas = np.split(self.valores, [50, 2000, 2001, 4500])
+    
+    def suavizar_por_entregas(self, **parametros):
+        """Aplica suavizar_incremental a cada entrega y guarda la serie como lo haría quien llama."""
+        suavizado = np.empty(0)
+        estado = None
+        for entrega in self.entregas:
+            tramo, desde, estado = suavizar_incremental(entrega, estado, **parametros)
+            suavizado = np.concatenate([suavizado[:desde], tramo])
+            # El estado no crece con la serie
+            self.assertLessEqual(len(estado['cola']), 2 * parametros['window_length'])
+        self.assertEqual(estado['total'], len(self.valores))
+        return suavizado, estado
+    
+    def test_centrado_igual_que_filtrar_todo(self):
+        """Añadiendo por entregas se obtiene lo mismo que filtrando la serie completa."""
+        suavizado, estado = self.suavizar_por_entregas(window_length=301)
+        
+        np.testing.assert_allclose(suavizado, savgol_filter(self.valores, 301, 3), rtol=0, atol=1e-9)
+        # Solo se recalculan la última ventana y las muestras nuevas
+        self.assertEqual(estado['muestras_recalculadas'], 301 + len(self.entregas[-1]))
+    
+    def test_causal_no_cambia_el_pasado(self):
+        """El suavizado causal solo calcula las muestras nuevas."""
+        suavizado, estado = self.suavizar_por_entregas(window_length=300, causal=True)
+        
+        np.testing.assert_array_equal(suavizado, suavizar_causal(self.valores, 300))
+        self.assertEqual(estado['muestras_recalculadas'], len(self.entregas[-1]))
+        
+        # El valor de cada día coincide con suavizar solo hasta ese día
+        np.testing.assert_allclose(suavizado[:2500], suavizar_causal(self.valores[:2500], 300))
+    
+    def test_arranque_sin_llenar_la_cache(self):
+        """El arranque ajusta con las muestras disponibles sin guardar cada ventana."""
+        from scipy.signal import savgol_coeffs
+        
+        for polyorder in (0, 1, 2, 3):
+            with self.subTest(polyorder=polyorder):
+                disponibles = np.arange(polyorder + 1, 80)
+                coeficientes = coeficientes_arranque(disponibles, polyorder)
+                for fila, longitud in zip(coeficientes, disponibles):
+                    np.testing.assert_allclose(
+                        fila[:longitud], savgol_coeffs(longitud, polyorder, pos=longitud - 1,
+                                                       use='dot'), rtol=0, atol=1e-9)
+                    self.assertFalse(fila[longitud:].any())
+        
+        coeficientes_causales.cache_clear()
+        suavizar_causal(self.valores, 1500)
+        self.assertEqual(coeficientes_causales.cache_info().currsize, 1)
+    
+    def test_parametros_no_validos(self):
+        """Como savgol_filter, el filtro causal exige window_length > polyorder."""
+        with self.assertRaises(ValueError):
+            suavizar_causal(self.valores, 3, 3)
+        with self.assertRaises(ValueError):
+            suavizar_incremental(self.valores, window_length=2, polyorder=3, causal=True)
+        with self.assertRaises(ValueError):
+            coeficientes_arranque([3, 4], 3)
+    
+    def test_cambio_de_parametros(self):
+        """Si cambian los parámetros hay que empezar de nuevo con la serie completa."""
+        _, _, estado = suavizar_incremental(self.valores[:5000], window_length=301)
+        with self.assertRaises(ValueError):
+            suavizar_incremental(self.valores[5000:], estado, window_length=201)
+    
+    def test_serie_temporal_causal(self):
+        """suavizar_serie_temporal admite el modo causal."""
+        df = pd.DataFrame({'dia_decimal': np.arange(600) / 365.25,
+                           'nivell_perc': self.valores[:600]})
+        with patch('sys.stdout', new=StringIO()):
+            df_suavizado = suavizar_serie_temporal(df, window_length=101, causal=True)
+        
+        np.testing.assert_array_equal(df_suavizado['nivell_perc_suavizado'].values,
+                                      suavizar_causal(self.valores[:600], 101))
+
+
+class TestBancoSavgol(unittest.TestCase):
+    """Tests del filtro con coeficientes en caché."""
+    
+    def setUp(self):
+        """Serie de paseo aleatorio."""
+        self.valores = np.random.default_rng(9).normal(0, 1, 4000).cumsum()
+    
+    def test_equivale_a_savgol_filter(self):
+        """Coincide con savgol_filter en todos los modos, con ventanas pequeñas y grandes."""
+        for window_length in (11, 12, 301, 1500):
+            for mode in ('interp', 'mirror', 'nearest', 'constant', 'wrap'):
+                for deriv in (0, 1):
+                    with self.subTest(window_length=window_length, mode=mode, deriv=deriv):
+                        esperado = savgol_filter(self.valores, window_length, 3, deriv=deriv,
+                                                 delta=0.5, mode=mode, cval=2.0)
+                        obtenido = filtrar_savgol(self.valores, window_length, 3, deriv=deriv,
+                                                  delta=0.5, mode=mode, cval=2.0)
+                        np.testing.assert_allclose(obtenido, esperado, rtol=0, atol=1e-9)
+    
+    def test_bordes_interp(self):
+        """Los extremos en modo 'interp' coinciden con savgol_filter para varios órdenes."""
+        for window_length in (5, 12, 51, 301):
+            for polyorder in (0, 1, 2, 3, 4):
+                if polyorder >= window_length:
+                    continue
+                for deriv in range(min(polyorder, 2) + 1):
+                    with self.subTest(window_length=window_length, polyorder=polyorder,
+                                      deriv=deriv):
+                        mitad = window_length // 2
+                        esperado = savgol_filter(self.valores, window_length, polyorder,
+                                                 deriv=deriv, delta=0.5, mode='interp')
+                        obtenido = filtrar_savgol(self.valores, window_length, polyorder,
+                                                  deriv=deriv, delta=0.5, mode='interp')
+                        np.testing.assert_allclose(obtenido[:mitad], esperado[:mitad],
+                                                   rtol=0, atol=1e-9)
+                        np.testing.assert_allclose(obtenido[-mitad:], esperado[-mitad:],
+                                                   rtol=0, atol=1e-9)
+    
+    def test_coeficientes_en_cache(self):
+        """Repetir una combinación de parámetros reutiliza los coeficientes."""
+        banco_savgol.cache_clear()
+        filtrar_savgol(self.valores, 301, 3)
+        filtrar_savgol(self.valores[::-1], 301, 3)
+        
+        self.assertEqual(banco_savgol.cache_info().hits, 1)
+        self.assertFalse(banco_savgol(301, 3)['coeficientes'].flags.writeable)
+    
+    def test_ventana_mayor_que_la_serie(self):
+        """En modo 'interp' la ventana no puede superar la serie, como en savgol_filter."""
+        with self.assertRaises(ValueError):
+            filtrar_savgol(self.valores[:100], 101, 3)
+
+
+class TestSuavizadoSinCopias(unittest.TestCase):
+    """Tests de que el suavizado no modifica el DataFrame de entrada."""
+    
+    def test_entrada_intacta(self):
+        """Ordenado o desordenado, el DataFrame de entrada no cambia."""
+        df = pd.DataFrame({'dia_decimal': np.arange(200) / 365.25,
+                           'nivell_perc': np.random.default_rng(2).uniform(40, 80, 200)},
+                          index=np.arange(200) * 2)
+        for df_entrada in (df, df.iloc[::-1]):
+            original = df_entrada.copy()
+            with patch('sys.stdout', new=StringIO()):
+                df_suavizado = suavizar_serie_temporal(df_entrada, window_length=51)
+            
+            pd.testing.assert_frame_equal(df_entrada, original)
+            self.assertTrue(df_suavizado.index.equals(pd.RangeIndex(200)))
+            self.assertTrue(df_suavizado['dia_decimal'].is_monotonic_increasing)
@@ -14,11 +14,18 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+from io import StringIO
+from unittest.mock import patch
 
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ejercicio5 import (
     calcula_periodos,
+    calcula_periodos_arrays,
+    calcula_periodos_multiumbral,
+    calcula_periodos_multiumbral_arrays,
+    limites_periodos,
+    redondear_fechas,
     analizar_periodos_sequia,
     ejecutar_ejercicio5
 )
@@ -279,4 +286,123 @@ class TestEjercicio5(unittest.TestCase):
             print(f"{status} {test_name}: {score}/1")
         print(f"{'='*50}")
         print(f"PUNTUACIÓN TOTAL: {cls.score}/{cls.max_score}")
-        print(f"{'='*50}\n")
\ No newline at end of file
+        print(f"{'='*50}\n")
+
+
+class TestPeriodosPorRachas(unittest.TestCase):
+    """Tests de la detección de períodos por bordes de racha."""
+    
+    def setUp(self):
+        """Configuración para cada test individual."""
+        self.dia_decimal = np.array([2020.0, 2020.1, 2020.2, 2020.3, 2020.4, 2020.5])
+    
+    def test_limites_de_rachas(self):
+        """Las rachas se delimitan por su primera posición y la siguiente a su fin."""
+        inicios, finales = limites_periodos(np.array([50, 50, 70, 40, 70, 55]))
+        
+        np.testing.assert_array_equal(inicios, [0, 3, 5])
+        np.testing.assert_array_equal(finales, [2, 4, 6])
+    
+    def test_periodos_en_los_extremos(self):
+        """Un período abierto al principio o al final usa la primera o última fecha."""
+        periodos = calcula_periodos_arrays(self.dia_decimal,
+                                           np.array([50, 50, 70, 40, 70, 55]))
+        
+        self.assertListEqual(periodos, [[2020.0, 2020.2], [2020.3, 2020.4], [2020.5, 2020.5]])
+        self.assertIsInstance(periodos[0][0], float)
+    
+    def test_series_sin_sequia_o_vacias(self):
+        """Sin valores bajo el umbral o sin datos no hay períodos."""
+        self.assertListEqual(calcula_periodos_arrays(self.dia_decimal, np.full(6, 80.0)), [])
+        self.assertListEqual(calcula_periodos_arrays(np.array([]), np.array([])), [])
+    
+    def test_no_reordena_si_ya_esta_ordenado(self):
+        """Con datos ya ordenados no se llama a sort_values."""
+        df = pd.DataFrame({'dia_decimal': self.dia_decimal,
+                           'nivell_perc_suavizado': [50, 50, 70, 40, 70, 55]})
+        
+        with patch('sys.stdout', new=StringIO()), \
+                patch.object(pd.DataFrame, 'sort_values') as sort_values:
+            periodos = calcula_periodos(df)
+        
+        sort_values.assert_not_called()
+        with patch('sys.stdout', new=StringIO()):
+            self.assertListEqual(calcula_periodos(df.iloc[::-1]), periodos)
+
+
+class TestEstadisticasPeriodos(unittest.TestCase):
+    """Tests de las estadísticas por período calculadas con búsqueda binaria."""
+    
+    def setUp(self):
+        """Serie con muchas sequías cortas y algún valor nulo."""
+        n_points = 3000
+        t = 2000 + np.arange(n_points) / 365.25
+        suavizado = 60 + 15 * np.sin(2 * np.pi * t * 4)
+        suavizado[::97] = np.nan
+        self.df_test = pd.DataFrame({
+            'dia': pd.date_range('2000-01-01', periods=n_points, freq='D'),
+            'dia_decimal': t,
+            'nivell_perc_suavizado': suavizado
+        })
+    
+    def test_coincide_con_filtrado_por_mascara(self):
+        """Cada fila coincide con filtrar el DataFrame por el rango del período."""
+        with patch('sys.stdout', new=StringIO()):
+            periodos = calcula_periodos(self.df_test)
+            df_info = analizar_periodos_sequia(self.df_test, periodos)
+        
+        self.assertEqual(len(df_info), len(periodos))
+        for (inicio, fin), (_, fila) in zip(periodos, df_info.iterrows()):
+            mask = (self.df_test['dia_decimal'] >= inicio) & (self.df_test['dia_decimal'] <= fin)
+            datos = self.df_test[mask]
+            self.assertEqual(fila['Inicio (fecha)'], datos['dia'].iloc[0].strftime('%d/%m/%Y'))
+            self.assertEqual(fila['Fin (fecha)'], datos['dia'].iloc[-1].strftime('%d/%m/%Y'))
+            self.assertEqual(fila['Volumen mínimo (%)'],
+                             round(datos['nivell_perc_suavizado'].min(), 1))
+            self.assertEqual(fila['Volumen medio (%)'],
+                             round(datos['nivell_perc_suavizado'].mean(), 1))
+    
+    def test_periodos_sin_datos_y_desordenados(self):
+        """Se omiten los períodos sin datos y el resultado no depende del orden de filas."""
+        periodos = [[1990.0, 1991.0], [2001.1, 2001.3]]
+        with patch('sys.stdout', new=StringIO()):
+            df_info = analizar_periodos_sequia(self.df_test, periodos)
+            df_desordenado = analizar_periodos_sequia(self.df_test.iloc[::-1], periodos)
+        
+        self.assertListEqual(df_info['Período'].tolist(), [2])
+        pd.testing.assert_frame_equal(df_info, df_desordenado)
+
+
+class TestPeriodosMultiumbral(unittest.TestCase):
+    """Tests de la detección de sequías para varios umbrales a la vez."""
+    
+    def setUp(self):
+        """Serie con niveles escalonados, valores nulos y fechas con empates de redondeo."""
+        generador = np.random.default_rng(7)
+        self.dia_decimal = np.round(2000 + np.arange(2000) / 365.25, 3)
+        self.suavizado = np.round(generador.uniform(20, 90, 2000) / 10) * 10
+        self.suavizado[::53] = np.nan
+    
+    def test_igual_que_un_umbral_cada_vez(self):
+        """Cada umbral obtiene exactamente los períodos de calcula_periodos_arrays."""
+        umbrales = [70, 30, 50, 60, 40, 60.5]
+        resultado = calcula_periodos_multiumbral_arrays(self.dia_decimal, self.suavizado, umbrales)
+        
+        self.assertListEqual(list(resultado), umbrales)
+        for umbral in umbrales:
+            self.assertListEqual(resultado[umbral],
+                                 calcula_periodos_arrays(self.dia_decimal, self.suavizado, umbral))
+    
+    def test_dataframe_desordenado(self):
+        """Desde un DataFrame se ordena una sola vez y se devuelven todos los umbrales."""
+        df = pd.DataFrame({'dia_decimal': self.dia_decimal,
+                           'nivell_perc_suavizado': self.suavizado}).iloc[::-1]
+        with patch('sys.stdout', new=StringIO()):
+            resultado = calcula_periodos_multiumbral(df)
+            self.assertListEqual(resultado[60], calcula_periodos(df, umbral=60))
+        self.assertListEqual(list(resultado), [30, 40, 50, 60, 70])
+    
+    def test_redondeo_como_round(self):
+        """El redondeo vectorizado coincide con round(), también en los empates."""
+        valores = np.concatenate([self.dia_decimal, np.arange(200000, 200100) / 100 + 0.005])
+        self.assertListEqual(redondear_fechas(valores), [round(float(v), 2) for v in valores])
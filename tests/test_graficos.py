@@ -0,0 +1,123 @@
+"""
+Tests para el módulo graficos: figuras sin pyplot y dibujo en procesos aparte.
+
+Este módulo comprueba que el diezmado conserva en cada columna de píxeles
+los extremos de la serie, que RenderizadorGraficos devuelve Futures con
+las rutas de los gráficos guardados, tanto en procesos de dibujo como en
+el propio proceso, y que los errores de dibujo llegan a quien espera.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.graficos import RenderizadorGraficos, diezmar_serie, ancho_en_pixeles, crear_figura
+
+
+class TestDiezmarSerie(unittest.TestCase):
+    """Tests de diezmar_serie."""
+
+    def setUp(self):
+        """Serie diaria larga con ruido (muchos puntos por píxel)."""
+        generador = np.random.default_rng(0)
+        self.x = 1970 + np.arange(50000) / 365.25
+        self.y = 60 + 30 * np.sin(np.arange(50000) / 400.0) + generador.normal(0, 3, 50000)
+
+    def test_serie_corta_sin_cambios(self):
+        """Con menos de cuatro puntos por píxel no se quita nada."""
+        x, y = diezmar_serie(self.x[:1000], self.y[:1000], 3600)
+        np.testing.assert_array_equal(x, self.x[:1000])
+        np.testing.assert_array_equal(y, self.y[:1000])
+
+    def test_extremos_por_columna(self):
+        """Cada columna conserva su primer, último, mínimo y máximo valor."""
+        ancho_px = 500
+        x, y = diezmar_serie(self.x, self.y, ancho_px)
+
+        self.assertLessEqual(len(x), 4 * ancho_px)
+        self.assertTrue(np.all(np.diff(x) > 0))
+        self.assertEqual((x[0], x[-1]), (self.x[0], self.x[-1]))
+
+        def extremos(xs, ys):
+            escala = ancho_px / (self.x[-1] - self.x[0])
+            columna = np.minimum(((xs - self.x[0]) * escala).astype(int), ancho_px - 1)
+            return pd.Series(ys).groupby(columna).agg(['first', 'last', 'min', 'max'])
+
+        pd.testing.assert_frame_equal(extremos(x, y), extremos(self.x, self.y))
+
+    def test_huecos(self):
+        """Los NaN se conservan para que la línea no una los huecos."""
+        y = self.y.copy()
+        y[10000:10020] = np.nan
+        x_diezmado, y_diezmado = diezmar_serie(self.x, y, 500)
+        self.assertEqual(np.isnan(y_diezmado).sum(), 20)
+        self.assertEqual(np.nanmin(y_diezmado), np.nanmin(y))
+        self.assertEqual(np.nanmax(y_diezmado), np.nanmax(y))
+
+    def test_ancho_en_pixeles(self):
+        """El ancho es el de la figura a la resolución de guardado."""
+        figura, _ = crear_figura(figsize=(12, 6))
+        self.assertEqual(ancho_en_pixeles(figura, dpi=300), 3600)
+
+
+class TestRenderizadorGraficos(unittest.TestCase):
+    """Tests de RenderizadorGraficos."""
+
+    def setUp(self):
+        """Serie suavizada pequeña y directorio temporal para las imágenes."""
+        self.directorio = tempfile.mkdtemp(prefix='pec4_graficos_')
+        dias = np.arange(400)
+        self.df = pd.DataFrame({'dia_decimal': 2000 + dias / 365.25,
+                                'nivell_perc': 60 + 20 * np.sin(dias / 30.0)})
+        self.df['nivell_perc_suavizado'] = self.df['nivell_perc']
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_dibujo_en_proceso_aparte(self):
+        """Los Futures se resuelven con las rutas de los PNG guardados."""
+        with RenderizadorGraficos(procesos=1) as renderizador:
+            renderizador.iniciar()
+            volumen = renderizador.enviar('src.ejercicio3', 'visualizar_evolucion_volumen',
+                                          self.df, directorio=self.directorio)
+            suavizado = renderizador.enviar('src.ejercicio4', 'visualizar_serie_suavizada',
+                                            self.df, directorio=self.directorio)
+            rutas = renderizador.esperar()
+
+        self.assertEqual(rutas, [volumen.result(), suavizado.result()])
+        for ruta in rutas:
+            self.assertTrue(os.path.exists(ruta))
+            self.assertEqual(os.path.dirname(ruta), self.directorio)
+
+    def test_iniciar_arranca_todos_los_procesos(self):
+        """iniciar() crea un proceso por cada uno pedido sin esperar al primer gráfico."""
+        with RenderizadorGraficos(procesos=2) as renderizador:
+            renderizador.iniciar()
+            self.assertEqual(len(renderizador._ejecutor._processes), 2)
+            self.assertEqual(renderizador.esperar(), [])
+
+    def test_sin_procesos_y_errores(self):
+        """Con 0 procesos se dibuja en el momento; los errores salen en esperar()."""
+        renderizador = RenderizadorGraficos(procesos=0)
+        futuro = renderizador.enviar('src.ejercicio4', 'visualizar_serie_suavizada',
+                                     self.df, directorio=self.directorio)
+        self.assertTrue(futuro.done())
+        self.assertTrue(os.path.exists(futuro.result()))
+        self.assertEqual(renderizador.esperar(), [futuro.result()])
+
+        fallido = renderizador.enviar('src.ejercicio4', 'visualizar_serie_suavizada',
+                                      self.df[['dia_decimal']], directorio=self.directorio)
+        self.assertIsInstance(fallido.exception(), KeyError)
+        with self.assertRaises(KeyError):
+            renderizador.esperar()
+        self.assertEqual(renderizador.esperar(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests para el módulo graficos_lote: gráficos de muchas estaciones.
+
+Este módulo comprueba que se guarda un gráfico por estación reutilizando
+una sola figura, que todas las imágenes tienen el mismo tamaño y que la
+cuadrícula incluye todas las estaciones.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import graficos_lote
+from src.graficos_lote import (visualizar_estaciones, visualizar_cuadricula,
+                               nombre_archivo_estacion, series_estaciones)
+
+
+class TestGraficosLote(unittest.TestCase):
+    """Tests de visualizar_estaciones y visualizar_cuadricula."""
+
+    def setUp(self):
+        """Series suavizadas de tres estaciones, una de ellas desordenada."""
+        self.directorio = tempfile.mkdtemp(prefix='pec4_graficos_lote_')
+        bloques = []
+        for posicion, estacion in enumerate(['la Baells', 'Sant Ponç', 'Sau']):
+            dias = np.arange(600 + 100 * posicion)
+            nivel = 60 + 25 * np.sin(dias / (50.0 + posicion))
+            bloques.append(pd.DataFrame({'estacio': estacion,
+                                         'dia_decimal': 2000 + posicion + dias / 365.25,
+                                         'nivell_perc': nivel,
+                                         'nivell_perc_suavizado': nivel}))
+        self.df = pd.concat(bloques, ignore_index=True)
+        self.df = self.df.iloc[::-1].reset_index(drop=True)
+        self.df['estacio'] = self.df['estacio'].astype('category')
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_nombre_archivo(self):
+        """Los nombres de archivo no llevan acentos ni espacios."""
+        self.assertEqual(nombre_archivo_estacion('Sant Ponç'), 'sant_ponc_smoothed_Samuel_Viciana.png')
+        self.assertEqual(nombre_archivo_estacion('la Llosa del Cavall', 'Ana'),
+                         'la_llosa_del_cavall_smoothed_Ana.png')
+
+    def test_series_ordenadas(self):
+        """Cada estación sale ordenada por fecha; las que no existen se omiten."""
+        with patch('sys.stdout', new=StringIO()):
+            series = series_estaciones(self.df, ['Sau', 'No existe'])
+        self.assertEqual([serie[0] for serie in series], ['Sau'])
+        self.assertTrue(np.all(np.diff(series[0][1]) > 0))
+
+    def test_una_figura_para_todas(self):
+        """Se crea una sola figura y las imágenes tienen el mismo tamaño."""
+        from matplotlib.image import imread
+
+        with patch.object(graficos_lote, 'crear_figura',
+                          wraps=graficos_lote.crear_figura) as crear_figura, \
+                patch('sys.stdout', new=StringIO()):
+            rutas = visualizar_estaciones(self.df, directorio=self.directorio, dpi=40)
+        crear_figura.assert_called_once()
+
+        self.assertEqual(list(rutas), ['Sau', 'Sant Ponç', 'la Baells'])
+        tamanos = {imread(ruta).shape for ruta in rutas.values()}
+        self.assertEqual(len(tamanos), 1)
+        # Cada estación tiene su propio dibujo
+        self.assertFalse(np.array_equal(imread(rutas['Sau']), imread(rutas['la Baells'])))
+
+    def test_cuadricula(self):
+        """La cuadrícula es una sola imagen con un gráfico por estación."""
+        with patch('sys.stdout', new=StringIO()):
+            ruta = visualizar_cuadricula(self.df, directorio=self.directorio, columnas=2, dpi=40)
+            self.assertIsNone(visualizar_cuadricula(self.df.iloc[0:0], directorio=self.directorio))
+        self.assertTrue(os.path.exists(ruta))
+        self.assertEqual(os.listdir(self.directorio), [os.path.basename(ruta)])
+
+
+if __name__ == '__main__':
+    unittest.main()
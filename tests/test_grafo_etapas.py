@@ -0,0 +1,134 @@
+"""
+Tests para el módulo grafo_etapas: ejecución de etapas con dependencias.
+
+Este módulo comprueba que solo se ejecuta el subgrafo necesario, que los
+resultados disponibles (en memoria o en la caché) no se recalculan, que
+las ramas independientes se ejecutan a la vez y que los errores se
+propagan sin lanzar más etapas.
+"""
+
+import unittest
+import os
+import sys
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.grafo_etapas import GrafoEtapas
+
+
+class AlmacenMemoria:
+    """Caché en memoria con la interfaz de AlmacenEtapas."""
+
+    def __init__(self, valores=None):
+        self.valores = dict(valores or {})
+
+    def cargar(self, etapa):
+        return self.valores.get(etapa)
+
+    def guardar(self, etapa, valor):
+        self.valores[etapa] = valor
+
+
+class TestGrafoEtapas(unittest.TestCase):
+    """Tests de GrafoEtapas."""
+
+    def setUp(self):
+        """Grafo en diamante: base -> (doble, triple) -> suma, y una etapa aparte."""
+        self.llamadas = []
+        self.grafo = GrafoEtapas()
+
+        def etapa(nombre, funcion):
+            def envoltura(**argumentos):
+                self.llamadas.append(nombre)
+                return funcion(**argumentos)
+            return envoltura
+
+        self.grafo.registrar('base', etapa('base', lambda inicio: inicio + 1),
+                             parametros=('inicio',), cache='base')
+        self.grafo.registrar('doble', etapa('doble', lambda base: 2 * base), entradas=('base',))
+        self.grafo.registrar('triple', etapa('triple', lambda base: 3 * base), entradas=('base',))
+        self.grafo.registrar('suma', etapa('suma', lambda doble, triple: (doble + triple, 'fin')),
+                             entradas=('doble', 'triple'), salidas=('suma', 'etiqueta'))
+        self.grafo.registrar('aparte', etapa('aparte', lambda: 'nada'))
+
+    def test_subgrafo_necesario(self):
+        """Solo se ejecutan las etapas de las que dependen los objetivos."""
+        resultados = self.grafo.ejecutar(['doble'], parametros={'inicio': 1})
+        self.assertEqual(resultados, {'base': 2, 'doble': 4})
+        self.assertEqual(self.llamadas, ['base', 'doble'])
+
+        # Las salidas múltiples se reparten y la memoria evita recalcular 'base' y 'doble'
+        self.grafo.ejecutar(['suma'], resultados, {'inicio': 1})
+        self.assertEqual(resultados['suma'], 10)
+        self.assertEqual(resultados['etiqueta'], 'fin')
+        self.assertEqual(self.llamadas, ['base', 'doble', 'triple', 'suma'])
+
+        # recalcular ejecuta la etapa pedida aunque su resultado ya exista
+        self.grafo.ejecutar(['doble'], resultados, {'inicio': 1}, recalcular=['doble'])
+        self.assertEqual(self.llamadas[-1], 'doble')
+        self.assertNotIn('aparte', self.llamadas)
+
+    def test_cache(self):
+        """Un resultado en la caché evita ejecutar la etapa y sus dependencias."""
+        almacen = AlmacenMemoria()
+        tiempos = []
+        self.grafo.ejecutar(['doble'], parametros={'inicio': 1}, almacen=almacen)
+        self.assertEqual(almacen.valores, {'base': 2})
+
+        self.llamadas.clear()
+        with patch('sys.stdout', new=StringIO()):
+            resultados = self.grafo.ejecutar(['doble'], almacen=almacen, tiempos=tiempos)
+        self.assertEqual(resultados['doble'], 4)
+        self.assertEqual(self.llamadas, ['doble'])
+        self.assertEqual([tiempo['estado'] for tiempo in tiempos], ['caché', 'ok'])
+
+    def test_ramas_en_paralelo(self):
+        """Con dos hilos, 'doble' y 'triple' se ejecutan a la vez."""
+        barrera = threading.Barrier(2, timeout=5)
+
+        def esperar(**argumentos):
+            barrera.wait()
+            return 0
+
+        grafo = GrafoEtapas()
+        grafo.registrar('base', lambda: 1)
+        grafo.registrar('doble', esperar, entradas=('base',))
+        grafo.registrar('triple', esperar, entradas=('base',))
+        grafo.registrar('suma', lambda doble, triple: doble + triple, entradas=('doble', 'triple'))
+
+        # Con un hilo la barrera no se alcanzaría: se rompe por tiempo de espera
+        resultados = grafo.ejecutar(['suma'], hilos=2)
+        self.assertEqual(resultados['suma'], 0)
+
+    def test_errores(self):
+        """La excepción de una etapa se propaga y no se lanzan las siguientes."""
+        grafo = GrafoEtapas()
+        grafo.registrar('base', lambda: 1)
+        grafo.registrar('fallo', lambda base: 1 / 0, entradas=('base',))
+        grafo.registrar('final', lambda fallo: self.fail('no debería ejecutarse'),
+                        entradas=('fallo',))
+
+        for hilos in (1, 2):
+            with self.subTest(hilos=hilos):
+                tiempos = []
+                with self.assertRaises(ZeroDivisionError):
+                    grafo.ejecutar(['final'], hilos=hilos, tiempos=tiempos)
+                self.assertEqual([tiempo['estado'] for tiempo in tiempos], ['ok', 'error'])
+
+        with self.assertRaises(ValueError):
+            grafo.ejecutar(['desconocida'])
+        with self.assertRaises(ValueError):
+            grafo.registrar('otra', lambda: 0, salidas=('base',))
+
+        circular = GrafoEtapas()
+        circular.registrar('a', lambda b: b, entradas=('b',))
+        circular.registrar('b', lambda a: a, entradas=('a',))
+        with self.assertRaises(ValueError):
+            circular.ejecutar(['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
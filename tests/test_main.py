@@ -0,0 +1,207 @@
+"""
+Tests para la línea de comandos de main.py.
+
+Este módulo comprueba que los subcomandos se ejecutan sin interacción,
+escriben sus resultados en el directorio de salida y devuelven los
+códigos de salida documentados.
+"""
+
+import unittest
+import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import pandas as pd
+import numpy as np
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+class TestLineaComandos(unittest.TestCase):
+    """Tests de main.main con argumentos."""
+
+    @classmethod
+    def setUpClass(cls):
+        """CSV pequeño con el formato original y dos estaciones."""
+        cls.directorio = tempfile.mkdtemp(prefix='pec4_cli_')
+        fechas = pd.date_range('2000-01-01', periods=900, freq='D')
+        porcentaje = 60 + 30 * np.sin(np.arange(900) / 80.0)
+        bloques = [pd.DataFrame({
+            'Dia': fechas.strftime('%d/%m/%Y'),
+            'Estació': estacion,
+            'Nivell absolut (msnm)': 600 + porcentaje * 0.4,
+            'Percentatge volum embassat (%)': np.round(porcentaje + desplazamiento, 1),
+            'Volum embassat (hm3)': porcentaje * 1.1
+        }) for estacion, desplazamiento in (('Embassament de la Baells (Cercs)', 0),
+                                            ('Embassament de Sau (Vilanova de Sau)', 5))]
+        cls.ruta_csv = os.path.join(cls.directorio, 'embalses.csv')
+        pd.concat(bloques, ignore_index=True).to_csv(cls.ruta_csv, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directorio, ignore_errors=True)
+
+    def ejecutar(self, *argumentos):
+        """Llama a main.main sin permitir input() y devuelve (código, salida)."""
+        with patch('builtins.input', side_effect=AssertionError('input() no permitido')), \
+                patch('sys.stdout', new=StringIO()) as salida, \
+                patch('sys.stderr', new=StringIO()):
+            codigo = main.main(list(argumentos))
+        return codigo, salida.getvalue()
+
+    def test_ejecutar_sin_interaccion(self):
+        """'ejecutar' corre solo las etapas necesarias, guarda resultados y tiempos."""
+        salida = os.path.join(self.directorio, 'ejecutar')
+        codigo, texto = self.ejecutar('ejecutar', '-d', self.ruta_csv, '-o', salida, '-q',
+                                      '--ejercicios', '4', '5', '--window-length', '101',
+                                      '--umbral', '50', '--hilos', '2',
+                                      '--procesos-graficos', '1')
+
+        self.assertEqual(codigo, main.CODIGO_EXITO)
+        self.assertIn('Tiempos por etapa', texto)
+        self.assertTrue(os.path.exists(os.path.join(salida, 'labaells_smoothed_Samuel_Viciana.png')))
+        self.assertTrue(os.path.exists(os.path.join(salida, 'periodos_sequia_50.csv')))
+        # El gráfico del ejercicio 3 no hace falta para los ejercicios 4 y 5
+        self.assertFalse(os.path.exists(os.path.join(salida, 'labaells_Samuel_Viciana.png')))
+        with open(os.path.join(salida, 'tiempos.json'), encoding='utf-8') as archivo:
+            informe = json.load(archivo)
+        estados = {etapa['etapa']: etapa['estado'] for etapa in informe['etapas']}
+        # Los ejercicios pedidos se ejecutan; los previos se calculan o se leen de la caché
+        self.assertEqual(estados['Ejercicio 4'], 'ok')
+        self.assertEqual(estados['Ejercicio 5'], 'ok')
+        self.assertNotIn('Ejercicio 3 (gráfico)', estados)
+        self.assertTrue(all(estado in ('ok', 'caché') for estado in estados.values()))
+        self.assertEqual(informe['umbral'], 50)
+
+    def test_lote_varios_umbrales(self):
+        """'lote' escribe una tabla de períodos por umbral y período y los gráficos."""
+        salida = os.path.join(self.directorio, 'lote')
+        codigo, _ = self.ejecutar('lote', '-d', self.ruta_csv, '-o', salida, '-q',
+                                  '--window-length', '101', '-u', '50', '70', '--graficos')
+
+        self.assertEqual(codigo, main.CODIGO_EXITO)
+        for archivo in ('la_baells_smoothed_Samuel_Viciana.png', 'sau_smoothed_Samuel_Viciana.png',
+                        'estaciones_Samuel_Viciana.png'):
+            self.assertTrue(os.path.exists(os.path.join(salida, archivo)), archivo)
+        df_periodos = pd.read_csv(os.path.join(salida, 'periodos_sequia.csv'))
+        self.assertSetEqual(set(df_periodos['umbral']), {50.0, 70.0})
+        self.assertSetEqual(set(df_periodos['estacio']), {'la Baells', 'Sau'})
+
+    def test_sin_cache(self):
+        """Con --sin-cache no se escribe nada en '.cache', tampoco la copia del CSV."""
+        directorio = os.path.join(self.directorio, 'sin_cache')
+        os.makedirs(directorio)
+        ruta_csv = shutil.copy(self.ruta_csv, directorio)
+        for argumentos in (('ejecutar', '--hasta', '2'), ('lote', '--window-length', '101')):
+            with self.subTest(comando=argumentos[0]):
+                codigo, _ = self.ejecutar(*argumentos, '-d', ruta_csv, '-o', directorio, '-q',
+                                          '--sin-cache')
+                self.assertEqual(codigo, main.CODIGO_EXITO)
+                self.assertFalse(os.path.exists(os.path.join(directorio, '.cache')))
+
+    def test_max_hueco(self):
+        """Con max_hueco el ejercicio 4 suaviza la serie con los huecos cortos rellenos."""
+        directorio = os.path.join(self.directorio, 'max_hueco')
+        os.makedirs(directorio)
+        df = pd.read_csv(self.ruta_csv)
+        ruta_csv = os.path.join(directorio, 'embalses.csv')
+        df.drop(index=range(100, 105)).to_csv(ruta_csv, index=False)
+
+        with patch('sys.stdout', new=StringIO()):
+            sin_rellenar = main.ejecutar_ejercicios([4], {}, ruta_csv, window_length=101,
+                                                    cache_dataset=False)
+            rellenos = main.ejecutar_ejercicios([4], {}, ruta_csv, window_length=101,
+                                                cache_dataset=False, max_hueco=7)
+
+        self.assertEqual(len(sin_rellenar['df_suavizado']), 895)
+        self.assertEqual(len(rellenos['df_suavizado']), 900)
+        self.assertEqual(int(rellenos['df_suavizado']['interpolado'].sum()), 5)
+
+        # El relleno forma parte de la clave de la caché del suavizado
+        self.assertNotEqual(main.crear_almacen(ruta_csv).clave('df_suavizado'),
+                            main.crear_almacen(ruta_csv, max_hueco=7).clave('df_suavizado'))
+
+    def test_bloques(self):
+        """Con --bloques el ejercicio 2 no carga el dataset completo y da el mismo resultado."""
+        with patch('sys.stdout', new=StringIO()):
+            completo = main.ejecutar_ejercicios([2], {}, self.ruta_csv, cache_dataset=False)
+            with patch.object(main, 'cargar_dataset', side_effect=AssertionError('carga completa')):
+                por_bloques = main.ejecutar_ejercicios([2], {}, self.ruta_csv, tamano_bloque=250)
+
+        self.assertNotIn('df_original', por_bloques)
+        pd.testing.assert_frame_equal(completo['df_baells'], por_bloques['df_baells'],
+                                      check_categorical=False)
+
+        salida = os.path.join(self.directorio, 'bloques')
+        codigo, _ = self.ejecutar('ejecutar', '-d', self.ruta_csv, '-o', salida, '-q',
+                                  '--ejercicios', '2', '--bloques', '250', '--sin-cache')
+        self.assertEqual(codigo, main.CODIGO_EXITO)
+
+    def test_tabla_en_directorio_por_defecto(self):
+        """Sin directorio, la tabla va a 'img' en la raíz del proyecto, sea cual sea el CWD."""
+        resultados = {}
+        cwd = os.getcwd()
+        os.chdir(self.directorio)
+        try:
+            # La tabla no se escribe de verdad para no dejarla en el proyecto
+            with patch('sys.stdout', new=StringIO()), \
+                    patch.object(main.os, 'makedirs', wraps=os.makedirs) as crear, \
+                    patch('pandas.DataFrame.to_csv') as guardar:
+                main.ejecutar_ejercicios([5], resultados, self.ruta_csv, window_length=101,
+                                         cache_dataset=False, tabla=True)
+        finally:
+            os.chdir(cwd)
+
+        img = os.path.join(os.path.dirname(os.path.abspath(main.__file__)), 'img')
+        self.assertEqual(resultados['tabla_periodos'], os.path.join(img, 'periodos_sequia_60.csv'))
+        crear.assert_called_with(img, exist_ok=True)
+        guardar.assert_called_once()
+
+    def test_codigos_de_error(self):
+        """Dataset inexistente, etapa fallida y argumentos no válidos."""
+        codigo, _ = self.ejecutar('ejecutar', '-d', os.path.join(self.directorio, 'no_existe.csv'))
+        self.assertEqual(codigo, main.CODIGO_SIN_DATASET)
+
+        salida = os.path.join(self.directorio, 'error')
+        with patch.object(main, 'ejecutar_ejercicio3', side_effect=RuntimeError('fallo')):
+            codigo, _ = self.ejecutar('ejecutar', '-d', self.ruta_csv, '-o', salida, '-q',
+                                      '--sin-cache')
+        self.assertEqual(codigo, main.CODIGO_ERROR_ETAPA)
+        with open(os.path.join(salida, 'tiempos.json'), encoding='utf-8') as archivo:
+            estados = [etapa['estado'] for etapa in json.load(archivo)['etapas']]
+        self.assertEqual(estados, ['ok', 'ok', 'error'])
+
+        with self.assertRaises(SystemExit) as contexto:
+            self.ejecutar('ejecutar', '--ejercicios', '7')
+        self.assertEqual(contexto.exception.code, main.CODIGO_ERROR_USO)
+
+
+class TestArranque(unittest.TestCase):
+    """Tests de la carga perezosa de los ejercicios."""
+
+    def test_importar_main_no_carga_librerias(self):
+        """Importar main.py y construir el parser no carga pandas, scipy ni matplotlib."""
+        codigo = ("import sys, main; main.construir_parser(); "
+                  "print([m for m in ('pandas', 'scipy', 'matplotlib', 'src.ejercicio1') "
+                  "if m in sys.modules])")
+        resultado = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(resultado.returncode, 0, resultado.stderr)
+        self.assertEqual(resultado.stdout.strip(), '[]')
+
+    def test_funciones_perezosas(self):
+        """Las funciones de main conservan el nombre y delegan en el módulo del ejercicio."""
+        self.assertEqual(main.ejecutar_ejercicio3.__name__, 'ejecutar_ejercicio3')
+        with patch('src.ejercicio3.ejecutar_ejercicio3', return_value='hecho') as original:
+            self.assertEqual(main.ejecutar_ejercicio3('df', directorio='x'), 'hecho')
+        original.assert_called_once_with('df', directorio='x')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests para el módulo orden_temporal: accesor df.tiempo.
+
+Este módulo comprueba que el orden cronológico se calcula una sola vez por
+DataFrame, que las marcas caducan al sustituir la columna y que las
+funciones de los ejercicios no vuelven a ordenar datos ya ordenados.
+"""
+
+import unittest
+import os
+import sys
+import pandas as pd
+import numpy as np
+from io import StringIO
+from unittest.mock import patch, PropertyMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.orden_temporal import OrdenTemporal
+from src.ejercicio4 import suavizar_serie_temporal, analizar_tendencias
+from src.ejercicio5 import calcula_periodos
+
+
+class TestOrdenTemporal(unittest.TestCase):
+    """Tests del accesor df.tiempo."""
+
+    def setUp(self):
+        """Serie diaria de dos años, ordenada y desordenada."""
+        dias = pd.date_range('2020-01-01', periods=730, freq='D')
+        self.df_ordenado = pd.DataFrame({
+            'dia': dias,
+            'dia_decimal': 2020 + np.arange(730) / 365.0,
+            'nivell_perc': 60 + 30 * np.sin(np.arange(730) / 58.0)
+        })
+        self.df_desordenado = self.df_ordenado.sample(frac=1, random_state=7)
+
+    def test_ordenado_se_calcula_una_vez(self):
+        """La segunda consulta reutiliza la marca sin recorrer la columna."""
+        self.assertTrue(self.df_ordenado.tiempo.ordenado())
+        self.assertFalse(self.df_desordenado.tiempo.ordenado())
+
+        with patch.object(pd.Series, 'is_monotonic_increasing',
+                          new_callable=PropertyMock) as comprobacion:
+            self.assertTrue(self.df_ordenado.tiempo.ordenado())
+            self.assertFalse(self.df_desordenado.tiempo.ordenado())
+        comprobacion.assert_not_called()
+
+    def test_ordenar(self):
+        """ordenar devuelve el mismo objeto si ya está ordenado y si no, una copia marcada."""
+        self.assertIs(self.df_ordenado.tiempo.ordenar(), self.df_ordenado)
+
+        df_resultado = self.df_desordenado.tiempo.ordenar()
+        pd.testing.assert_frame_equal(df_resultado,
+                                      self.df_desordenado.sort_values('dia_decimal'))
+        self.assertTrue(df_resultado.tiempo.ordenado(comprobar=False))
+        self.assertIs(df_resultado.tiempo.ordenar(), df_resultado)
+
+    def test_marca_caduca_al_sustituir_columna(self):
+        """Sustituir la columna invalida la marca; olvidar la descarta a mano."""
+        df = self.df_ordenado.copy()
+        self.assertTrue(df.tiempo.ordenado())
+
+        df['dia_decimal'] = df['dia_decimal'].values[::-1].copy()
+        self.assertIsNone(df.tiempo.ordenado(comprobar=False))
+        self.assertFalse(df.tiempo.ordenado())
+
+        df.tiempo.marcar_ordenado('dia')
+        df.tiempo.olvidar()
+        self.assertIsNone(df.tiempo.ordenado('dia', comprobar=False))
+
+    def test_flujo_no_reordena(self):
+        """El suavizado marca su resultado y los pasos siguientes no ordenan."""
+        with patch('sys.stdout', new=StringIO()):
+            df_suavizado = suavizar_serie_temporal(self.df_desordenado, window_length=101)
+            self.assertTrue(df_suavizado.tiempo.ordenado(comprobar=False))
+
+            with patch.object(OrdenTemporal, 'ordenado', autospec=True,
+                              side_effect=OrdenTemporal.ordenado) as consulta, \
+                    patch.object(pd.DataFrame, 'take') as reordenar:
+                analizar_tendencias(df_suavizado)
+                periodos = calcula_periodos(df_suavizado)
+            reordenar.assert_not_called()
+            self.assertGreater(consulta.call_count, 0)
+
+            df_referencia = self.df_ordenado.copy()
+            df_referencia['nivell_perc_suavizado'] = df_suavizado['nivell_perc_suavizado'].values
+            self.assertEqual(periodos, calcula_periodos(df_referencia, ordenado=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
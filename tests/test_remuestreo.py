@@ -0,0 +1,90 @@
+"""
+Tests para el módulo remuestreo: regularización a una rejilla diaria.
+
+Este módulo comprueba que los huecos cortos se rellenan por interpolación
+lineal y que los largos se respetan, estación a estación.
+"""
+
+import unittest
+import os
+import sys
+import pandas as pd
+import numpy as np
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.remuestreo import remuestrear_diario
+from src.ejercicio3 import toYearFraction_vectorizado
+
+
+class TestRemuestreoDiario(unittest.TestCase):
+    """Tests de remuestrear_diario."""
+
+    def setUp(self):
+        """Dos estaciones desordenadas, con un hueco corto y otro largo."""
+        dias = pd.to_datetime(['2020-01-01', '2020-01-02', '2020-01-05', '2020-01-20',
+                               '2020-01-21', '2020-01-01', '2020-01-03'])
+        self.df_test = pd.DataFrame({
+            'dia': dias,
+            'estacio': pd.Categorical(['la Baells'] * 5 + ['Sau'] * 2),
+            'nivell_perc': [10.0, 20.0, 50.0, 1.0, 2.0, 5.0, 7.0],
+            'volum': np.float32([1, 2, 3, 4, 5, 6, 7])
+        })
+        self.df_test['dia_decimal'] = toYearFraction_vectorizado(self.df_test['dia'])
+        self.df_test = self.df_test.sample(frac=1, random_state=3)
+
+    def remuestrear(self, **kwargs):
+        """Ejecuta remuestrear_diario sin mostrar su salida."""
+        with patch('sys.stdout', new=StringIO()):
+            return remuestrear_diario(self.df_test, **kwargs)
+
+    def test_rellena_huecos_cortos(self):
+        """Los días que faltan se interpolan linealmente y se marcan."""
+        df_diario = self.remuestrear()
+        baells = df_diario[df_diario['estacio'] == 'la Baells']
+
+        self.assertListEqual(baells['nivell_perc'].tolist(),
+                             [10.0, 20.0, 30.0, 40.0, 50.0, 1.0, 2.0])
+        self.assertListEqual(baells['interpolado'].tolist(),
+                             [False, False, True, True, False, False, False])
+        np.testing.assert_array_equal(df_diario['dia_decimal'].values,
+                                      toYearFraction_vectorizado(df_diario['dia']))
+
+    def test_respeta_huecos_largos_y_estaciones(self):
+        """Los huecos largos no se rellenan y no se interpola entre estaciones."""
+        df_diario = self.remuestrear(max_hueco=3)
+
+        self.assertEqual(len(df_diario), len(self.df_test) + 3)
+        sau = df_diario[df_diario['estacio'] == 'Sau']
+        self.assertListEqual(sau['nivell_perc'].tolist(), [5.0, 6.0, 7.0])
+        self.assertTrue(df_diario.groupby('estacio', observed=True)['dia']
+                        .apply(lambda dias: dias.is_monotonic_increasing).all())
+
+        sin_relleno = self.remuestrear(max_hueco=1)
+        self.assertEqual(int(sin_relleno['interpolado'].sum()), 1)
+
+    def test_conserva_tipos(self):
+        """Las columnas conservan su tipo y el índice es continuo."""
+        df_diario = self.remuestrear()
+
+        self.assertEqual(df_diario['volum'].dtype, np.float32)
+        self.assertIsInstance(df_diario['estacio'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df_diario['dia'].dtype, 'datetime64[ns]')
+        self.assertTrue(df_diario.index.equals(pd.RangeIndex(len(df_diario))))
+
+    def test_marca_de_orden(self):
+        """Con una estación el resultado queda marcado como ordenado en df.tiempo."""
+        self.df_test = self.df_test[self.df_test['estacio'] == 'la Baells']
+        df_diario = self.remuestrear()
+
+        self.assertIs(df_diario.tiempo.ordenado('dia_decimal', comprobar=False), True)
+        self.assertIs(df_diario.tiempo.ordenado('dia', comprobar=False), True)
+        self.assertIs(df_diario.tiempo.ordenar('dia_decimal'), df_diario)
+
+    def test_rechaza_fechas_con_hora(self):
+        """Una fecha con hora no se trunca en silencio."""
+        self.df_test.loc[self.df_test.index[0], 'dia'] += pd.Timedelta(hours=6)
+        with self.assertRaises(ValueError):
+            self.remuestrear()
@@ -0,0 +1,95 @@
+"""
+Tests para el módulo sequia_online: detección de sequías en tiempo real.
+
+Este módulo comprueba que el detector en línea, alimentado lectura a
+lectura, obtiene los mismos períodos que el análisis sobre la serie completa.
+"""
+
+import unittest
+import os
+import sys
+import pandas as pd
+import numpy as np
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sequia_online import DetectorSequia
+from src.ejercicio4 import suavizar_serie_temporal, suavizar_causal
+from src.ejercicio5 import calcula_periodos
+
+
+class TestDetectorSequia(unittest.TestCase):
+    """Tests del detector de sequías en línea."""
+
+    def setUp(self):
+        """Serie diaria con ruido y varios episodios bajo el 60%."""
+        generador = np.random.default_rng(11)
+        dias = 2500
+        t = 2015 + np.arange(dias) / 365.25
+        self.df_test = pd.DataFrame({
+            'dia_decimal': t,
+            'nivell_perc': 60 + 15 * np.sin(2 * np.pi * t / 1.7) + generador.normal(0, 3, dias)
+        })
+
+    def test_reproduce_los_periodos_del_historico(self):
+        """Reproducido sobre el histórico suavizado da los mismos períodos."""
+        with patch('sys.stdout', new=StringIO()):
+            df_suavizado = suavizar_serie_temporal(self.df_test, window_length=101)
+            esperados = calcula_periodos(df_suavizado)
+
+        detector = DetectorSequia(umbral=60)
+        eventos = detector.actualizar_lote(df_suavizado['dia_decimal'],
+                                           df_suavizado['nivell_perc_suavizado'])
+
+        self.assertGreater(len(esperados), 1)
+        self.assertListEqual(detector.periodos(), esperados)
+        self.assertEqual(sum(evento['tipo'] == 'inicio' for evento in eventos), len(esperados))
+
+    def test_eventos_de_inicio_y_fin(self):
+        """Se emite un evento al entrar y otro al salir de la sequía."""
+        detector = DetectorSequia(umbral=60)
+
+        self.assertListEqual(detector.actualizar(2024.0, 70), [])
+        inicio = detector.actualizar(2024.1, 55)
+        self.assertEqual(inicio[0]['tipo'], 'inicio')
+        self.assertTrue(detector.en_sequia)
+        self.assertListEqual(detector.periodos(), [[2024.1, 2024.1]])
+
+        fin = detector.actualizar(2024.2, 65)
+        self.assertEqual(fin[0]['tipo'], 'fin')
+        self.assertListEqual(detector.periodos(), [[2024.1, 2024.2]])
+
+    def test_suavizado_causal(self):
+        """El suavizado interno ajusta el polinomio a las lecturas anteriores."""
+        valores = self.df_test['nivell_perc'].values[:80]
+        dias = self.df_test['dia_decimal'].values[:80]
+        detector = DetectorSequia(window_length=11, polyorder=3)
+
+        for posicion, (dia, valor) in enumerate(zip(dias, valores)):
+            detector.actualizar(dia, valor)
+            ventana = valores[max(0, posicion - 10):posicion + 1]
+            indices = np.arange(len(ventana))
+            esperado = np.polyval(np.polyfit(indices, ventana, min(3, len(ventana) - 1)),
+                                  indices[-1])
+            self.assertAlmostEqual(detector.ultimo_valor, esperado, places=8)
+
+    def test_suavizado_igual_que_en_lote(self):
+        """Lectura a lectura se obtiene el mismo suavizado causal que sobre la serie."""
+        valores = self.df_test['nivell_perc'].values[:400]
+        detector = DetectorSequia(window_length=120)
+        suavizados = []
+        for dia, valor in zip(self.df_test['dia_decimal'].values[:400], valores):
+            detector.actualizar(dia, valor)
+            suavizados.append(detector.ultimo_valor)
+
+        np.testing.assert_allclose(suavizados, suavizar_causal(valores, 120), atol=1e-9)
+
+    def test_lecturas_fuera_de_orden(self):
+        """Una lectura anterior a la última se rechaza."""
+        detector = DetectorSequia()
+        detector.actualizar(2024.5, 70)
+
+        with self.assertRaises(ValueError):
+            detector.actualizar(2024.4, 50)